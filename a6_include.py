@@ -8,6 +8,12 @@
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, batch hashing falls back to the scalar functions
+    np = None
+
+
 class DynamicArrayException(Exception):
     pass
 
@@ -78,6 +84,26 @@ class DynamicArray:
         return len(self._data)
 
 
+class SlottedDynamicArray:
+    """
+    DynamicArray with __slots__ instead of a per-instance __dict__.
+    Shares all of DynamicArray's methods.
+    """
+    __slots__ = ('_data',)
+
+    __init__ = DynamicArray.__init__
+    __iter__ = DynamicArray.__iter__
+    __str__ = DynamicArray.__str__
+    append = DynamicArray.append
+    pop = DynamicArray.pop
+    swap = DynamicArray.swap
+    get_at_index = DynamicArray.get_at_index
+    __getitem__ = DynamicArray.__getitem__
+    set_at_index = DynamicArray.set_at_index
+    __setitem__ = DynamicArray.__setitem__
+    length = DynamicArray.length
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +122,138 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+def _code_points(keys) -> "np.ndarray":
+    """
+    Encodes string keys as a (len(keys), longest key) matrix of uint32 code
+    points, padded with zeros. Padding adds nothing to either hash sum.
+    Raises TypeError for a non-str key, which NumPy would otherwise hash as
+    str(key).
+    """
+    if not set(map(type, keys)) <= {str} and not all(isinstance(key, str) for key in keys):
+        raise TypeError("batch hash functions only take str keys")
+    encoded = np.asarray(keys, dtype=np.str_)
+    return encoded.view(np.uint32).reshape(len(keys), -1)
+
+
+def hash_function_1_batch(keys) -> "np.ndarray":
+    """Batch version of hash_function_1, returns an int64 NumPy array of hashes"""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return _code_points(keys).sum(axis=1, dtype=np.int64)
+
+
+def hash_function_2_batch(keys) -> "np.ndarray":
+    """Batch version of hash_function_2, returns an int64 NumPy array of hashes"""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+    codes = _code_points(keys)
+    weights = np.arange(1, codes.shape[1] + 1, dtype=np.int64)
+    return codes @ weights
+
+
+# Batch variants of the scalar hash functions, used by hash_many
+BATCH_HASH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def hash_many(function, keys) -> list:
+    """
+    Returns a list with function(key) for every key. If function has a batch
+    variant and NumPy is available, all keys are hashed with vector operations.
+    Batches holding a non-str key are hashed one key at a time, so they give
+    exactly what function gives, errors included.
+    """
+    batch = BATCH_HASH_FUNCTIONS.get(function)
+    if batch is not None and np is not None:
+        try:
+            return batch(keys).tolist()
+        except TypeError:
+            pass
+    return [function(key) for key in keys]
+
+
+def group_positions(hashes, capacity: int) -> dict:
+    """
+    Groups the positions of hashes by bucket (hash % capacity). A bucket
+    used by one position maps to that int, a shared bucket maps to a list of
+    positions, so the common no-collision case needs no per-key lists.
+    """
+    groups = {}
+    get = groups.get
+    for position, hash_value in enumerate(hashes):
+        bucket = hash_value % capacity
+        group = get(bucket)
+        if group is None:
+            groups[bucket] = position
+        elif group.__class__ is int:
+            groups[bucket] = [group, position]
+        else:
+            group.append(position)
+    return groups
+
+
+class HashMapView:
+    """
+    Live view of a HashMap, returned by keys(), values() and items(). It
+    holds no copy of the data: every iteration walks the map's table on
+    demand, and len() and membership tests ask the map directly. read turns
+    the map's iteration position into the element the view yields.
+    """
+
+    def __init__(self, hash_map, read: callable) -> None:
+        """Initialize a view of hash_map."""
+        self._map = hash_map
+        self._read = read
+
+    def __len__(self) -> int:
+        """Return the number of entries in the map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Return a new iterator over the view."""
+        return self._map._iterate(self._read)
+
+    def __repr__(self) -> str:
+        """Return content of the view in human-readable form."""
+        return type(self).__name__ + '(' + repr(list(self)) + ')'
+
+
+class KeysView(HashMapView):
+    """View of the keys of a HashMap."""
+
+    def __contains__(self, key) -> bool:
+        """Return True if key is in the map, found by hashing it."""
+        return self._map.contains_key(key)
+
+
+class ValuesView(HashMapView):
+    """View of the values of a HashMap."""
+
+    def __contains__(self, value) -> bool:
+        """Return True if any key maps to value. Scans the whole table."""
+        for candidate in self:
+            if candidate is value or candidate == value:
+                return True
+        return False
+
+
+class ItemsView(HashMapView):
+    """View of the (key, value) pairs of a HashMap."""
+
+    def __contains__(self, item) -> bool:
+        """Return True if item is a (key, value) pair stored in the map."""
+        try:
+            key, value = item
+        except (TypeError, ValueError):
+            return False
+        if not self._map.contains_key(key):
+            return False
+        stored = self._map.get(key)
+        return stored is value or stored == value
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +261,17 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash is the cached hash code of the key, so it never has to be
+        recomputed when the node is searched or rehashed.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -168,20 +332,22 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +358,15 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, nodes with a different cached hash are skipped
+        without comparing keys.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -206,14 +376,48 @@ class LinkedList:
         return self._size
 
 
+class SlottedSLNode:
+    """
+    SLNode with __slots__ instead of a per-instance __dict__.
+    """
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    __init__ = SLNode.__init__
+    __str__ = SLNode.__str__
+
+
+class SlottedLinkedList:
+    """
+    LinkedList with __slots__ that builds its chain from SlottedSLNode.
+    Shares all other methods with LinkedList.
+    """
+    __slots__ = ('_head', '_size')
+
+    __init__ = LinkedList.__init__
+    __str__ = LinkedList.__str__
+    __iter__ = LinkedList.__iter__
+    remove = LinkedList.remove
+    contains = LinkedList.contains
+    length = LinkedList.length
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at front of the list."""
+        self._head = SlottedSLNode(key, value, self._head, hash)
+        self._size += 1
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash is the cached hash code of the key, reused by probing and resizing.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -221,3 +425,13 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+class SlottedHashEntry:
+    """
+    HashEntry with __slots__ instead of a per-instance __dict__.
+    """
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    __init__ = HashEntry.__init__
+    __str__ = HashEntry.__str__
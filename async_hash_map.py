@@ -0,0 +1,264 @@
+# Description: asyncio front end for the SC and OA HashMaps. An
+# AsyncHashMap wraps one map that is only used from the event loop and
+# keeps long operations from stalling it:
+#
+#   - get, contains_key, put and remove are awaitable and run inline
+#   - a put that would grow the table rehashes it cooperatively, moving a
+#     few buckets at a time and yielding to the loop in between (SC maps
+#     and the OA 'entry' engine, through their incremental resize), or
+#     runs the resize in an executor (the other OA engines)
+#   - resize_table, get_keys_and_values, clear and the batch operations
+#     run in an executor
+#   - while the map is in the executor, concurrent gets and contains_key
+#     calls for the same key share one lookup once it is back
+
+
+import asyncio
+
+from a6_include import hash_function_1
+import hash_map_oa
+import hash_map_sc
+
+
+class AsyncHashMap:
+    # Migration steps (of MIGRATE_BUCKETS buckets each) between two yields
+    # to the event loop during a cooperative rehash
+    MIGRATE_STEPS = 4
+
+    def __init__(self, hash_map, executor=None) -> None:
+        """
+        Wraps hash_map, which from now on must only be used through this
+        object. executor runs the heavy operations; None means the event
+        loop's default executor.
+        """
+        self._map = hash_map
+        self._executor = executor
+        # Held by resizes and executor operations, one at a time
+        self._heavy = asyncio.Lock()
+        # Cleared while an executor thread owns the map
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # (method name, key) -> task of a lookup waiting for the map
+        self._lookups = {}
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """Returns the load factor of the map"""
+        return self._map.table_load()
+
+    async def _wait_idle(self) -> None:
+        """
+        Returns once no executor thread is using the map.
+        """
+        while not self._idle.is_set():
+            await self._idle.wait()
+
+    def _coalesced(self, method: str, key: str):
+        """
+        Returns an awaitable for calling a read-only method of the map once
+        it is back from the executor, shared by every caller asking for the
+        same key in the meantime.
+        """
+
+        task = self._lookups.get((method, key))
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_when_idle(method, key))
+            self._lookups[method, key] = task
+            task.add_done_callback(lambda _: self._lookups.pop((method, key), None))
+        # One caller being cancelled must not cancel the shared lookup
+        return asyncio.shield(task)
+
+    async def _lookup_when_idle(self, method: str, key: str):
+        """
+        Waits for the map and then calls a read-only method on it.
+        """
+        await self._wait_idle()
+        return getattr(self._map, method)(key)
+
+    async def get(self, key: str):
+        """
+        Returns the value of key, or None if it isn't in the map
+        """
+        if self._idle.is_set():
+            return self._map.get(key)
+        return await self._coalesced('get', key)
+
+    async def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the map, otherwise False
+        """
+        if self._idle.is_set():
+            return self._map.contains_key(key)
+        return await self._coalesced('contains_key', key)
+
+    async def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates value at key. If the map would grow first, it is
+        resized without blocking the loop.
+        """
+        await self._wait_idle()
+        while self._needs_room():
+            # Shielded so a cancelled put doesn't abandon a resize halfway
+            await asyncio.shield(asyncio.ensure_future(self._make_room()))
+            await self._wait_idle()
+        self._map.put(key, value)
+
+    async def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the map, if present. A shrink that
+        the map's policy triggers still runs inline.
+        """
+        await self._wait_idle()
+        self._map.remove(key)
+
+    def _needs_room(self) -> bool:
+        """
+        Returns True if the map would resize (or, for OA, compact) on the
+        next put. Engines differ in whether they check the load before or
+        after counting the new entry, so both are covered.
+        """
+        m = self._map
+        # Tombstones count toward the load of the OA engines that have them
+        entries = m.get_size() + getattr(m, '_tombstones', 0)
+        capacity = m.get_capacity()
+        return entries / capacity >= m.MAX_LOAD or (entries + 1) / capacity > m.MAX_LOAD
+
+    def _rehashes_incrementally(self) -> bool:
+        """
+        Returns True if the map can be resized a few buckets at a time.
+        """
+        m = self._map
+        return isinstance(m, hash_map_sc.HashMap) or type(m) is hash_map_oa.HashMap
+
+    async def _make_room(self) -> None:
+        """
+        Grows the map by its policy's growth factor, or compacts an OA map
+        whose load is mostly tombstones, the way its own put would.
+        """
+
+        async with self._heavy:
+            if not self._needs_room():
+                return
+            m = self._map
+            if hasattr(m, 'occupied_load') and m.table_load() < m.MAX_LOAD / 2:
+                await self._in_executor(m.compact)
+            elif self._rehashes_incrementally():
+                await self._rehash(m._policy.grow(m.get_capacity()))
+            else:
+                await self._in_executor(m.resize_table, m._policy.grow(m.get_capacity()))
+
+    async def _rehash(self, new_capacity: int) -> None:
+        """
+        Resizes the map through its incremental resize, yielding to the loop
+        every MIGRATE_STEPS steps. Other operations keep using the map in
+        the meantime; the map itself looks in both tables until it is done.
+        """
+
+        m = self._map
+        m._begin_resize(new_capacity)
+        while m._old_buckets is not None:
+            for _ in range(self.MIGRATE_STEPS):
+                m._migrate_step()
+                if m._old_buckets is None:
+                    return
+            await asyncio.sleep(0)
+
+    async def _in_executor(self, function: callable, *args):
+        """
+        Runs function(*args) in the executor with exclusive use of the map.
+        The caller holds self._heavy.
+        """
+        self._idle.clear()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, function, *args)
+        finally:
+            self._idle.set()
+
+    async def _exclusive(self, function: callable, *args):
+        """
+        Runs function(*args) in the executor once no other heavy operation
+        is running. The work goes on even if the caller is cancelled, so the
+        map is never released while a thread still uses it.
+        """
+
+        async def run():
+            async with self._heavy:
+                return await self._in_executor(function, *args)
+
+        return await asyncio.shield(asyncio.ensure_future(run()))
+
+    async def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table in the executor, like the map's resize_table
+        """
+        await self._exclusive(self._map.resize_table, new_capacity)
+
+    async def get_keys_and_values(self):
+        """
+        Returns the map's get_keys_and_values(), built in the executor
+        """
+        return await self._exclusive(self._map.get_keys_and_values)
+
+    async def clear(self) -> None:
+        """
+        Empties the map in the executor
+        """
+        await self._exclusive(self._map.clear)
+
+    async def put_many(self, keys, values) -> None:
+        """
+        Runs the map's put_many in the executor
+        """
+        await self._exclusive(self._map.put_many, list(keys), list(values))
+
+    async def get_many(self, keys) -> list:
+        """
+        Runs the map's get_many in the executor
+        """
+        return await self._exclusive(self._map.get_many, list(keys))
+
+    async def remove_many(self, keys) -> list:
+        """
+        Runs the map's remove_many in the executor
+        """
+        return await self._exclusive(self._map.remove_many, list(keys))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    async def example_1() -> None:
+        m = AsyncHashMap(hash_map_sc.HashMap(53, hash_function_1))
+        for i in range(150):
+            await m.put('str' + str(i), i * 100)
+        await m.remove('str0')
+        print(m.get_size(), m.get_capacity(), await m.get('str42'),
+              await m.contains_key('str0'))
+
+    async def example_2() -> None:
+        m = AsyncHashMap(hash_map_oa.HashMap(11, hash, engine='robin_hood'))
+        await m.put_many(['key' + str(i) for i in range(20_000)], range(20_000))
+        # Lookups issued during the dump wait for it and share one lookup
+        dump = asyncio.ensure_future(m.get_keys_and_values())
+        await asyncio.sleep(0)
+        values = await asyncio.gather(*[m.get('key7') for _ in range(100)])
+        print((await dump).length(), set(values), len(m._lookups))
+        await m.clear()
+        print(m.get_size(), await m.get('key7'))
+
+    print("\nAsync example 1")
+    print("---------------")
+    asyncio.run(example_1())
+
+    print("\nAsync example 2")
+    print("---------------")
+    asyncio.run(example_2())
@@ -0,0 +1,953 @@
+# Description: Regression benchmarks for the SC and OA HashMap implementations.
+# Each benchmark is a plain function that prints a small table of results.
+# Run all of them with `python benchmarks.py`, or pick some by name, e.g.
+# `python benchmarks.py miss_latency`.
+
+import asyncio
+import gc
+import itertools
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from a6_include import (hash_function_1, hash_function_1_batch,
+                        hash_function_2, hash_function_2_batch)
+from hash_functions import fnv1a_hash, murmur3_hash, seeded_hash
+from async_hash_map import AsyncHashMap
+import capacity
+from concurrent_hash_map import ConcurrentHashMap
+from expiring_hash_map import ExpiringHashMap
+import hash_map_oa
+import hash_map_sc
+from load_policy import LoadPolicy
+from lru_hash_map import LRUHashMap
+from mapped_hash_map import MappedHashMap
+from shared_hash_map import SharedHashMap
+from sharded_hash_map import ShardedHashMap
+
+
+def _time_per_op(operation, keys) -> float:
+    """
+    Calls operation once for every key and returns the average time per call
+    in microseconds.
+    """
+
+    start = time.perf_counter()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def bench_miss_latency(sizes=(1_000, 10_000, 100_000), lookups=2_000) -> None:
+    """
+    Measures get/contains_key/remove latency for keys that are NOT in the OA
+    map. With early-terminating probing the miss cost depends on the expected
+    probe length, not on the capacity, so the numbers should stay flat as the
+    table grows. The built-in hash is used so that the result reflects probe
+    length rather than the clustering of hash_function_1/hash_function_2.
+    """
+
+    print("\nOA miss latency (us/op)")
+    print(f"{'size':>10} {'capacity':>10} {'get':>8} {'contains':>9} {'remove':>8}")
+    for size in sizes:
+        m = hash_map_oa.HashMap(size, hash)
+        for i in range(size):
+            m.put('key' + str(i), i)
+        misses = ['miss' + str(i) for i in range(lookups)]
+
+        get_us = _time_per_op(m.get, misses)
+        contains_us = _time_per_op(m.contains_key, misses)
+        remove_us = _time_per_op(m.remove, misses)
+        print(f"{size:>10} {m.get_capacity():>10} {get_us:>8.2f} "
+              f"{contains_us:>9.2f} {remove_us:>8.2f}")
+
+
+def bench_memory_per_entry(sizes=(1_000, 10_000, 100_000)) -> None:
+    """
+    Reports the bytes of table structure per stored entry for every OA
+    storage engine, as measured by memory_usage(). Keys and values are not
+    included since they are shared by all engines.
+    """
+
+    print("\nOA memory per entry (bytes)")
+    print(f"{'size':>10} " + ' '.join(f"{name:>10}" for name in hash_map_oa.ENGINES))
+    for size in sizes:
+        row = f"{size:>10}"
+        for name in hash_map_oa.ENGINES:
+            m = hash_map_oa.HashMap(size, hash, engine=name)
+            for i in range(size):
+                m.put('key' + str(i), i)
+            row += f" {m.memory_usage() / m.get_size():>10.1f}"
+        print(row)
+
+
+def bench_memory_footprint(sizes=(1_000, 10_000, 100_000)) -> None:
+    """
+    Measures the bytes allocated per key while building each map, traced with
+    tracemalloc, for the plain and __slots__ (slotted=True) variants of the
+    SC map and the OA 'entry' engine, with the 'compact' engine for
+    reference. Keys and values are created before tracing starts, so only
+    the table structure is counted.
+    """
+
+    variants = {
+        'sc': lambda size: hash_map_sc.HashMap(size, hash),
+        'sc slotted': lambda size: hash_map_sc.HashMap(size, hash, slotted=True),
+        'sc lazy': lambda size: hash_map_sc.HashMap(size, hash, lazy=True),
+        'oa': lambda size: hash_map_oa.HashMap(size, hash),
+        'oa slotted': lambda size: hash_map_oa.HashMap(size, hash, slotted=True),
+        'oa compact': lambda size: hash_map_oa.HashMap(size, hash, engine='compact'),
+    }
+
+    print("\nMemory footprint per key (bytes, tracemalloc)")
+    print(f"{'size':>10} " + ' '.join(f"{name:>11}" for name in variants))
+    for size in sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        values = list(range(size))
+        row = f"{size:>10}"
+        for factory in variants.values():
+            tracemalloc.start()
+            m = factory(size)
+            for key, value in zip(keys, values):
+                m.put(key, value)
+            allocated, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            row += f" {allocated / size:>11.1f}"
+            del m
+        print(row)
+
+
+def bench_sparse_tables(size=100_000) -> None:
+    """
+    Compares eager and lazy (lazy=True) bucket allocation in the SC map on a
+    sparse table: the time to construct an empty map of capacity size, and
+    the time and traced memory per key of resizing a map holding size / 2
+    keys to twice its capacity.
+    """
+
+    keys = ['key' + str(i) for i in range(size // 2)]
+    values = list(range(size // 2))
+
+    print(f"\nSC sparse tables, capacity {size}")
+    print(f"{'map':>10} {'construct (ms)':>15} {'resize (ms)':>12} {'bytes/key':>10}")
+    for lazy in (False, True):
+        start = time.perf_counter()
+        m = hash_map_sc.HashMap(size, hash, lazy=lazy)
+        construct = time.perf_counter() - start
+        m.put_many(keys, values)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        m.resize_table(m.get_capacity() * 2)
+        resize = time.perf_counter() - start
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        name = 'lazy' if lazy else 'eager'
+        print(f"{name:>10} {construct * 1e3:>15.1f} {resize * 1e3:>12.1f} "
+              f"{allocated / len(keys):>10.1f}")
+        del m
+        gc.collect()
+
+
+def bench_streaming_dump(size=200_000) -> None:
+    """
+    Compares the peak memory traced while dumping every pair of a map,
+    through get_keys_and_values() (which builds a DynamicArray of tuples)
+    and through the items() view (which yields one pair at a time).
+    """
+
+    maps = [('sc', hash_map_sc.HashMap(size, hash))]
+    maps += [('oa ' + name, hash_map_oa.HashMap(size, hash, engine=name))
+             for name in ('entry', 'compact')]
+
+    print(f"\nPeak memory while dumping {size} pairs (bytes/pair)")
+    print(f"{'map':>12} {'get_keys_and_values':>20} {'items()':>10}")
+    for label, m in maps:
+        m.put_many(['key' + str(i) for i in range(size)], range(size))
+
+        tracemalloc.start()
+        pairs = m.get_keys_and_values()
+        for i in range(pairs.length()):
+            pairs.get_at_index(i)
+        del pairs
+        _, materialized = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        for _ in m.items():
+            pass
+        _, streamed = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{label:>12} {materialized / size:>20.1f} {streamed / size:>10.1f}")
+
+
+def bench_load_policy(size=10_000) -> None:
+    """
+    Throughput/memory matrix for LoadPolicy settings: max load, growth
+    factor and prime vs power-of-two capacities. For each map and policy it
+    reports put and get throughput while growing from a small table to size
+    keys, and the bytes per key traced with tracemalloc in a separate build.
+    Higher max loads and smaller growth factors save memory at the cost of
+    longer chains or probes and more frequent resizes.
+    """
+
+    maps = {
+        'sc': (lambda policy: hash_map_sc.HashMap(11, hash, policy=policy),
+               (0.5, 1.0, 2.0)),
+        'oa entry': (lambda policy: hash_map_oa.HashMap(11, hash, policy=policy),
+                     (0.3, 0.5)),
+        'oa robin_hood': (lambda policy: hash_map_oa.HashMap(11, hash, engine='robin_hood',
+                                                             policy=policy),
+                          (0.5, 0.75, 0.9)),
+    }
+    keys = ['key' + str(i) for i in range(size)]
+    values = list(range(size))
+
+    def build(factory, policy):
+        m = factory(policy)
+        for key, value in zip(keys, values):
+            m.put(key, value)
+        return m
+
+    print(f"\nLoad policy matrix, {size} keys")
+    print(f"{'map':>14} {'max':>5} {'grow':>5} {'caps':>6} {'put kops/s':>11} "
+          f"{'get kops/s':>11} {'bytes/key':>10} {'capacity':>9}")
+    for label, (factory, loads) in maps.items():
+        for max_load in loads:
+            for growth_factor in (1.5, 2.0, 4.0):
+                for power_of_two in (False, True):
+                    if power_of_two and label == 'oa entry':
+                        continue
+                    policy = LoadPolicy(max_load=max_load, growth_factor=growth_factor,
+                                        power_of_two=power_of_two)
+
+                    start = time.perf_counter()
+                    m = build(factory, policy)
+                    put_time = time.perf_counter() - start
+                    get_time = _time_per_op(m.get, keys) * len(keys) / 1e6
+
+                    tracemalloc.start()
+                    traced = build(factory, policy)
+                    allocated, _ = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    del traced
+
+                    print(f"{label:>14} {max_load:>5} {growth_factor:>5} "
+                          f"{'pow2' if power_of_two else 'prime':>6} "
+                          f"{size / put_time / 1e3:>11.0f} {size / get_time / 1e3:>11.0f} "
+                          f"{allocated / size:>10.1f} {m.get_capacity():>9}")
+
+
+def bench_prime_capacity(count=20_000, seed=0) -> None:
+    """
+    Compares the trial division kept on the maps (HashMap._next_prime) with
+    the table lookups in capacity.py, on random capacities of three sizes,
+    and times constructing count small SC and OA maps of random capacity.
+    """
+
+    rnd = random.Random(seed)
+    sc = hash_map_sc.HashMap(11, hash)
+    print(f"\nNext prime, us/call")
+    print(f"{'range':>14} {'trial':>8} {'next_prime':>11} {'good_prime':>11}")
+    for low, high in ((2, 1_000), (1_000, 1_000_000), (10 ** 9, 10 ** 12)):
+        capacities = [rnd.randrange(low, high) for _ in range(count // 10)]
+        trial = _time_per_op(sc._next_prime, capacities)
+        table = _time_per_op(capacity.next_prime, capacities)
+        good = _time_per_op(capacity.good_prime, capacities)
+        print(f"{high:>14} {trial:>8.2f} {table:>11.2f} {good:>11.2f}")
+
+    capacities = [rnd.randrange(2, 1_000) for _ in range(count)]
+    print(f"\nConstructing {count} small maps")
+    for name, factory in (('sc', lambda c: hash_map_sc.HashMap(c, hash)),
+                          ('sc lazy', lambda c: hash_map_sc.HashMap(c, hash, lazy=True)),
+                          ('oa', lambda c: hash_map_oa.HashMap(c, hash))):
+        print(f"{name:>10} {_time_per_op(factory, capacities):>8.2f} us/map")
+
+
+def bench_load_factor(capacity=50_000, loads=(0.5, 0.625, 0.75, 0.875),
+                      engines=('entry', 'compact', 'swiss'), lookups=5_000) -> None:
+    """
+    Compares hit and miss latency of quadratic probing ('entry' and 'compact'
+    engines) against Swiss table group probing at load factors from 0.5 to
+    0.875. MAX_LOAD is raised on each map so it can be filled to the target
+    load without resizing.
+    """
+
+    print("\nOA latency by load factor (us/op, hit / miss)")
+    print(f"{'load':>6} " + ' '.join(f"{name:>15}" for name in engines))
+    for load in loads:
+        row = f"{load:>6}"
+        for name in engines:
+            m = hash_map_oa.HashMap(capacity, hash, engine=name)
+            m.MAX_LOAD = 1.0
+            count = int(load * m.get_capacity())
+            for i in range(count):
+                m.put('key' + str(i), i)
+            hits = ['key' + str(i) for i in range(0, count, max(1, count // lookups))]
+            misses = ['miss' + str(i) for i in range(lookups)]
+            row += f" {_time_per_op(m.get, hits):>7.2f} / {_time_per_op(m.get, misses):>5.2f}"
+        print(row)
+
+
+def bench_churn(size=20_000, rounds=5,
+                engines=('entry', 'compact', 'swiss', 'robin_hood')) -> None:
+    """
+    Simulates a long-lived cache: the map is filled once, then every round
+    removes all keys and puts the same number of new ones. Tombstones count
+    toward the load, so tombstone based engines compact (or grow) before
+    dead slots make misses scan most of the table; Robin Hood backward-shift
+    deletion leaves no tombstones at all. The last line shows the capacity
+    and tombstones left in each map.
+    """
+
+    print("\nOA churn: miss latency per round (us/op)")
+    print(f"{'round':>6} " + ' '.join(f"{name:>11}" for name in engines))
+    maps = {}
+    for name in engines:
+        maps[name] = hash_map_oa.HashMap(size, hash, engine=name)
+        for i in range(size):
+            maps[name].put('s0-' + str(i), i)
+
+    misses = ['miss' + str(i) for i in range(2_000)]
+    for r in range(1, rounds + 1):
+        row = f"{r:>6}"
+        for name in engines:
+            m = maps[name]
+            for i in range(size):
+                m.remove('s' + str(r - 1) + '-' + str(i))
+                m.put('s' + str(r) + '-' + str(i), i)
+            row += f" {_time_per_op(m.get, misses):>11.2f}"
+        print(row)
+
+    row = f"{'cap/ts':>6}"
+    for name in engines:
+        m = maps[name]
+        row += f" {str(m.get_capacity()) + '/' + str(m.get_tombstone_count()):>11}"
+    print(row)
+
+    longest, mean = maps['robin_hood'].probe_distance_stats() if 'robin_hood' in maps else (0, 0)
+    print(f"robin_hood probe distance: max {longest}, mean {mean:.2f}")
+
+
+def bench_resize_spikes(count=200_000) -> None:
+    """
+    Times every put while growing a map from a small capacity, with and
+    without incremental resizing, and reports the median, p99.9 and maximum
+    put latency. Incremental resizing trades a slightly slower median for
+    the removal of the rehash stalls. The garbage collector is paused while
+    timing so its own pauses don't hide the resize stalls.
+    """
+
+    print("\nPut latency while growing (us)")
+    print(f"{'map':>18} {'p50':>8} {'p99.9':>8} {'max':>10}")
+    for label, module in (('sc', hash_map_sc), ('oa', hash_map_oa)):
+        for incremental in (False, True):
+            m = module.HashMap(11, hash, incremental=incremental)
+            timings = []
+            gc.disable()
+            try:
+                for i in range(count):
+                    key = 'key' + str(i)
+                    start = time.perf_counter()
+                    m.put(key, i)
+                    timings.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+            timings.sort()
+            name = label + (' incremental' if incremental else '')
+            print(f"{name:>18} {timings[len(timings) // 2] * 1e6:>8.2f} "
+                  f"{timings[int(len(timings) * 0.999)] * 1e6:>8.2f} {timings[-1] * 1e6:>10.0f}")
+
+
+def bench_bulk_load(count=200_000) -> None:
+    """
+    Compares loading count pairs with a put loop against from_items, for the
+    SC map and every OA engine.
+    """
+
+    items = [('key' + str(i), i) for i in range(count)]
+    maps = [('sc', hash_map_sc.HashMap, {})]
+    maps += [('oa ' + name, hash_map_oa.HashMap, {'engine': name}) for name in hash_map_oa.ENGINES]
+
+    print(f"\nBulk load of {count} pairs (s)")
+    print(f"{'map':>15} {'put loop':>10} {'from_items':>11}")
+    for label, cls, kwargs in maps:
+        start = time.perf_counter()
+        m = cls(11, hash, **kwargs)
+        for key, value in items:
+            m.put(key, value)
+        put_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cls.from_items(items, hash, **kwargs)
+        bulk_s = time.perf_counter() - start
+        print(f"{label:>15} {put_s:>10.3f} {bulk_s:>11.3f}")
+
+
+def bench_batch_hashing(chunk=100_000, lookups=10_000) -> None:
+    """
+    Compares the scalar hash functions with their NumPy batch variants on one
+    chunk of keys, then get_many against a get loop on a map using
+    hash_function_2.
+    """
+
+    keys = ['user:' + str(i) + ':session' for i in range(chunk)]
+
+    print(f"\nHashing {chunk} keys (s)")
+    print(f"{'function':>16} {'scalar':>8} {'batch':>8}")
+    for name, scalar, batch in (('hash_function_1', hash_function_1, hash_function_1_batch),
+                                ('hash_function_2', hash_function_2, hash_function_2_batch)):
+        start = time.perf_counter()
+        [scalar(key) for key in keys]
+        scalar_s = time.perf_counter() - start
+        start = time.perf_counter()
+        batch(keys)
+        batch_s = time.perf_counter() - start
+        print(f"{name:>16} {scalar_s:>8.3f} {batch_s:>8.3f}")
+
+    # hash_function_2 clusters these keys badly, so keep the maps small
+    keys = keys[:lookups]
+    print(f"\nLooking up {lookups} keys (s)")
+    print(f"{'map':>12} {'get loop':>9} {'get_many':>9}")
+    for label, m in (('sc', hash_map_sc.HashMap(11, hash_function_2)),
+                     ('oa compact', hash_map_oa.HashMap(11, hash_function_2, engine='compact'))):
+        m.put_many(keys, range(lookups))
+        start = time.perf_counter()
+        [m.get(key) for key in keys]
+        loop_s = time.perf_counter() - start
+        start = time.perf_counter()
+        m.get_many(keys)
+        print(f"{label:>12} {loop_s:>9.3f} {time.perf_counter() - start:>9.3f}")
+
+
+def bench_batch_ops(size=100_000, fanout=1_000, rounds=20, function=hash) -> None:
+    """
+    Simulates request fan-out: every round asks for fanout keys at once
+    (half of them missing). Compares a loop of single-key calls with
+    get_many/contains_many for the SC map and every OA engine. Grouping by
+    bucket pays off when many requested keys share chains or probe runs,
+    as with the clustered hash_function_2 (run by default on a smaller map).
+    """
+
+    if function is hash:
+        bench_batch_ops(size // 50, fanout, rounds // 4, hash_function_2)
+
+    maps = [('sc', hash_map_sc.HashMap(11, function))]
+    maps += [('oa ' + name, hash_map_oa.HashMap(11, function, engine=name))
+             for name in hash_map_oa.ENGINES]
+    keys = ['key' + str(i) for i in range(size)]
+    requests = [[('key' if j % 2 else 'miss') + str((r * fanout + j) % size) for j in range(fanout)]
+                for r in range(rounds)]
+
+    print(f"\nFan-out of {fanout} keys, {size} entries, {function.__name__} (ms/request)")
+    print(f"{'map':>15} {'get loop':>9} {'get_many':>9} {'contains loop':>14} {'contains_many':>14}")
+    for label, m in maps:
+        m.put_many(keys, range(size))
+        row = f"{label:>15}"
+        for single, batch in ((m.get, m.get_many), (m.contains_key, m.contains_many)):
+            start = time.perf_counter()
+            for request in requests:
+                [single(key) for key in request]
+            loop_ms = (time.perf_counter() - start) / rounds * 1e3
+            start = time.perf_counter()
+            for request in requests:
+                batch(request)
+            batch_ms = (time.perf_counter() - start) / rounds * 1e3
+            row += f" {loop_ms:>9.3f} {batch_ms:>9.3f}" if single == m.get else f" {loop_ms:>14.3f} {batch_ms:>14.3f}"
+        print(row)
+
+
+class _GlobalLockMap:
+    """
+    The SC map behind one lock, the way the request handlers share a cache
+    today. Only the methods the stress benchmark calls are wrapped.
+    """
+
+    def __init__(self, function: callable) -> None:
+        """Wrap a new SC map."""
+        self._map = hash_map_sc.HashMap(11, function)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Locked get."""
+        with self._lock:
+            return self._map.get(key)
+
+    def put(self, key: str, value: object) -> None:
+        """Locked put."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def remove(self, key: str) -> None:
+        """Locked remove."""
+        with self._lock:
+            self._map.remove(key)
+
+    def get_size(self) -> int:
+        """Locked get_size."""
+        with self._lock:
+            return self._map.get_size()
+
+
+def bench_concurrent(threads=(1, 2, 4, 8), ops=100_000, keyspace=20_000,
+                     write_ratio=0.1, seed=0) -> None:
+    """
+    Multi-threaded stress test of a shared cache: every thread runs
+    ops / threads mixed get/put/remove calls on random keys, writing on
+    write_ratio of them. Compares the SC map behind one global lock with
+    ConcurrentHashMap (lock-free reads, striped writes) and checks that the
+    final sizes match the keys actually present. The GIL still runs one
+    thread at a time, so the gain comes from reads never blocking.
+    """
+
+    print(f"\nShared map stress, {ops} ops, {write_ratio:.0%} writes (kops/s)")
+    print(f"{'threads':>8} {'global lock':>12} {'striped':>10}")
+    for count in threads:
+        row = f"{count:>8}"
+        for m in (_GlobalLockMap(hash), ConcurrentHashMap(11, hash)):
+            plans = []
+            for t in range(count):
+                rnd = random.Random(seed + t)
+                plans.append([(rnd.random(), 'key' + str(rnd.randrange(keyspace)))
+                              for _ in range(ops // count)])
+
+            def worker(plan: list) -> None:
+                for roll, key in plan:
+                    if roll >= write_ratio:
+                        m.get(key)
+                    elif roll < write_ratio / 4:
+                        m.remove(key)
+                    else:
+                        m.put(key, roll)
+
+            workers = [threading.Thread(target=worker, args=(plan,)) for plan in plans]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            present = sum(m.get('key' + str(i)) is not None for i in range(keyspace))
+            assert present == m.get_size(), (type(m).__name__, present, m.get_size())
+            row += f" {ops / elapsed / 1e3:>{12 if m.__class__ is _GlobalLockMap else 10}.0f}"
+        print(row)
+
+
+def bench_sharded(size=100_000, batch=1_000, singles=5_000, function=fnv1a_hash) -> None:
+    """
+    Throughput of ShardedHashMap from 1 shard up to one per core, against
+    the in-process SC map. Batch calls (put_many/get_many in chunks of
+    batch keys) let every shard hash and probe its share in parallel, so
+    they should scale with the number of cores until routing in the front
+    end process dominates. Single-key gets pay a pipe round trip each and
+    show the per-call overhead.
+    """
+
+    keys = ['key' + str(i) for i in range(size)]
+    chunks = [keys[i:i + batch] for i in range(0, size, batch)]
+    counts = sorted({1, 2, 4, multiprocessing.cpu_count()})
+
+    print(f"\nSharded map, {size} keys, {function.__name__}, "
+          f"{multiprocessing.cpu_count()} cores (kops/s)")
+    print(f"{'map':>12} {'put_many':>9} {'get_many':>9} {'get':>9}")
+    for count in [0] + counts:
+        if count == 0:
+            label, m = 'in-process', hash_map_sc.HashMap(11, function)
+        else:
+            label, m = f'{count} shards', ShardedHashMap(count, 11, function)
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            m.put_many(chunk, range(len(chunk)))
+        m.get_size()
+        put_rate = size / (time.perf_counter() - start) / 1e3
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            m.get_many(chunk)
+        get_many_rate = size / (time.perf_counter() - start) / 1e3
+
+        get_rate = 1e3 / _time_per_op(m.get, keys[:singles])
+        print(f"{label:>12} {put_rate:>9.0f} {get_many_rate:>9.0f} {get_rate:>9.0f}")
+        if count:
+            m.close()
+
+
+def _lookup_all(m, keys: list) -> float:
+    """Looks up every key in m and returns the seconds it took."""
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    return time.perf_counter() - start
+
+
+def bench_shared_readers(size=100_000, lookups=20_000, workers=(1, 2, 4)) -> None:
+    """
+    Ships one map to reader processes started with 'spawn' and has each look
+    up keys in it. A CompactHashMap is pickled into every reader, so each
+    holds its own copy; a SharedHashMap only sends its block name and every
+    reader probes the same shared memory. Reports the time until all readers
+    are done, shipping included, the lookup rate over that time, the lookup
+    rate of one reader on its own, and the pickled bytes sent to each reader.
+    """
+
+    keys = ['key' + str(i) for i in range(size)]
+    probe = keys[:lookups]
+    context = multiprocessing.get_context('spawn')
+
+    print(f"\nShared readers, {size} keys, {lookups} lookups per reader")
+    print(f"{'map':>8} {'readers':>8} {'total (s)':>10} {'kops/s':>8} {'reader kops/s':>14} "
+          f"{'sent bytes':>11}")
+    maps = (('copy', hash_map_oa.HashMap.from_items(zip(keys, range(size)), fnv1a_hash,
+                                                     engine='compact')),
+            ('shared', SharedHashMap.from_items(zip(keys, range(size)), fnv1a_hash)))
+    for label, m in maps:
+        for count in workers:
+            with context.Pool(count) as pool:
+                start = time.perf_counter()
+                times = pool.starmap(_lookup_all, [(m, probe)] * count)
+                total = time.perf_counter() - start
+            print(f"{label:>8} {count:>8} {total:>10.2f} "
+                  f"{count * lookups / total / 1e3:>8.0f} {lookups / min(times) / 1e3:>14.0f} "
+                  f"{len(pickle.dumps(m)):>11}")
+    maps[1][1].close()
+    maps[1][1].unlink()
+
+
+def bench_async_lag(count=300_000, batch=100) -> None:
+    """
+    Event loop lag while a coroutine fills a map, yielding every batch
+    puts. A ticker coroutine sleeping 1 ms records how late it wakes up.
+    Plain put resizes the whole table at once, so its worst lag grows
+    with the table; AsyncHashMap rehashes cooperatively (SC, OA 'entry')
+    or in an executor (other OA engines), so the worst lag should stay
+    small. The cyclic garbage collector is off during the runs: its full
+    collections over this many objects stall the loop by themselves, with
+    or without a map.
+    """
+
+    keys = ['key' + str(i) for i in range(count)]
+
+    async def run(m, put) -> tuple[float, float]:
+        lags = []
+
+        async def ticker() -> None:
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                lags.append(time.perf_counter() - start - 0.001)
+
+        task = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        for i in range(0, count, batch):
+            for key in keys[i:i + batch]:
+                await put(key, 0)
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        return max(lags) * 1e3, count / elapsed / 1e3
+
+    async def plain(m):
+        async def put(key, value):
+            m.put(key, value)
+        return await run(m, put)
+
+    print(f"\nEvent loop lag while putting {count} keys")
+    print(f"{'map':>15} {'plain max lag (ms)':>19} {'async max lag (ms)':>19} "
+          f"{'plain kops/s':>13} {'async kops/s':>13}")
+    factories = [('sc', lambda: hash_map_sc.HashMap(11, hash))]
+    factories += [('oa ' + name, lambda name=name: hash_map_oa.HashMap(11, hash, engine=name))
+                  for name in ('entry', 'robin_hood')]
+    for label, factory in factories:
+        gc.disable()
+        plain_lag, plain_rate = asyncio.run(plain(factory()))
+        wrapped = AsyncHashMap(factory())
+        async_lag, async_rate = asyncio.run(run(wrapped, wrapped.put))
+        del wrapped
+        gc.enable()
+        gc.collect()
+        print(f"{label:>15} {plain_lag:>19.1f} {async_lag:>19.1f} "
+              f"{plain_rate:>13.0f} {async_rate:>13.0f}")
+
+
+def bench_lru_cache(requests=200_000, keyspace=100_000, seed=0) -> None:
+    """
+    Cache-aside workload: each request gets a key drawn from a skewed
+    distribution over keyspace keys and puts a 100-byte value on a miss.
+    An unbounded SC map keeps every key it has seen, so its memory only
+    grows; LRUHashMap stays at its bound and keeps most of the hit rate.
+    Memory is the tracemalloc peak while serving, values included.
+    """
+
+    rng = random.Random(seed)
+    # Log-uniform ranks: a few hot keys and a long tail of cold ones
+    keys = ['key' + str(int(keyspace ** rng.random()) - 1) for _ in range(requests)]
+    payload = 'x' * 100
+
+    variants = {
+        'sc unbounded': lambda: hash_map_sc.HashMap(11, hash),
+        'lru 1k entries': lambda: LRUHashMap(11, hash, max_entries=1_000),
+        'lru 10k entries': lambda: LRUHashMap(11, hash, max_entries=10_000),
+        'lru 1 MB': lambda: LRUHashMap(11, hash, max_bytes=1 << 20),
+    }
+
+    print(f"\nCache-aside over {requests} requests")
+    print(f"{'map':>16} {'size':>8} {'hit rate':>9} {'peak MB':>8} {'kops/s':>8}")
+    for label, factory in variants.items():
+        m = factory()
+        hits = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        for key in keys:
+            if m.get(key) is None:
+                m.put(key, payload + key)
+            else:
+                hits += 1
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:>16} {m.get_size():>8} {hits / requests:>9.1%} "
+              f"{peak / 2 ** 20:>8.1f} {requests / elapsed / 1e3:>8.0f}")
+        del m
+
+
+def bench_expiry(seconds=600, rate=500, ttl=(60, 300), sweep_every=60, seed=0) -> None:
+    """
+    Session store under a simulated clock: every second, rate sessions are
+    put with a random ttl. The periodic sweep stores (value, deadline) pairs
+    in a plain SC map and scans get_keys_and_values() every sweep_every
+    seconds to remove the stale ones. ExpiringHashMap reclaims them through
+    its timing wheel as time moves forward. Reported is the slowest simulated
+    second, puts included, and the total time. Both maps are sized up front
+    and the garbage collector is off, so neither resizes nor collections
+    show up as slow seconds.
+    """
+
+    rng = random.Random(seed)
+    ttls = [rng.uniform(*ttl) for _ in range(seconds * rate)]
+    capacity = int(rate * ttl[1] * 1.5)
+
+    class Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    def sweep() -> tuple:
+        m = hash_map_sc.HashMap(capacity, hash)
+        worst = total = 0.0
+        for second in range(seconds):
+            start = time.perf_counter()
+            for i in range(second * rate, (second + 1) * rate):
+                m.put('session' + str(i), (i, second + ttls[i]))
+            if second % sweep_every == 0:
+                pairs = m.get_keys_and_values()
+                for j in range(pairs.length()):
+                    key, (_, deadline) = pairs.get_at_index(j)
+                    if deadline <= second:
+                        m.remove(key)
+            elapsed = time.perf_counter() - start
+            worst, total = max(worst, elapsed), total + elapsed
+        return worst, total, m.get_size()
+
+    def wheel() -> tuple:
+        clock = Clock()
+        m = ExpiringHashMap(hash_map_sc.HashMap(capacity, hash), clock=clock)
+        worst = total = 0.0
+        for second in range(seconds):
+            clock.now = second
+            start = time.perf_counter()
+            for i in range(second * rate, (second + 1) * rate):
+                m.put('session' + str(i), i, ttl=ttls[i])
+            elapsed = time.perf_counter() - start
+            worst, total = max(worst, elapsed), total + elapsed
+        return worst, total, m.get_size()
+
+    print(f"\nExpiring {seconds * rate} sessions over {seconds} simulated seconds")
+    print(f"{'method':>14} {'worst second (ms)':>18} {'total (s)':>10} {'final size':>11}")
+    for label, run in (('sweep', sweep), ('timing wheel', wheel)):
+        gc.disable()
+        worst, total, size = run()
+        gc.enable()
+        gc.collect()
+        print(f"{label:>14} {worst * 1e3:>18.1f} {total:>10.2f} {size:>11}")
+
+
+def bench_mapped_open(count=200_000, lookups=1_000, function=fnv1a_hash) -> None:
+    """
+    Restart cost of a table of count pairs: replaying every put into an
+    in-memory OA map, against opening the same table as a MappedHashMap
+    file and answering lookups from it. Opening maps the file without
+    reading it, so its cost should not depend on count.
+    """
+
+    items = [('key' + str(i), {'id': i}) for i in range(count)]
+    probes = [key for key, _ in random.Random(0).sample(items, lookups)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table')
+        start = time.perf_counter()
+        MappedHashMap.from_items(path, items, function).close()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        m = hash_map_oa.HashMap(11, function, engine='compact')
+        for key, value in items:
+            m.put(key, value)
+        replay = time.perf_counter() - start
+        del m
+
+        start = time.perf_counter()
+        m = MappedHashMap.open(path, function)
+        opened = time.perf_counter() - start
+        lookup_us = _time_per_op(m.get, probes)
+        size = os.path.getsize(path)
+        m.close()
+
+    print(f"\nRestarting with {count} pairs ({size / 2 ** 20:.1f} MB file)")
+    print(f"{'build file (s)':>15} {'replay puts (s)':>16} {'open (ms)':>10} {'get (us)':>9}")
+    print(f"{build:>15.2f} {replay:>16.2f} {opened * 1e3:>10.2f} {lookup_us:>9.1f}")
+
+
+
+def bench_snapshot(count=100_000, function=fnv1a_hash) -> None:
+    """
+    Saving and loading a map of count pairs: pickling the whole map object,
+    against dump and load in the snapshot format, which store the cached
+    hashes so load places every entry without hashing a key or looking it
+    up.
+    """
+
+    maps = {
+        'sc': (hash_map_sc.HashMap(11, function), hash_map_sc.HashMap.load),
+        'oa compact': (hash_map_oa.HashMap(11, function, engine='compact'),
+                       hash_map_oa.HashMap.load),
+    }
+    values = [{'id': i} for i in range(count)]
+
+    print(f"\nSaving and loading {count} pairs")
+    print(f"{'map':<11} {'format':<9} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map')
+        for name, (m, load) in maps.items():
+            m.put_many(['key' + str(i) for i in range(count)], values)
+
+            start = time.perf_counter()
+            with open(path, 'wb') as file:
+                pickle.dump(m, file, pickle.HIGHEST_PROTOCOL)
+            save = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(path, 'rb') as file:
+                pickle.load(file)
+            loaded = time.perf_counter() - start
+            print(f"{name:<11} {'pickle':<9} {save:>9.2f} {loaded:>9.2f} "
+                  f"{os.path.getsize(path) / 2 ** 20:>10.1f}")
+
+            start = time.perf_counter()
+            m.dump(path)
+            save = time.perf_counter() - start
+            start = time.perf_counter()
+            load(path, function)
+            loaded = time.perf_counter() - start
+            print(f"{name:<11} {'snapshot':<9} {save:>9.2f} {loaded:>9.2f} "
+                  f"{os.path.getsize(path) / 2 ** 20:>10.1f}")
+
+
+def realistic_key_sets(count: int) -> dict:
+    """
+    Returns a few key sets that resemble production keys, count keys each.
+    """
+
+    rnd = random.Random(261)
+    return {
+        'sequential': ['str' + str(i) for i in range(count)],
+        'sessions': ['user:' + str(rnd.randrange(10 ** 7)) + ':session' for _ in range(count)],
+        'anagrams': [''.join(p) for p in itertools.islice(itertools.permutations('abcdefgh'), count)],
+        'uuids': ['%032x' % rnd.getrandbits(128) for _ in range(count)],
+        'urls': ['https://example.com/items/' + str(i % 500) + '?page=' + str(i // 500)
+                 for i in range(count)],
+    }
+
+
+def bench_hash_quality(count=2_000) -> None:
+    """
+    Loads every realistic key set into an SC map and a compact OA map with
+    each hash function, and reports:
+        var   - variance of the number of keys per SC bucket (1.0 is ideal
+                for a load factor of 1 with random hashing)
+        empty - empty_buckets() of the SC map
+        chain - longest SC chain
+        probe - longest OA probe distance
+        us    - time to hash one key
+    """
+
+    functions = {
+        'hash_function_1': hash_function_1,
+        'hash_function_2': hash_function_2,
+        'fnv1a_hash': fnv1a_hash,
+        'murmur3_hash': murmur3_hash,
+        'seeded_hash': seeded_hash(261),
+    }
+
+    print("\nHash function quality")
+    print(f"{'keys':>11} {'function':>16} {'var':>9} {'empty':>6} {'chain':>6} {'probe':>6} {'us':>6}")
+    for set_name, keys in realistic_key_sets(count).items():
+        for name, function in functions.items():
+            start = time.perf_counter()
+            hashes = [function(key) for key in keys]
+            hash_us = (time.perf_counter() - start) / len(keys) * 1e6
+
+            sc = hash_map_sc.HashMap(count, function)
+            oa = hash_map_oa.HashMap(count, function, engine='compact')
+            for key in keys:
+                sc.put(key, None)
+                oa.put(key, None)
+
+            counts = [0] * sc.get_capacity()
+            for hash_value in hashes:
+                counts[hash_value % sc.get_capacity()] += 1
+            mean = len(keys) / len(counts)
+            variance = sum((c - mean) ** 2 for c in counts) / len(counts)
+
+            print(f"{set_name:>11} {name:>16} {variance:>9.2f} {sc.empty_buckets():>6} "
+                  f"{max(counts):>6} {oa.probe_distance_stats()[0]:>6} {hash_us:>6.2f}")
+
+
+BENCHMARKS = {
+    'miss_latency': bench_miss_latency,
+    'memory_per_entry': bench_memory_per_entry,
+    'memory_footprint': bench_memory_footprint,
+    'sparse_tables': bench_sparse_tables,
+    'streaming_dump': bench_streaming_dump,
+    'load_policy': bench_load_policy,
+    'prime_capacity': bench_prime_capacity,
+    'load_factor': bench_load_factor,
+    'churn': bench_churn,
+    'resize_spikes': bench_resize_spikes,
+    'bulk_load': bench_bulk_load,
+    'batch_hashing': bench_batch_hashing,
+    'batch_ops': bench_batch_ops,
+    'concurrent': bench_concurrent,
+    'sharded': bench_sharded,
+    'shared_readers': bench_shared_readers,
+    'async_lag': bench_async_lag,
+    'lru_cache': bench_lru_cache,
+    'expiry': bench_expiry,
+    'mapped_open': bench_mapped_open,
+    'snapshot': bench_snapshot,
+    'hash_quality': bench_hash_quality,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
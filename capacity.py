@@ -0,0 +1,127 @@
+# Description: Capacity planning for the SC and OA HashMaps. Picking a prime
+# capacity used to mean trial division on every resize; here it is a bisect
+# over precomputed tables instead:
+#
+#   next_prime(c)  - smallest prime >= c, from a sieved table of small primes
+#                    with a deterministic Miller-Rabin fallback above it
+#   good_prime(c)  - smallest prime >= c from GOOD_PRIMES, primes that each
+#                    roughly double the previous one and sit as far as
+#                    possible from the neighbouring powers of two
+#   is_prime(c)    - deterministic Miller-Rabin, exact for any c < 3.3 * 10**24
+#
+# next_prime gives the same capacities as the _next_prime method of the
+# assignment skeleton, odd primes of at least 3, and LoadPolicy rounds every
+# capacity through this module. The skeleton's _next_prime and _is_prime are
+# kept unchanged in both maps as the assignment requires, but the maps no
+# longer call them.
+
+from bisect import bisect_left
+
+# Primes below this are sieved once at import and looked up with bisect
+SIEVE_LIMIT = 1 << 16
+
+# Each prime roughly doubles the previous one and lies near the middle of
+# two powers of two, so hash % capacity does not just keep the low bits
+GOOD_PRIMES = (
+    53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317,
+    196613, 393241, 786433, 1572869, 3145739, 6291469, 12582917, 25165843,
+    50331653, 100663319, 201326611, 402653189, 805306457, 1610612741,
+)
+
+# Miller-Rabin with the first few primes as bases is exact below each bound,
+# so small candidates get away with fewer rounds
+WITNESSES = (
+    (3_215_031_751, (2, 3, 5, 7)),
+    (3_474_749_660_383, (2, 3, 5, 7, 11, 13)),
+    (341_550_071_728_321, (2, 3, 5, 7, 11, 13, 17)),
+    (3_317_044_064_679_887_385_961_981, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)),
+)
+
+
+def _sieve(limit: int) -> tuple:
+    """Returns all primes below limit, in increasing order."""
+    is_composite = bytearray(limit)
+    primes = []
+    for n in range(2, limit):
+        if not is_composite[n]:
+            primes.append(n)
+            is_composite[n * n::n] = b'\x01' * len(range(n * n, limit, n))
+    return tuple(primes)
+
+
+SMALL_PRIMES = _sieve(SIEVE_LIMIT)
+
+# Candidates are divided by these before Miller-Rabin, which rules out most
+# composites far more cheaply
+TRIAL_PRIMES = SMALL_PRIMES[:50]
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean
+    """
+    if capacity < SIEVE_LIMIT:
+        index = bisect_left(SMALL_PRIMES, capacity)
+        return index < len(SMALL_PRIMES) and SMALL_PRIMES[index] == capacity
+    for prime in TRIAL_PRIMES:
+        if capacity % prime == 0:
+            return False
+
+    # Write capacity - 1 as d * 2**shift with d odd
+    d, shift = capacity - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        shift += 1
+
+    for bound, witnesses in WITNESSES:
+        if capacity < bound:
+            break
+    for witness in witnesses:
+        x = pow(witness, d, capacity)
+        if x == 1 or x == capacity - 1:
+            continue
+        for _ in range(shift - 1):
+            x = x * x % capacity
+            if x == capacity - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Returns the smallest odd prime number of at least capacity, so never
+    less than 3, the same as HashMap._next_prime.
+    """
+    if capacity < 3:
+        return 3
+    if capacity < SMALL_PRIMES[-1]:
+        return SMALL_PRIMES[bisect_left(SMALL_PRIMES, capacity)]
+    if capacity % 2 == 0:
+        capacity += 1
+    while not is_prime(capacity):
+        capacity += 2
+    return capacity
+
+
+def good_prime(capacity: int) -> int:
+    """
+    Returns the smallest prime in GOOD_PRIMES of at least capacity, or the
+    next prime if capacity is beyond the table.
+    """
+    index = bisect_left(GOOD_PRIMES, capacity)
+    if index < len(GOOD_PRIMES):
+        return GOOD_PRIMES[index]
+    return next_prime(capacity)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCapacity example 1")
+    print("------------------")
+    print([next_prime(c) for c in (0, 1, 2, 3, 11, 50, 100, SIEVE_LIMIT, 2 ** 31)])
+    print([good_prime(c) for c in (11, 50, 100, 1000, 2 ** 31)])
+    print(is_prime(2 ** 61 - 1), is_prime(2 ** 61 + 1), is_prime(3215031751))
@@ -0,0 +1,381 @@
+# Description: Thread-safe separate chaining HashMap for sharing one map
+# between threads, e.g. a cache used by every handler in a thread pool.
+#
+# Writers lock one of STRIPES locks, each guarding a contiguous range of
+# buckets, so writes to different parts of the table don't wait for each
+# other. Readers take no lock at all: a chain node is fully built before it
+# is published, and unlinking a node leaves its own next pointer intact, so
+# a reader walking a chain always reaches its end. A resize holds every
+# stripe, copies the nodes into a new table and then swaps the table in one
+# assignment; readers that already picked up the old table finish on it.
+
+
+import threading
+from operator import attrgetter
+
+from a6_include import (DynamicArray, ItemsView, KeysView, SLNode, ValuesView,
+                        hash_function_1, hash_function_2)
+from load_policy import LoadPolicy
+
+
+class ConcurrentHashMap:
+    # put resizes the table once the load factor reaches MAX_LOAD
+    MAX_LOAD = 1.0
+    # Default number of locks the buckets are split across
+    STRIPES = 16
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = STRIPES,
+                 policy: LoadPolicy = None) -> None:
+        """
+        Initialize new empty map with the given number of lock stripes.
+        policy is a LoadPolicy, as for hash_map_sc.HashMap.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        self._policy = policy if policy is not None else LoadPolicy()
+        if self._policy.max_load is not None:
+            self.MAX_LOAD = self._policy.max_load
+        self._policy.check(self.MAX_LOAD)
+
+        self._hash_function = function
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        # Live entries per stripe, each only changed under its own lock
+        self._counts = [0] * stripes
+
+        # Buckets are a plain list of chain heads (None when empty). Storing
+        # or reading one slot is atomic, which is all lock-free reads need.
+        capacity = self._policy.initial_capacity(capacity)
+        self._min_capacity = capacity
+        self._table = [None] * capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i, node in enumerate(self._table):
+            out += str(i) + ': '
+            while node is not None:
+                out += str(node) + ' -> '
+                node = node.next
+            out = out.removesuffix(' -> ') + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Writers running at the same time may or may not
+        be counted yet.
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return len(self._table)
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor: number of elements / number of buckets
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets
+        """
+        return self._table.count(None)
+
+    def _lock_bucket(self, hash_value: int) -> tuple[list, int, int]:
+        """
+        Acquires the stripe lock of the bucket hash_value maps to in the
+        current table, retrying if a resize swapped the table in the
+        meantime. Returns a tuple of (table, bucket index, stripe); the
+        caller must release self._locks[stripe].
+        """
+
+        locks = self._locks
+        while True:
+            table = self._table
+            index = hash_value % len(table)
+            stripe = index * len(locks) // len(table)
+            locks[stripe].acquire()
+            if table is self._table:
+                return table, index, stripe
+            locks[stripe].release()
+
+    @staticmethod
+    def _find_in(node: SLNode, key: str, hash_value: int) -> SLNode:
+        """
+        Returns the node holding key in the chain starting at node, or None.
+        """
+        while node is not None:
+            if node.hash == hash_value and node.key == key:
+                return node
+            node = node.next
+        return None
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates value at key. Grows the table first if the load
+        factor has reached MAX_LOAD.
+        """
+
+        if self.table_load() >= self.MAX_LOAD:
+            self._resize(grow=True)
+
+        self._put_hashed(key, value, self._hash_function(key), True)
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Inserts value at key unless the key is already present, as one
+        atomic step. Returns the value already stored, or None if value was
+        inserted.
+        """
+
+        if self.table_load() >= self.MAX_LOAD:
+            self._resize(grow=True)
+
+        return self._put_hashed(key, value, self._hash_function(key), False)
+
+    def _put_hashed(self, key: str, value: object, hash_value: int,
+                    replace: bool) -> object:
+        """
+        Inserts the pair, or updates the existing node if replace is True.
+        Returns the value the key had before, or None if it was inserted.
+        """
+
+        table, index, stripe = self._lock_bucket(hash_value)
+        try:
+            head = table[index]
+            node = self._find_in(head, key, hash_value)
+            if node is not None:
+                old_value = node.value
+                if replace:
+                    node.value = value
+                return old_value
+            # Publish the new node only once it is complete
+            table[index] = SLNode(key, value, head, hash_value)
+            self._counts[stripe] += 1
+            return None
+        finally:
+            self._locks[stripe].release()
+
+    def get(self, key: str):
+        """
+        Returns the value of key, or None if it isn't in the map. Takes no
+        lock.
+        """
+
+        hash_value = self._hash_function(key)
+        table = self._table
+        node = self._find_in(table[hash_value % len(table)], key, hash_value)
+        if node is not None:
+            return node.value
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the map, otherwise False. Takes no lock.
+        """
+
+        hash_value = self._hash_function(key)
+        table = self._table
+        return self._find_in(table[hash_value % len(table)], key, hash_value) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the map, if present. The node is
+        unlinked from its predecessor but keeps its own next pointer, so
+        readers standing on it can still walk to the end of the chain.
+        """
+
+        hash_value = self._hash_function(key)
+        table, index, stripe = self._lock_bucket(hash_value)
+        try:
+            previous, node = None, table[index]
+            while node is not None:
+                if node.hash == hash_value and node.key == key:
+                    break
+                previous, node = node, node.next
+            else:
+                return
+            if previous is None:
+                table[index] = node.next
+            else:
+                previous.next = node.next
+            self._counts[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+        if self.table_load() < self._policy.min_load:
+            self._resize(grow=False)
+
+    def _resize(self, grow: bool) -> None:
+        """
+        Grows the table by the policy's growth factor, or shrinks it by its
+        shrink factor but never below the starting capacity. Both checks are
+        repeated under all stripe locks, since another thread may have
+        resized the table while this one was waiting for them.
+        """
+
+        with _AllStripes(self._locks):
+            capacity = self.get_capacity()
+            if grow:
+                if self.table_load() < self.MAX_LOAD:
+                    return
+                self._rehash(self._policy.grow(capacity))
+            elif self.table_load() < self._policy.min_load and capacity > self._min_capacity:
+                self._rehash(max(self._policy.shrink(capacity), self._min_capacity))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes table, but only to a prime number (or a power of two, if the
+        policy says so) and never to a load factor above MAX_LOAD
+        """
+
+        if new_capacity < 1:
+            return
+        with _AllStripes(self._locks):
+            self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Copies every node into a new table and swaps it in. The caller holds
+        all stripe locks. Nodes are copied rather than relinked because
+        readers may still be walking the old chains.
+        """
+
+        size = self.get_size()
+        new_capacity = self._policy.round_capacity(new_capacity)
+        while size / new_capacity > self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+
+        new_table = [None] * new_capacity
+        counts = [0] * len(self._locks)
+        for node in self._table:
+            while node is not None:
+                index = node.hash % new_capacity
+                new_table[index] = SLNode(node.key, node.value, new_table[index], node.hash)
+                counts[index * len(counts) // new_capacity] += 1
+                node = node.next
+
+        # Stripes cover different buckets in the new table
+        self._counts = counts
+        self._table = new_table
+
+    def clear(self) -> None:
+        """
+        Removes every key from the map
+        """
+
+        with _AllStripes(self._locks):
+            self._counts = [0] * len(self._locks)
+            self._table = [None] * len(self._table)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a DynamicArray containing all key-value pairs as tuples.
+        """
+
+        ret_arr = DynamicArray()
+        for pair in self._iterate(attrgetter('key', 'value')):
+            ret_arr.append(pair)
+        return ret_arr
+
+    def keys(self):
+        """
+        Returns a live view of the keys in the map, in bucket order.
+        """
+
+        return KeysView(self, attrgetter('key'))
+
+    def values(self):
+        """
+        Returns a live view of the values in the map, in bucket order.
+        """
+
+        return ValuesView(self, attrgetter('value'))
+
+    def items(self):
+        """
+        Returns a live view of the (key, value) pairs in the map, in bucket
+        order.
+        """
+
+        return ItemsView(self, attrgetter('key', 'value'))
+
+    def _iterate(self, read: callable):
+        """
+        Yields read(node) for every node of the table as it was when the
+        iteration started. Unlike the single-threaded maps this never
+        raises: keys added or removed by other threads meanwhile may or may
+        not be seen, but every key present throughout is yielded once.
+        """
+
+        for node in self._table:
+            while node is not None:
+                yield read(node)
+                node = node.next
+
+
+class _AllStripes:
+    """
+    Context manager holding every stripe lock, always taken in the same
+    order so two threads resizing at once can't deadlock.
+    """
+
+    def __init__(self, locks: tuple) -> None:
+        """Remember the locks to take."""
+        self._locks = locks
+
+    def __enter__(self) -> None:
+        """Acquire all locks in order."""
+        for lock in self._locks:
+            lock.acquire()
+
+    def __exit__(self, *exc_info) -> None:
+        """Release all locks."""
+        for lock in reversed(self._locks):
+            lock.release()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nConcurrent example 1")
+    print("--------------------")
+    m = ConcurrentHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    m.remove('str0')
+    print(m.get('str1'), m.contains_key('str0'), m.put_if_absent('str1', 0),
+          m.put_if_absent('str0', 0), m.get_size())
+
+    print("\nConcurrent example 2")
+    print("--------------------")
+    m = ConcurrentHashMap(11, hash_function_2, stripes=8)
+
+    def worker(thread: int) -> None:
+        for i in range(2000):
+            m.put(f'{thread}-{i}', i)
+            if i % 3 == 0:
+                m.remove(f'{thread}-{i // 2}')
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = {f'{t}-{i}' for t in range(8) for i in range(2000)}
+    expected -= {f'{t}-{i // 2}' for t in range(8) for i in range(0, 2000, 3)}
+    print(m.get_size() == len(expected), set(m.keys()) == expected,
+          all(m.get(key) == int(key.split('-')[1]) for key in expected),
+          m.table_load() <= m.MAX_LOAD)
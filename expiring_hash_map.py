@@ -0,0 +1,297 @@
+# Description: Time-to-live front end for the SC and OA HashMaps. An
+# ExpiringHashMap wraps one map and adds put(key, value, ttl=...):
+#
+#   - every entry is stored in the wrapped map as a (value, deadline) pair,
+#     with a deadline of None for entries that never expire
+#   - get, contains_key and the views hide entries whose deadline has
+#     passed, so an expired entry is never returned, even before it is
+#     reclaimed
+#   - every call first advances a TimingWheel to the current time and
+#     reclaims the entries that came due with the wrapped map's own remove,
+#     which unlinks them from their chain in an SC map and leaves a
+#     tombstone (or shifts the cluster back, for Robin Hood) in an OA map
+#
+# Reclaiming costs amortized O(1) per expiring entry, spread over the calls
+# that move time forward, instead of a periodic sweep of the whole table.
+# Overwriting or removing a key leaves its old timer in the wheel; when
+# that timer comes due the deadline no longer matches and it is ignored.
+
+
+import math
+import time
+from operator import itemgetter
+
+from a6_include import (DynamicArray, ItemsView, KeysView, ValuesView,
+                        hash_function_1)
+import hash_map_oa
+import hash_map_sc
+from timing_wheel import TimingWheel
+
+
+class ExpiringHashMap:
+
+    def __init__(self, hash_map, tick: float = 1.0,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Wraps hash_map, which from now on must only be used through this
+        object. tick is the resolution of the timing wheel in seconds:
+        expired entries are hidden right away, but reclaimed within one tick
+        of their deadline. clock returns the current time in seconds.
+        """
+        if tick <= 0:
+            raise ValueError("tick must be positive")
+
+        self._map = hash_map
+        self._tick = tick
+        self._clock = clock
+        self._wheel = TimingWheel(int(clock() / tick))
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Entries that expired during the current tick
+        are counted until the wheel reclaims them.
+        """
+        self._expire(self._clock())
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """Returns the load factor of the map"""
+        return self._map.table_load()
+
+    def get_timer_count(self) -> int:
+        """
+        Returns the number of timers in the wheel, including those left
+        behind by overwritten or removed keys.
+        """
+        return len(self._wheel)
+
+    def _expire(self, now: float) -> int:
+        """
+        Advances the wheel to now and removes the entries that came due.
+        Returns the number of entries removed.
+        """
+
+        due = self._wheel.advance(int(now / self._tick))
+        removed = 0
+        for key, deadline in due:
+            entry = self._map.get(key)
+            # Skip timers of keys that were removed or put again since
+            if entry is None or entry[1] != deadline:
+                continue
+            if deadline <= now:
+                self._map.remove(key)
+                removed += 1
+            else:
+                # Came due early through rounding of deadline / tick
+                self._schedule(key, deadline)
+        return removed
+
+    def expire(self) -> int:
+        """
+        Reclaims every entry due by now and returns how many there were.
+        Every other call does this too; calling it from an idle loop keeps
+        memory down when the map is not used for a while.
+        """
+        return self._expire(self._clock())
+
+    def _schedule(self, key: str, deadline: float) -> None:
+        """
+        Adds a timer for key in the tick its deadline falls in, or the one
+        after if it falls between two ticks.
+        """
+        self._wheel.schedule((key, deadline), math.ceil(deadline / self._tick))
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Inserts or updates value at key. With a ttl the entry expires ttl
+        seconds from now; without one it never does. Putting a key again
+        replaces its ttl as well as its value.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        if ttl is None:
+            self._map.put(key, (value, None))
+            return
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        deadline = now + ttl
+        self._map.put(key, (value, deadline))
+        self._schedule(key, deadline)
+
+    def put_many(self, keys, values, ttl: float = None) -> None:
+        """
+        Puts keys[i] -> values[i] for every i, all with the same ttl, using
+        the wrapped map's put_many.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        keys = list(keys)
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        deadline = None if ttl is None else now + ttl
+        self._map.put_many(keys, [(value, deadline) for value in values])
+        if deadline is not None:
+            for key in keys:
+                self._schedule(key, deadline)
+
+    def _live(self, entry, now: float) -> bool:
+        """
+        Returns True if entry is a stored pair that has not expired by now.
+        """
+        return entry is not None and (entry[1] is None or entry[1] > now)
+
+    def get(self, key: str):
+        """
+        Returns the value of key, or None if it isn't in the map or has
+        expired
+        """
+
+        now = self._clock()
+        self._expire(now)
+        entry = self._map.get(key)
+        if self._live(entry, now):
+            return entry[0]
+        return None
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of every key, or None for keys that are
+        not in the map or have expired.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        return [entry[0] if self._live(entry, now) else None
+                for entry in self._map.get_many(list(keys))]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the map and has not expired, otherwise
+        False
+        """
+
+        now = self._clock()
+        self._expire(now)
+        return self._live(self._map.get(key), now)
+
+    def get_ttl(self, key: str):
+        """
+        Returns the seconds key has left, or None if it never expires. Raises
+        KeyError if key isn't in the map or has expired.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        entry = self._map.get(key)
+        if not self._live(entry, now):
+            raise KeyError(key)
+        return None if entry[1] is None else entry[1] - now
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the map, if present.
+        """
+
+        self._expire(self._clock())
+        self._map.remove(key)
+
+    def clear(self) -> None:
+        """
+        Empties the map and drops every timer
+        """
+
+        self._map.clear()
+        self._wheel.clear()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a DynamicArray containing all key-value pairs that have not
+        expired, as tuples.
+        """
+
+        ret_arr = DynamicArray()
+        for pair in self._iterate(itemgetter(0, 1)):
+            ret_arr.append(pair)
+        return ret_arr
+
+    def keys(self):
+        """
+        Returns a live view of the keys that have not expired.
+        """
+
+        return KeysView(self, itemgetter(0))
+
+    def values(self):
+        """
+        Returns a live view of the values of the keys that have not expired.
+        """
+
+        return ValuesView(self, itemgetter(1))
+
+    def items(self):
+        """
+        Returns a live view of the (key, value) pairs that have not expired.
+        """
+
+        return ItemsView(self, itemgetter(0, 1))
+
+    def _iterate(self, read: callable):
+        """
+        Yields read((key, value)) for every pair of the wrapped map that has
+        not expired when the iteration starts. The wrapped map raises
+        RuntimeError if it is changed while the iteration is running.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        for key, (value, deadline) in self._map.items():
+            if deadline is None or deadline > now:
+                yield read((key, value))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    class Clock:
+        """Fake clock moved forward by hand."""
+
+        def __init__(self) -> None:
+            """Start at time 0."""
+            self.now = 0.0
+
+        def __call__(self) -> float:
+            """Return the current time."""
+            return self.now
+
+    print("\nExpiring example 1")
+    print("------------------")
+    clock = Clock()
+    m = ExpiringHashMap(hash_map_sc.HashMap(53, hash_function_1), clock=clock)
+    for i in range(150):
+        m.put('str' + str(i), i * 100, ttl=10 + i % 3 * 50)
+    m.put('forever', 'still here')
+    clock.now = 30.5
+    print(m.get('str0'), m.contains_key('str1'), m.get_size(), m.get_ttl('str1'))
+    clock.now = 200
+    print(m.get_size(), m.get('forever'), sorted(m.keys()), m.get_timer_count())
+
+    print("\nExpiring example 2")
+    print("------------------")
+    clock = Clock()
+    m = ExpiringHashMap(hash_map_oa.HashMap(11, hash, engine='compact'), tick=0.5, clock=clock)
+    m.put_many(['session' + str(i) for i in range(1000)], range(1000), ttl=60)
+    for i in range(0, 1000, 2):
+        m.put('session' + str(i), -i, ttl=120)
+    clock.now = 90
+    print(m.get_size(), m.get('session1'), m.get('session2'), m._map.get_tombstone_count())
+    clock.now = 121
+    print(m.expire(), m.get_size(), m.get_timer_count())
@@ -0,0 +1,120 @@
+# Description: Better distributed hash functions for the SC and OA HashMaps.
+# hash_function_1 and hash_function_2 in a6_include.py only add up character
+# codes, so anagrams collide and similar keys land in a narrow range. The
+# functions here can be passed to either HashMap in their place:
+#
+#   fnv1a_hash      - 64-bit FNV-1a over the UTF-8 bytes of the key
+#   murmur3_hash    - 32-bit MurmurHash3 (x86_32), a stronger bit mixer
+#   seeded_hash()   - returns a fast function built on the built-in hash(),
+#                     mixed with a per-map seed
+
+import random
+import struct
+
+MASK_32 = 0xFFFFFFFF
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+FNV_OFFSET_64 = 0xCBF29CE484222325
+FNV_PRIME_64 = 0x100000001B3
+
+MURMUR_C1 = 0xCC9E2D51
+MURMUR_C2 = 0x1B873593
+
+# 2**64 / golden ratio, an odd constant that spreads bits well when multiplied
+GOLDEN_64 = 0x9E3779B97F4A7C15
+
+
+def _encode(key: str) -> bytes:
+    """Encode a key to bytes; lone surrogates are kept instead of raising."""
+    return key.encode('utf-8', 'surrogatepass')
+
+
+def fnv1a_hash(key: str) -> int:
+    """64-bit FNV-1a hash of the UTF-8 bytes of key"""
+    hash = FNV_OFFSET_64
+    for byte in _encode(key):
+        hash ^= byte
+        hash = (hash * FNV_PRIME_64) & MASK_64
+    return hash
+
+
+def murmur3_hash(key: str, seed: int = 0) -> int:
+    """32-bit MurmurHash3 (x86_32 variant) of the UTF-8 bytes of key"""
+    data = _encode(key)
+    length = len(data)
+    hash = seed & MASK_32
+
+    # Body: mix in 4 bytes at a time
+    block_end = length - length % 4
+    for (k,) in struct.iter_unpack('<I', data[:block_end]):
+        k = (k * MURMUR_C1) & MASK_32
+        k = ((k << 15) | (k >> 17)) & MASK_32
+        k = (k * MURMUR_C2) & MASK_32
+        hash ^= k
+        hash = ((hash << 13) | (hash >> 19)) & MASK_32
+        hash = (hash * 5 + 0xE6546B64) & MASK_32
+
+    # Tail: the last 1 to 3 bytes
+    tail = data[block_end:]
+    if tail:
+        k = 0
+        for shift, byte in enumerate(tail):
+            k |= byte << (8 * shift)
+        k = (k * MURMUR_C1) & MASK_32
+        k = ((k << 15) | (k >> 17)) & MASK_32
+        k = (k * MURMUR_C2) & MASK_32
+        hash ^= k
+
+    # Finalization mix forces all bits to avalanche
+    hash ^= length
+    hash ^= hash >> 16
+    hash = (hash * 0x85EBCA6B) & MASK_32
+    hash ^= hash >> 13
+    hash = (hash * 0xC2B2AE35) & MASK_32
+    hash ^= hash >> 16
+    return hash
+
+
+def seeded_hash(seed: int = None) -> callable:
+    """
+    Returns a hash function that mixes the built-in hash() of a key with
+    seed. The built-in hash runs in C and caches its result on str objects,
+    so this is by far the fastest option. Give every map its own seed (a
+    random one is picked when seed is None) so keys that collide in one map
+    don't collide the same way in the others. Results are non-negative
+    64-bit ints, but they are only stable within one process unless
+    PYTHONHASHSEED is fixed.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    seed &= MASK_64
+
+    def hash_with_seed(key: str) -> int:
+        mixed = ((hash(key) ^ seed) * GOLDEN_64) & MASK_64
+        # Fold the well-mixed high bits into the low bits used by %
+        return mixed ^ (mixed >> 32)
+
+    hash_with_seed.seed = seed
+    return hash_with_seed
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nHash function example 1")
+    print("-----------------------")
+    for key in ('', 'hello', 'listen', 'silent'):
+        print(repr(key), fnv1a_hash(key), murmur3_hash(key))
+
+    print("\nHash function example 2")
+    print("-----------------------")
+    from hash_map_sc import HashMap
+    m = HashMap(53, murmur3_hash)
+    for word in ('listen', 'silent', 'enlist', 'tinsel', 'inlets'):
+        m.put(word, len(word))
+    print(m.get_size(), m.empty_buckets(), m.get('tinsel'))
+
+    m = HashMap(53, seeded_hash(7))
+    m.put('key1', 10)
+    print(m.get('key1'), m.contains_key('key2'))
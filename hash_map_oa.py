@@ -7,241 +7,1794 @@
 # underlying data structure. Implementation uses open addressing with quadratic
 # probing to perform hash calculations.
 
+import sys
+from array import array
+
 from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+                        ItemsView, KeysView, SlottedDynamicArray,
+                        SlottedHashEntry, ValuesView, group_positions,
+                        hash_function_1, hash_function_2, hash_many)
+from load_policy import LoadPolicy
+from snapshot import KIND_OA, PICKLE, Codec, read_snapshot, write_snapshot
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # put resizes the table once the load factor reaches MAX_LOAD
+    MAX_LOAD = 0.5
+    # Number of old buckets migrated by each operation during an incremental resize
+    MIGRATE_BUCKETS = 16
+    # Engines without incremental resizing never have an old table
+    _old_buckets = None
+    # Bumped by every structural change (insert, removal, resize, clear) so
+    # iterators can detect that the map changed under them
+    _mod_count = 0
+    # Number of tombstones in the current table. Engines that delete without
+    # tombstones leave it at 0.
+    _tombstones = 0
+    # Quadratic probing only visits enough slots of a prime capacity, and is
+    # only sure to find a free one while the table is at most half full, so
+    # this engine rejects power-of-two policies and a max_load above 0.5
+    ALLOWS_POWER_OF_TWO = False
+
+    def __new__(cls, *args, engine: str = None, **kwargs):
+        """
+        Picks the storage engine at construction time, for example
+        HashMap(53, hash_function_1, engine='compact'). Without an engine
+        the class that was called is used. incremental and slotted only
+        exist for the 'entry' engine; other engines reject them here.
+        """
+        if engine is not None:
+            if engine not in ENGINES:
+                raise ValueError(f"Unknown engine {engine!r}, expected one of {list(ENGINES)}")
+            cls = ENGINES[engine]
+        options = [name for name in ('incremental', 'slotted') if name in kwargs]
+        if options and issubclass(cls, CompactHashMap):
+            raise ValueError(f"Only the 'entry' engine supports {' and '.join(options)}, "
+                             f"not {cls.__name__}")
+        return super().__new__(cls)
+
+    def __init__(self, capacity: int, function, engine: str = None,
+                 incremental: bool = False, slotted: bool = False,
+                 policy: LoadPolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
+        quadratic probing for collision resolution.
+        engine picks the storage engine, see __new__. incremental and slotted
+        are options of the 'entry' engine only.
+        With incremental=True, growth triggered by put does not rehash the
+        whole table at once. Instead, both bucket arrays stay live and every
+        following operation migrates MIGRATE_BUCKETS old buckets.
+        With slotted=True, the bucket array and entries are built from the
+        __slots__ classes in a6_include, which have no per-instance __dict__.
+        policy is a LoadPolicy that sets when and by how much the table grows
+        and shrinks.
+        """
+        # Classes used to build the bucket array and entries
+        self._array_class = SlottedDynamicArray if slotted else DynamicArray
+        self._entry_class = SlottedHashEntry if slotted else HashEntry
+
+        self._buckets = self._array_class()
+
+        # capacity must be a prime number
+        self._set_policy(policy)
+        self._capacity = self._policy.initial_capacity(capacity)
+        self._min_capacity = self._capacity
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = function
+        self._size = 0
+
+        self._incremental = incremental
+        # Old table while an incremental resize is in progress, otherwise None
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        self._finish_resize()
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        DO NOT CHANGE THIS METHOD IN ANY WAY
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
         DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _probe(self, key: str, hash_value: int,
+               buckets: DynamicArray = None) -> tuple[int, int]:
+        """
+        Probe engine shared by put, get, contains_key and remove. Walks the
+        quadratic probe sequence for the key and stops at the first truly
+        empty (None) bucket, since the key can't be stored past it. Tombstones
+        are stepped over, but the first one seen is remembered so put can
+        reuse it. hash_value is the key's hash, computed once by the caller;
+        entries with a different cached hash are skipped without comparing
+        keys. Probes the current table unless buckets is given. Returns a
+        tuple of (index of the live entry holding key or -1, index of the
+        first free bucket or -1).
+        """
+
+        if buckets is None:
+            buckets = self._buckets
+        capacity = buckets.length()
+        free_index = -1
+
+        # Quadratic offsets are reached by adding the odd numbers 1, 3, 5...
+        # so each step costs an addition instead of a square and a modulo
+        hash_index = hash_value % capacity
+        index = 0
+        while index < capacity:
+            element = buckets.get_at_index(hash_index)
+            if element is None:
+                # Empty bucket ends the probe sequence
+                if free_index == -1:
+                    free_index = hash_index
+                return -1, free_index
+            if element.is_tombstone:
+                # Keep probing, the key may live further along the sequence
+                if free_index == -1:
+                    free_index = hash_index
+            elif element.hash == hash_value and element.key == key:
+                return hash_index, free_index
+            index = index + 1
+            # Step from offset (index - 1) ** 2 to index ** 2
+            hash_index += 2 * index - 1
+            if hash_index >= capacity:
+                hash_index %= capacity
+
+        return -1, free_index
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash of key the way this engine stores it.
+        """
+        return self._hash_function(key)
+
+    def _set_policy(self, policy: LoadPolicy) -> None:
+        """
+        Applies a LoadPolicy, or the default one if policy is None. Its
+        max_load replaces MAX_LOAD for this map.
+        """
+
+        self._policy = policy if policy is not None else LoadPolicy()
+        if self._policy.power_of_two and not self.ALLOWS_POWER_OF_TWO:
+            raise ValueError(f"{type(self).__name__} needs prime capacities, use the "
+                             f"'robin_hood' or 'swiss' engine for powers of two")
+        if (not self.ALLOWS_POWER_OF_TWO and self._policy.max_load is not None
+                and self._policy.max_load > 0.5):
+            raise ValueError(f"{type(self).__name__} probes quadratically and needs "
+                             f"max_load <= 0.5")
+        if self._policy.max_load is not None:
+            self.MAX_LOAD = self._policy.max_load
+        self._policy.check(self.MAX_LOAD)
+
+    def _maybe_shrink(self) -> None:
+        """
+        Shrinks the table by the policy's shrink factor once the load factor
+        drops below its min_load, but never below the starting capacity.
+        """
+
+        min_load = self._policy.min_load
+        if (min_load and self._size < min_load * self._capacity
+                and self._capacity > self._min_capacity):
+            self.resize_table(max(self._policy.shrink(self._capacity), self._min_capacity))
+
+    def _find(self, key: str, hash_value: int) -> int:
+        """
+        Returns the bucket holding the live entry for key, or -1 if the key is
+        not in the map. Every engine provides this lookup primitive.
+        """
+        self._finish_resize()
+        return self._probe(key, hash_value)[0]
+
+    def _find_entry(self, key: str, hash_value: int) -> HashEntry:
+        """
+        Returns the live entry for key or None. While an incremental resize is
+        running, keys that have not been migrated yet are found in the old table.
+        """
+
+        found_index, _ = self._probe(key, hash_value)
+        if found_index != -1:
+            return self._buckets.get_at_index(found_index)
+        if self._old_buckets is not None:
+            found_index, _ = self._probe(key, hash_value, self._old_buckets)
+            if found_index != -1:
+                return self._old_buckets.get_at_index(found_index)
+        return None
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the hashes of all keys, computed in one pass. Uses the NumPy
+        batch variant of the hash function when there is one.
+        """
+        return hash_many(self._hash_function, keys)
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once, if needed, so count more entries fit under
+        MAX_LOAD. If they only fit once tombstones are cleared, the table is
+        compacted instead.
+        """
+        self._finish_resize()
+        needed = self._capacity_for(self._size + count)
+        if needed > self._capacity:
+            # Grow at least geometrically, so a stream of small batches
+            # doesn't rehash the whole table for every batch
+            self.resize_table(max(needed, self._policy.grow(self._capacity)))
+        elif self._capacity_for(self._size + self._tombstones + count) > self._capacity:
+            self.compact()
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the smallest allowed capacity that holds count entries while
+        staying under MAX_LOAD.
+        """
+        return self._policy.round_capacity(int(count / self.MAX_LOAD) + 1)
+
+    @classmethod
+    def from_items(cls, iterable, function, **kwargs) -> "HashMap":
+        """
+        Builds a new map from an iterable of (key, value) pairs (or anything
+        with an items() method) in one pass. The table is sized once for all
+        the pairs, so there are no intermediate resizes. Extra keyword
+        arguments such as engine are passed to the constructor.
+        """
+
+        items = list(iterable.items() if hasattr(iterable, 'items') else iterable)
+        m = cls(1, function, **kwargs)
+        m.update(items)
+        return m
+
+    def update(self, iterable) -> None:
+        """
+        Puts every (key, value) pair from iterable (or anything with an items()
+        method) into the map. When a key repeats, the last value wins. The
+        table grows at most once, to the next capacity that fits all the
+        pairs under MAX_LOAD. Keys are then hashed in one batch and placed
+        without any further load checks.
+        """
+
+        items = iterable.items() if hasattr(iterable, 'items') else iterable
+        if not isinstance(items, list):
+            items = list(items)
+        self.put_many([key for key, _ in items], [value for _, value in items])
+
+    def put_many(self, keys, values) -> None:
+        """
+        Puts keys[i] -> values[i] for every i. The table is grown at most
+        once, all keys are hashed in one batch, and the pairs are placed
+        without further load checks.
+        """
+
+        keys = list(keys)
+        if not keys:
+            return
+
+        self._reserve(len(keys))
+        put_hashed = self._put_hashed
+        for key, value, hash_value in zip(keys, values, self._hash_many(keys)):
+            put_hashed(key, value, hash_value)
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of every key, or None for keys that are
+        not in the map. All keys are hashed in one batch first.
+        """
+
+        keys = list(keys)
+        if self._size == 0:
+            return [None] * len(keys)
+
+        return self._values_at(self._locate_many(keys))
+
+    def contains_many(self, keys) -> list:
+        """
+        Returns a list with True for every key that is in the map and False
+        for every key that is not.
+        """
+
+        keys = list(keys)
+        if self._size == 0:
+            return [False] * len(keys)
+
+        return [index != -1 for index in self._locate_many(keys)]
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes every key from the map. Returns a list with True for each key
+        that was removed, and False for keys that were missing (or repeated).
+        """
+
+        keys = list(keys)
+        if self._size == 0:
+            return [False] * len(keys)
+
+        removed, seen = [], set()
+        for index in self._locate_many(keys):
+            if index == -1 or index in seen:
+                removed.append(False)
+            else:
+                seen.add(index)
+                self._remove_at(index)
+                removed.append(True)
+
+        self._maybe_shrink()
+        return removed
+
+    def _locate_many(self, keys: list) -> list:
+        """
+        Returns the bucket of every key, or -1 for keys not in the map. All keys
+        are hashed first and grouped by the start of their probe sequence.
+        Keys with the same start share the same sequence, so each sequence is
+        walked once for the whole group.
+        """
+
+        self._finish_resize()
+        hashes = self._hash_many(keys)
+        buckets, capacity = self._buckets, self._capacity
+
+        found = [-1] * len(keys)
+        for start, group in group_positions(hashes, capacity).items():
+            if group.__class__ is int:
+                found[group] = self._probe(keys[group], hashes[group])[0]
+                continue
+
+            wanted = {}
+            for position in group:
+                wanted.setdefault(keys[position], []).append(position)
+            index = 0
+            while wanted and index < capacity:
+                hash_index = (start + index * index) % capacity
+                element = buckets.get_at_index(hash_index)
+                if element is None:
+                    break
+                if not element.is_tombstone and element.key in wanted:
+                    for position in wanted.pop(element.key):
+                        found[position] = hash_index
+                index = index + 1
+        return found
+
+    def _values_at(self, indices: list) -> list:
+        """
+        Returns the value in each listed bucket, or None where the index is -1.
+        """
+        get_at_index = self._buckets.get_at_index
+        return [None if index == -1 else get_at_index(index).value for index in indices]
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Removes the live entry in the bucket at index by making it a tombstone.
+        """
+        self._buckets.get_at_index(index).is_tombstone = True
+        self._size -= 1
+        self._tombstones += 1
+        self._mod_count += 1
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Starts an incremental resize. Allocating the new bucket array only
+        costs a list of None; entries are moved by _migrate_step.
+        """
+
+        if self._old_buckets is not None:
+            self._finish_resize()
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._buckets = self._array_class([None] * new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._mod_count += 1
+        self._migrate_index = 0
+
+    def _migrate_step(self) -> None:
+        """
+        Moves the live entries of the next MIGRATE_BUCKETS old buckets into
+        the new table. Migrated buckets are replaced with the MOVED tombstone
+        so probe sequences in the old table still run past them. Ends the
+        resize once every old bucket has been visited.
+        """
+
+        old_buckets = self._old_buckets
+        stop = min(self._migrate_index + self.MIGRATE_BUCKETS, self._old_capacity)
+        for i in range(self._migrate_index, stop):
+            element = old_buckets.get_at_index(i)
+            if element is not None:
+                if not element.is_tombstone:
+                    self._place(element)
+                old_buckets.set_at_index(i, MOVED)
+        self._migrate_index = stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_resize(self) -> None:
+        """
+        Completes an incremental resize that is in progress.
+        """
+
+        while self._old_buckets is not None:
+            self._migrate_step()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map. If the given key already exists in
+        the hash map, its associated value must be replaced with the new value. If the
+        given key is not in the hash map, a new key/value pair is added.
+        """
+
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        # Check load factor, resize table if needed. Tombstones also lengthen
+        # probes, so they count toward the load. If live entries alone are
+        # under half the limit, rebuilding in place is enough to clear them.
+        if self.occupied_load() >= self.MAX_LOAD:
+            if self.table_load() < self.MAX_LOAD / 2:
+                self.compact()
+            elif self._incremental:
+                self._begin_resize(self._policy.grow(self.get_capacity()))
+            else:
+                self.resize_table(self._policy.grow(self.get_capacity()))
+
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known, without
+        checking the load factor. Used by put and by the bulk loaders, which
+        size the table up front.
+        """
+
+        found_index, free_index = self._probe(key, hash_value)
+        if found_index != -1:
+            # Update existing element
+            self._buckets.get_at_index(found_index).value = value
+            return
+
+        if self._old_buckets is not None:
+            found_index, _ = self._probe(key, hash_value, self._old_buckets)
+            if found_index != -1:
+                # Not migrated yet, update it in the old table
+                self._old_buckets.get_at_index(found_index).value = value
+                return
+
+        if free_index == -1:
+            # Quadratic probing only reaches half the buckets, so a table run
+            # above 0.5 load can miss every free one. Grow and try again.
+            self.resize_table(self._policy.grow(self.get_capacity()))
+            self.put(key, value)
+            return
+
+        # Insert new element in the first blank space or tombstone
+        # HashEntry() sets tombstone to False by default
+        if self._buckets.get_at_index(free_index) is not None:
+            self._tombstones -= 1
+        self._buckets.set_at_index(free_index, self._entry_class(key, value, hash_value))
+        self._size += 1
+        self._mod_count += 1
+
+    def _place(self, entry: HashEntry) -> None:
+        """
+        Moves an existing entry into the first empty bucket of its probe
+        sequence using the entry's cached hash. Only used while rebuilding a
+        table, where keys are known to be unique and there are no tombstones.
+        """
+
+        buckets, capacity = self._buckets, self._capacity
+        hash_index = entry.hash % capacity
+        index = 0
+        while True:
+            if buckets.get_at_index(hash_index) is None:
+                buckets.set_at_index(hash_index, entry)
+                return
+            index = index + 1
+            # Step from offset (index - 1) ** 2 to index ** 2
+            hash_index += 2 * index - 1
+            if hash_index >= capacity:
+                hash_index %= capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Updates the capacity of the underlying table. All key/pair values are
+        rehashed and copied to the new table. Tombstones are dropped.
+        """
+
+        # Check if new_capacity is valid and ensure it is prime
+        if new_capacity < self._size:
+            return
+
+        self._finish_resize()
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+
+        # Keep doubling until the load factor stays below MAX_LOAD once every
+        # element is re-added, exactly like re-adding them through put would
+        while (self._size - 1) / new_capacity >= self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+
+        # Save the old table data
+        old_buckets = self._buckets
+        old_capacity = self._capacity
+
+        # Initialize new table using dynamic array as underlying data structure
+        self._buckets = self._array_class()
+        for _ in range(new_capacity):
+            self._buckets.append(None)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._mod_count += 1
+
+        # Move each live entry into the new table, reusing its cached hash
+        for i in range(old_capacity):
+            element = old_buckets.get_at_index(i)
+            if element is not None and not element.is_tombstone:
+                self._place(element)
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the load factor of our table
+        Load factor = total number of elements in the table/number of buckets
+        """
+
+        return self.get_size() / self.get_capacity()
+
+    def occupied_load(self) -> float:
+        """
+        Returns the share of buckets that are not empty: live entries plus
+        tombstones over the capacity. put resizes or compacts the table once
+        this reaches MAX_LOAD, since tombstones lengthen probes too.
+        """
+
+        return (self._size + self._tombstones) / self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """
+        Returns the number of tombstones in the table.
+        """
+
+        self._finish_resize()
+        return self._tombstones
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets. In the hash_map_sc implementation,
+        this was how many buckets did not contain a linked list. In our open
+        addressing implementation, each bucket contains at most one value, not
+        an entire linked list. Tombstones are not empty either, so empty
+        buckets will be capacity - size - tombstones.
+        """
+
+        self._finish_resize()
+        return self.get_capacity() - self.get_size() - self._tombstones
+
+    def compact(self) -> None:
+        """
+        Rebuilds the table in place, at the same capacity, dropping every
+        tombstone. Live entries are first flagged as unplaced. Each one is
+        then moved to the first bucket of its probe sequence that is empty or
+        still unplaced, swapping with the unplaced entry there if needed.
+        Placed entries never move again, so no probe sequence is left with a
+        gap before its key. Only a bytearray of flags is allocated.
+        """
+
+        self._finish_resize()
+        if self._tombstones == 0:
+            return
+
+        buckets, capacity = self._buckets, self._capacity
+        unplaced = bytearray(capacity)
+        for i in range(capacity):
+            element = buckets.get_at_index(i)
+            if element is not None:
+                if element.is_tombstone:
+                    buckets.set_at_index(i, None)
+                else:
+                    unplaced[i] = 1
+
+        for i in range(capacity):
+            while unplaced[i]:
+                element = buckets.get_at_index(i)
+                index = 0
+                while True:
+                    target = (element.hash + index * index) % capacity
+                    if unplaced[target] or buckets.get_at_index(target) is None:
+                        break
+                    index = index + 1
+
+                if target == i:
+                    unplaced[i] = 0
+                elif buckets.get_at_index(target) is None:
+                    buckets.set_at_index(target, element)
+                    buckets.set_at_index(i, None)
+                    unplaced[i] = 0
+                else:
+                    # Place this entry and carry on with the one it displaced
+                    buckets.set_at_index(i, buckets.get_at_index(target))
+                    buckets.set_at_index(target, element)
+                    unplaced[target] = 0
+
+        self._tombstones = 0
+        self._mod_count += 1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key. If the key is not in the
+        hash map, the method returns None.
+        """
+
+        # Prevents probing if map is empty
+        if self._size == 0:
+            return None
+
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        element = self._find_entry(key, self._hash_function(key))
+        if element is None:
+            return None
+        return element.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False
+        """
+
+        # Prevents probing if map is empty
+        if self._size == 0:
+            return False
+
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        return self._find_entry(key, self._hash_function(key)) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. If the key
+        is not in the hash map, nothing happens.
+        """
+
+        # Prevents probing if map is empty
+        if self._size == 0:
+            return None
+
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        hash_value = self._hash_function(key)
+        found_index, _ = self._probe(key, hash_value)
+        if found_index != -1:
+            self._remove_at(found_index)
+        elif self._old_buckets is not None:
+            # Not migrated yet, the tombstone goes away with the old table
+            found_index, _ = self._probe(key, hash_value, self._old_buckets)
+            if found_index == -1:
+                return None
+            self._old_buckets.get_at_index(found_index).is_tombstone = True
+            self._size -= 1
+            self._mod_count += 1
+        else:
+            return None
+
+        self._maybe_shrink()
+        return None
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map.
+        """
+
+        ret_arr = DynamicArray()
+        # Prevents iteration if map is empty
+        if self._size == 0:
+            return ret_arr
+
+        self._finish_resize()
+
+        # Iterates through each bucket and
+        # appends key-value pairs to our return array
+        for i in range(self._capacity):
+            if self._buckets.get_at_index(i) != None:
+                element =self._buckets.get_at_index(i)
+                if element is not None and element.is_tombstone == False:
+                    ret_arr.append((element.key, element.value))
+
+        return ret_arr
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash
+        table capacity.
+        """
+
+        # Any incremental resize in progress is simply abandoned
+        self._old_buckets = None
+        self._old_capacity = 0
+
+        cleared_map = self._array_class()
+        cleared_cap = self.get_capacity()
+
+        for _ in range(cleared_cap):
+            cleared_map.append(None)
+
+        self._buckets = cleared_map
+        self._capacity = cleared_cap
+        self._size = 0
+        self._tombstones = 0
+        self._mod_count += 1
+
+    def dump(self, path: str, codec: Codec = PICKLE) -> None:
+        """
+        Writes the map to path in the snapshot format, with the cached hash
+        of every key and the name of its engine. Values are encoded with
+        codec.
+        """
+
+        self._finish_resize()
+        engine = next(name for klass in type(self).__mro__
+                      for name, engine_class in ENGINES.items() if engine_class is klass)
+        slots = list(self._live_slots())
+        items = [self._item_at(index) for index in slots]
+        write_snapshot(path, KIND_OA, engine, self._capacity,
+                       [self._hash_at(index) for index in slots],
+                       [key for key, _ in items], [value for _, value in items], codec)
+
+    @classmethod
+    def load(cls, path: str, function, codec: Codec = None, **kwargs) -> "HashMap":
+        """
+        Builds a map from a snapshot written by dump, with the engine it was
+        dumped from unless engine is given. function must be the hash
+        function the map was dumped with; the stored hashes are used as
+        they are. Extra keyword arguments are passed to the constructor.
+        """
+
+        snapshot = read_snapshot(path, codec)
+        if snapshot.kind != KIND_OA:
+            raise ValueError(f"{path!r} holds a separate chaining map, load it "
+                             f"with hash_map_sc.HashMap.load")
+        engine = kwargs.pop('engine', None) or snapshot.engine
+        m = HashMap(snapshot.capacity, function, engine=engine, **kwargs)
+        keys, hashes = snapshot.keys, snapshot.hashes
+        # Engines mask hashes differently, so another engine hashes again
+        if hashes is None or engine != snapshot.engine:
+            hashes = m._hash_many(keys)
+        elif keys and m._hash_many(keys[:1])[0] != hashes[0]:
+            raise ValueError(f"{path!r} was dumped with a different hash function")
+        if m._capacity_for(len(keys)) > m._capacity:
+            m.resize_table(m._capacity_for(len(keys)))
+        m._load_pairs(hashes, keys, snapshot.values)
+        return m
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
+        """
+        Places an entry for every pair straight into the first empty bucket
+        of its probe sequence, without looking the keys up. The map must be
+        empty and the keys unique.
+        """
+
+        place, entry_class = self._place, self._entry_class
+        for hash_value, key, value in zip(hashes, keys, values):
+            place(entry_class(key, value, hash_value))
+        self._size = len(keys)
+        self._mod_count += 1
+
+    def __iter__(self):
+        """
+        Returns a new iterator over the live HashEntry objects in the hash map.
+        Each iterator keeps its own position, so iterations can be nested.
+        Tombstones are skipped.
+        """
+
+        return self._iterate(self._entry_at)
+
+    def keys(self):
+        """
+        Returns a live view of the keys in the hash map, in table order.
+        The view supports len() and in, and copies nothing.
+        """
+
+        return KeysView(self, self._key_at)
+
+    def values(self):
+        """
+        Returns a live view of the values in the hash map, in table order.
+        The view supports len() and in, and copies nothing.
+        """
+
+        return ValuesView(self, self._value_at)
+
+    def items(self):
+        """
+        Returns a live view of the (key, value) pairs in the hash map, in
+        table order. The view supports len() and in, and copies nothing.
+        """
+
+        return ItemsView(self, self._item_at)
+
+    def _iterate(self, read: callable):
+        """
+        Yields read(index) for every live slot. Raises RuntimeError if the
+        map is structurally changed (a key added or removed, a resize or a
+        clear) while the iteration is running. Updating the value of an
+        existing key is allowed, unless put finds the table at MAX_LOAD and
+        resizes it first.
+        """
+
+        self._finish_resize()
+        mod_count = self._mod_count
+        for index in self._live_slots():
+            if self._mod_count != mod_count:
+                raise RuntimeError("HashMap changed during iteration")
+            yield read(index)
+        if self._mod_count != mod_count:
+            raise RuntimeError("HashMap changed during iteration")
+
+    def _live_slots(self):
+        """
+        Yields the index of every bucket that holds a live entry.
+        """
+
+        buckets = self._buckets
+        for index in range(self._capacity):
+            element = buckets.get_at_index(index)
+            if element is not None and not element.is_tombstone:
+                yield index
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Returns the entry stored in the bucket at index.
+        """
+        return self._buckets.get_at_index(index)
+
+    def _hash_at(self, index: int) -> int:
+        """
+        Returns the cached hash of the entry in the bucket at index.
+        """
+        return self._buckets.get_at_index(index).hash
+
+    def _key_at(self, index: int) -> str:
+        """
+        Returns the key stored in the bucket at index.
+        """
+        return self._buckets.get_at_index(index).key
+
+    def _value_at(self, index: int) -> object:
+        """
+        Returns the value stored in the bucket at index.
+        """
+        return self._buckets.get_at_index(index).value
+
+    def _item_at(self, index: int) -> tuple:
+        """
+        Returns the (key, value) pair stored in the bucket at index.
+        """
+        element = self._buckets.get_at_index(index)
+        return element.key, element.value
+
+    def memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the table structure itself: the
+        bucket array and every HashEntry (with its attribute dict, if it has
+        one). The keys and values are not counted since every engine shares
+        them.
+        """
+
+        self._finish_resize()
+        total = sys.getsizeof(self._buckets) + sys.getsizeof(self._buckets._data)
+        for i in range(self._capacity):
+            element = self._buckets.get_at_index(i)
+            if element is not None:
+                total += sys.getsizeof(element)
+                if hasattr(element, '__dict__'):
+                    total += sys.getsizeof(element.__dict__)
+        return total
+
+    def probe_distance_stats(self) -> tuple[int, float]:
+        """
+        Returns the maximum and mean probe distance over all live entries,
+        where the distance is the number of probe steps between an entry's
+        home bucket and the bucket it is stored in.
+        """
+
+        longest, total, count = 0, 0, 0
+        for distance in self._probe_distances():
+            total += distance
+            count += 1
+            if distance > longest:
+                longest = distance
+        return longest, (total / count if count else 0.0)
+
+    def _quadratic_distance(self, hash_value: int, index: int) -> int:
+        """
+        Returns the step of the quadratic probe sequence of hash_value that
+        lands on index.
+        """
+
+        step = 0
+        while (hash_value + step * step) % self._capacity != index:
+            step += 1
+        return step
+
+    def _probe_distances(self):
+        """
+        Yields the quadratic probe distance of every live entry.
+        """
+
+        self._finish_resize()
+        for i in range(self._capacity):
+            element = self._buckets.get_at_index(i)
+            if element is not None and not element.is_tombstone:
+                yield self._quadratic_distance(element.hash, i)
+
+
+# Placed in old buckets that an incremental resize has already migrated
+MOVED = HashEntry(None, None)
+MOVED.is_tombstone = True
+
+
+# Slot states for the array based engines
+EMPTY, FULL, TOMBSTONE = 0, 1, 2
+
+# Hashes are stored in signed 64-bit slots, so they are masked to 63 bits
+HASH_MASK = (1 << 63) - 1
+
+
+class CompactHashMap(HashMap):
+    """
+    Open addressing HashMap with quadratic probing, stored as parallel arrays
+    instead of one HashEntry object per bucket:
+        _hashes - array('q') holding the cached hash of each slot
+        _states - bytearray holding EMPTY, FULL or TOMBSTONE for each slot
+        _keys   - list of keys
+        _values - list of values
+    It has the same public API as HashMap. Create one with
+    CompactHashMap(capacity, function) or HashMap(capacity, function, engine='compact').
+    """
+
+    def __init__(self, capacity: int, function, engine: str = None,
+                 policy: LoadPolicy = None) -> None:
+        """
+        Initialize new HashMap with all slots empty, resized as policy says.
+        """
+        self._set_policy(policy)
+        self._capacity = self._policy.initial_capacity(capacity)
+        self._min_capacity = self._capacity
+        self._allocate(self._capacity)
+
+        self._hash_function = function
+        self._size = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as HashMap
+        """
+        out = ''
+        for i in range(self._capacity):
+            out += str(i) + ': ' + str(self._entry_at(i)) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the slot arrays with empty arrays of the given capacity.
+        """
+
+        self._hashes = array('q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._tombstones = 0
+
+    def _entry_at(self, index: int) -> HashEntry:
+        """
+        Builds a HashEntry for the slot at index, or returns None if the slot
+        is empty. Tombstones come back with is_tombstone set.
+        """
+
+        state = self._states[index]
+        if state == EMPTY:
+            return None
+        entry = HashEntry(self._keys[index], self._values[index], self._hashes[index])
+        entry.is_tombstone = state == TOMBSTONE
+        return entry
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the hash of key masked to fit the hash array.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the masked hashes of all keys.
+        """
+        return [hash_value & HASH_MASK for hash_value in hash_many(self._hash_function, keys)]
+
+    def _locate_many(self, keys: list) -> list:
+        """
+        Same as HashMap._locate_many, reading the slot arrays. Single-key
+        groups are probed inline to avoid a method call per key.
+        """
+
+        hashes = self._hash_many(keys)
+        states, slot_hashes, slot_keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+
+        found = [-1] * len(keys)
+        for start, group in group_positions(hashes, capacity).items():
+            if group.__class__ is int:
+                key, hash_value = keys[group], hashes[group]
+                index = 0
+                while index < capacity:
+                    hash_index = (start + index * index) % capacity
+                    state = states[hash_index]
+                    if state == EMPTY:
+                        break
+                    if (state == FULL and slot_hashes[hash_index] == hash_value
+                            and slot_keys[hash_index] == key):
+                        found[group] = hash_index
+                        break
+                    index = index + 1
+                continue
+
+            wanted = {}
+            for position in group:
+                wanted.setdefault(keys[position], []).append(position)
+            index = 0
+            while wanted and index < capacity:
+                hash_index = (start + index * index) % capacity
+                state = states[hash_index]
+                if state == EMPTY:
+                    break
+                if state == FULL and slot_keys[hash_index] in wanted:
+                    for position in wanted.pop(slot_keys[hash_index]):
+                        found[position] = hash_index
+                index = index + 1
+        return found
+
+    def _values_at(self, indices: list) -> list:
+        """
+        Returns the value in each listed slot, or None where the index is -1.
+        """
+        values = self._values
+        return [None if index == -1 else values[index] for index in indices]
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Turns the full slot at index into a tombstone and releases its key and value.
+        """
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._mod_count += 1
+
+    def _probe(self, key: str, hash_value: int) -> tuple[int, int]:
+        """
+        Same probe engine as HashMap._probe, reading the state and hash arrays
+        instead of HashEntry objects.
+        """
+
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        free_index = -1
+
+        hash_index = hash_value % capacity
+        index = 0
+        while index < capacity:
+            state = states[hash_index]
+            if state == EMPTY:
+                # Empty slot ends the probe sequence
+                if free_index == -1:
+                    free_index = hash_index
+                return -1, free_index
+            if state == TOMBSTONE:
+                if free_index == -1:
+                    free_index = hash_index
+            elif hashes[hash_index] == hash_value and keys[hash_index] == key:
+                return hash_index, free_index
+            index = index + 1
+            # Step from offset (index - 1) ** 2 to index ** 2
+            hash_index += 2 * index - 1
+            if hash_index >= capacity:
+                hash_index %= capacity
+
+        return -1, free_index
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map, adding it if the key is not
+        in the map yet.
+        """
+
+        # Check load factor with tombstones counted, compact or resize if needed
+        if self.occupied_load() >= self.MAX_LOAD:
+            if self.table_load() < self.MAX_LOAD / 2:
+                self.compact()
+            else:
+                self.resize_table(self._policy.grow(self.get_capacity()))
+
+        self._put_hashed(key, value, self._hash_function(key) & HASH_MASK)
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known, without
+        checking the load factor.
+        """
+
+        found_index, free_index = self._probe(key, hash_value)
+        if found_index != -1:
+            self._values[found_index] = value
+            return
+
+        if free_index == -1:
+            # No free slot on the probe sequence, grow and try again
+            self.resize_table(self._policy.grow(self.get_capacity()))
+            self.put(key, value)
+            return
+
+        if self._states[free_index] == TOMBSTONE:
+            self._tombstones -= 1
+        self._hashes[free_index] = hash_value
+        self._states[free_index] = FULL
+        self._keys[free_index] = key
+        self._values[free_index] = value
+        self._size += 1
+        self._mod_count += 1
+
+    def _place(self, hash_value: int, key: str, value: object) -> None:
+        """
+        Stores a pair in the first empty slot of its probe sequence. Only used
+        while rebuilding a table, where keys are unique and there are no
+        tombstones.
+        """
+
+        states, capacity = self._states, self._capacity
+        hash_index = hash_value % capacity
+        index = 0
+        while True:
+            if states[hash_index] == EMPTY:
+                self._hashes[hash_index] = hash_value
+                states[hash_index] = FULL
+                self._keys[hash_index] = key
+                self._values[hash_index] = value
+                return
+            index = index + 1
+            # Step from offset (index - 1) ** 2 to index ** 2
+            hash_index += 2 * index - 1
+            if hash_index >= capacity:
+                hash_index %= capacity
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Updates the capacity of the underlying table. All live pairs are moved
+        to the new arrays using their cached hashes, and tombstones are dropped.
+        """
+
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+
+        while (self._size - 1) / new_capacity >= self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+
+        old_hashes, old_states = self._hashes, self._states
+        old_keys, old_values = self._keys, self._values
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._mod_count += 1
+
+        for i in range(len(old_states)):
+            if old_states[i] == FULL:
+                self._place(old_hashes[i], old_keys[i], old_values[i])
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is
+        not in the hash map.
+        """
+
+        if self._size == 0:
+            return None
+
+        found_index, _ = self._probe(key, self._hash_function(key) & HASH_MASK)
+        if found_index == -1:
+            return None
+        return self._values[found_index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False
+        """
+
+        if self._size == 0:
+            return False
+
+        found_index, _ = self._probe(key, self._hash_function(key) & HASH_MASK)
+        return found_index != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map. The
+        slot becomes a tombstone and its key and value are released.
+        """
+
+        if self._size == 0:
+            return None
+
+        found_index, _ = self._probe(key, self._hash_function(key) & HASH_MASK)
+        if found_index != -1:
+            self._remove_at(found_index)
+            self._maybe_shrink()
+        return None
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array where each index contains a tuple of a key/value pair
+        stored in the hash map.
+        """
+
+        ret_arr = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] == FULL:
+                ret_arr.append((keys[i], values[i]))
+        return ret_arr
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map without changing the underlying hash
+        table capacity.
+        """
+
+        self._allocate(self._capacity)
+        self._size = 0
+        self._mod_count += 1
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
+        """
+        Same as HashMap._load_pairs, placing pairs in the slot arrays.
+        """
+
+        place = self._place
+        for hash_value, key, value in zip(hashes, keys, values):
+            place(hash_value, key, value)
+        self._size = len(keys)
+        self._mod_count += 1
+
+    def compact(self) -> None:
+        """
+        Same in-place rebuild as HashMap.compact, moving pairs between slots
+        of the parallel arrays.
+        """
+
+        if self._tombstones == 0:
+            return
+
+        hashes, states = self._hashes, self._states
+        keys, values = self._keys, self._values
+        capacity = self._capacity
+        unplaced = bytearray(capacity)
+        for i in range(capacity):
+            if states[i] == TOMBSTONE:
+                states[i] = EMPTY
+            elif states[i] == FULL:
+                unplaced[i] = 1
+
+        for i in range(capacity):
+            while unplaced[i]:
+                hash_value = hashes[i]
+                index = 0
+                while True:
+                    target = (hash_value + index * index) % capacity
+                    if unplaced[target] or states[target] == EMPTY:
+                        break
+                    index = index + 1
+
+                if target == i:
+                    unplaced[i] = 0
+                elif states[target] == EMPTY:
+                    hashes[target], keys[target], values[target] = hash_value, keys[i], values[i]
+                    states[target] = FULL
+                    states[i] = EMPTY
+                    keys[i] = values[i] = None
+                    unplaced[i] = 0
+                else:
+                    # Place this pair and carry on with the one it displaced
+                    hashes[i], hashes[target] = hashes[target], hash_value
+                    keys[i], keys[target] = keys[target], keys[i]
+                    values[i], values[target] = values[target], values[i]
+                    unplaced[target] = 0
+
+        self._tombstones = 0
+        self._mod_count += 1
+
+    def _live_slots(self):
+        """
+        Yields the index of every full slot.
+        """
+
+        states = self._states
+        for index in range(self._capacity):
+            if states[index] == FULL:
+                yield index
+
+    def _hash_at(self, index: int) -> int:
+        """
+        Returns the cached hash of the slot at index.
+        """
+        return self._hashes[index]
+
+    def _key_at(self, index: int) -> str:
+        """
+        Returns the key stored in the slot at index.
+        """
+        return self._keys[index]
+
+    def _value_at(self, index: int) -> object:
+        """
+        Returns the value stored in the slot at index.
+        """
+        return self._values[index]
+
+    def _item_at(self, index: int) -> tuple:
+        """
+        Returns the (key, value) pair stored in the slot at index.
+        """
+        return self._keys[index], self._values[index]
+
+    def memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the slot arrays. The keys and
+        values are not counted since every engine shares them.
+        """
+
+        return (sys.getsizeof(self._hashes) + sys.getsizeof(self._states)
+                + sys.getsizeof(self._keys) + sys.getsizeof(self._values))
+
+    def _probe_distances(self):
+        """
+        Yields the quadratic probe distance of every full slot.
+        """
+        for i in range(self._capacity):
+            if self._states[i] == FULL:
+                yield self._quadratic_distance(self._hashes[i], i)
+
+
+# Control bytes for SwissHashMap. A full slot stores the low 7 bits of its
+# hash (0x00 - 0x7F), so the high bit alone tells full and free slots apart.
+CTRL_EMPTY = 0x80
+CTRL_DELETED = 0xFE
+
+
+class SwissHashMap(CompactHashMap):
+    """
+    Open addressing HashMap modeled on Swiss tables. Every slot has a control
+    byte holding either CTRL_EMPTY, CTRL_DELETED or the low 7 bits of its
+    hash (h2). Slots are grouped in groups of group_width (8 or 16) and the
+    remaining hash bits (h1) pick the first group; further groups are visited
+    with triangular probing. A whole group of control bytes is matched at
+    once by packing it into an int and using SWAR bit tricks, so keys are
+    only compared for the few slots whose h2 matches.
+    The number of groups is a power of two, so capacities are not prime.
+    Because probe lengths stay short the table can run up to 0.875 load.
+    Create one with SwissHashMap(capacity, function) or
+    HashMap(capacity, function, engine='swiss').
+    """
+
+    MAX_LOAD = 0.875
+    # Capacities are always a power of two number of groups
+    ALLOWS_POWER_OF_TWO = True
+
+    def __init__(self, capacity: int, function, engine: str = None,
+                 group_width: int = 16, policy: LoadPolicy = None) -> None:
+        """
+        Initialize new HashMap with all slots empty. group_width must be 8 or 16.
+        Capacities are always a power of two number of groups, whatever policy
+        says about rounding.
+        """
+        if group_width not in (8, 16):
+            raise ValueError("group_width must be 8 or 16")
+        self._group_width = group_width
+        # 0x0101... and 0x8080... masks covering one group
+        self._lsbs = int.from_bytes(b'\x01' * group_width, 'little')
+        self._msbs = self._lsbs << 7
+
+        self._set_policy(policy)
+        self._capacity = self._group_capacity(capacity)
+        self._min_capacity = self._capacity
+        self._allocate(self._capacity)
 
         self._hash_function = function
         self._size = 0
 
-    def __str__(self) -> str:
+    def _group_capacity(self, capacity: int) -> int:
         """
-        Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Returns the smallest capacity of at least the given size made up of a
+        power of two number of groups.
         """
-        out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
-        return out
 
-    def _next_prime(self, capacity: int) -> int:
+        groups = 1
+        while groups * self._group_width < capacity:
+            groups *= 2
+        return groups * self._group_width
+
+    def _allocate(self, capacity: int) -> None:
         """
-        Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Replaces the slot arrays with empty arrays of the given capacity.
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
 
-        return capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._control = bytearray([CTRL_EMPTY]) * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._group_mask = capacity // self._group_width - 1
+        self._tombstones = 0
 
-    @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _entry_at(self, index: int) -> HashEntry:
         """
-        Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Builds a HashEntry for the slot at index, or returns None if the slot
+        is empty. Deleted slots come back with is_tombstone set.
         """
-        if capacity == 2 or capacity == 3:
-            return True
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
+        control = self._control[index]
+        if control == CTRL_EMPTY:
+            return None
+        entry = HashEntry(self._keys[index], self._values[index], self._hashes[index])
+        entry.is_tombstone = control == CTRL_DELETED
+        return entry
 
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _load_group(self, group: int) -> tuple[int, int]:
+        """
+        Returns the index of the first slot of a group and the group's control
+        bytes packed into a little endian int.
+        """
 
-        return True
+        base = group * self._group_width
+        return base, int.from_bytes(self._control[base:base + self._group_width], 'little')
 
-    def get_size(self) -> int:
+    def _find(self, key: str, hash_value: int) -> int:
         """
-        Return size of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Returns the slot holding key, or -1 if it is not in the map. Each
+        probed group is filtered with a SWAR match of h2 against all of its
+        control bytes, and probing stops at the first group with an empty slot.
         """
-        return self._size
 
-    def get_capacity(self) -> int:
+        lsbs, msbs = self._lsbs, self._msbs
+        hashes, keys = self._hashes, self._keys
+        group_mask = self._group_mask
+        pattern = (hash_value & 0x7F) * lsbs
+        group = (hash_value >> 7) & group_mask
+
+        step = 0
+        while True:
+            base, word = self._load_group(group)
+
+            # Bytes equal to h2 become zero, then the classic "has zero byte"
+            # trick flags them. Rare false positives are removed by the hash
+            # comparison below.
+            x = word ^ pattern
+            matches = (x - lsbs) & ~x & msbs
+            while matches:
+                lowest = matches & -matches
+                index = base + ((lowest.bit_length() - 1) >> 3)
+                if hashes[index] == hash_value and keys[index] == key:
+                    return index
+                matches ^= lowest
+
+            # CTRL_EMPTY is the only control byte with bit 7 set and bit 1 clear
+            if word & ~(word << 6) & msbs:
+                return -1
+
+            step += 1
+            if step > group_mask:
+                return -1
+            group = (group + step) & group_mask
+
+    def _find_free(self, hash_value: int) -> int:
         """
-        Return capacity of map
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        Returns the first empty or deleted slot on the probe sequence of hash_value.
         """
-        return self._capacity
 
-    # ------------------------------------------------------------------ #
+        msbs, group_mask = self._msbs, self._group_mask
+        group = (hash_value >> 7) & group_mask
+
+        step = 0
+        while True:
+            base, word = self._load_group(group)
+            free = word & msbs
+            if free:
+                return base + (((free & -free).bit_length() - 1) >> 3)
+            step += 1
+            group = (group + step) & group_mask
+
+    def _probe(self, key: str, hash_value: int) -> tuple[int, int]:
+        """
+        Same contract as HashMap._probe, built from _find and _find_free.
+        """
+
+        found_index = self._find(key, hash_value)
+        if found_index != -1:
+            return found_index, -1
+        return -1, self._find_free(hash_value)
 
     def put(self, key: str, value: object) -> None:
         """
-        Updates the key/value pair in the hash map. If the given key already exists in
-        the hash map, its associated value must be replaced with the new value. If the
-        given key is not in the hash map, a new key/value pair is added.
+        Updates the key/value pair in the hash map, adding it if the key is not
+        in the map yet.
         """
 
-        # Check load factor, resize table if needed
-        if self.table_load() >= 0.5:
-            self.resize_table(self.get_capacity() * 2)
+        hash_value = self._hash_function(key) & HASH_MASK
+        found_index = self._find(key, hash_value)
+        if found_index != -1:
+            self._values[found_index] = value
+            return
+
+        # Deleted slots also lengthen probes, so they count toward the load.
+        # If live entries alone are under the limit, rebuilding in place is
+        # enough to clear them.
+        if (self._size + self._tombstones + 1) / self._capacity > self.MAX_LOAD:
+            if (self._size + 1) / self._capacity > self.MAX_LOAD / 2:
+                self.resize_table(self._policy.grow(self._capacity))
+            else:
+                self.compact()
 
-        index = 0
-        while index < self._capacity:
-            # Hash the key (Quadratic probing)
-            hash_index = (self._hash_function(key) + (index ** 2)) % self._capacity
-            # If keys match at hashed index or there is a tombstone
-            element = self._buckets.get_at_index(hash_index)
-            if element is None or element.is_tombstone:
-                # Insert new element in blank space
-                # HashEntry() sets tombstone to False by default
-                new_element = HashEntry(key, value)
-                self._buckets.set_at_index(hash_index, new_element)
-                self._size += 1
-                return
-            elif element.key == key:
-                # Update existing element
-                element.value = value
-                element.is_tombstone = False
-                return
-            # if the hashed index is empty or the key doesn't match,
-            # the index is incremented, and we probe for the next available space
-            index = index + 1
+        self._insert_new(key, value, hash_value)
 
-    def resize_table(self, new_capacity: int) -> None:
+    def _insert_new(self, key: str, value: object, hash_value: int) -> None:
         """
-        Updates the capacity of the underlying table. All key/pair values are
-        rehashed and copied to the new table.
+        Stores a pair whose key is not in the map in the first free slot of
+        its probe sequence.
         """
 
-        # Check if new_capacity is valid and ensure it is prime
-        if new_capacity < self._size:
-            return
+        free_index = self._find_free(hash_value)
+        if self._control[free_index] == CTRL_DELETED:
+            self._tombstones -= 1
+        self._hashes[free_index] = hash_value
+        self._control[free_index] = hash_value & 0x7F
+        self._keys[free_index] = key
+        self._values[free_index] = value
+        self._size += 1
+        self._mod_count += 1
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known, without
+        checking the load factor.
+        """
 
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        found_index = self._find(key, hash_value)
+        if found_index != -1:
+            self._values[found_index] = value
+        else:
+            self._insert_new(key, value, hash_value)
 
-        # Save the old table data
-        old_buckets = self._buckets
-        old_capacity = self._capacity
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the smallest group capacity that holds count entries under MAX_LOAD.
+        """
+        return self._group_capacity(int(count / self.MAX_LOAD) + 1)
 
-        # Initialize new table using dynamic array as underlying data structure
-        self._buckets = DynamicArray()
-        for _ in range(new_capacity):
-            self._buckets.append(None)
-        self._capacity = new_capacity
-        self._size = 0  # Reset size and re-add the elements to count correctly
+    def _reserve(self, count: int) -> None:
+        """
+        Grows or rebuilds the table once, if needed, so count more entries fit
+        under MAX_LOAD with deleted slots counted.
+        """
+        if (self._size + self._tombstones + count) / self._capacity > self.MAX_LOAD:
+            needed = self._capacity_for(self._size + count)
+            if needed > self._capacity:
+                self.resize_table(max(needed, self._policy.grow(self._capacity)))
+            else:
+                self.compact()
+
+    def compact(self) -> None:
+        """
+        Rebuilds the table in place, at the same capacity, dropping every
+        deleted slot. Deleted slots become empty and full ones are marked
+        deleted, which makes them "unplaced". Each unplaced pair then goes to
+        the first free slot _find_free gives it: its own slot, an empty slot,
+        or another unplaced slot whose pair it swaps with.
+        """
 
-        # Rehash and insert each key-value pair into the new table using put method
-        for i in range(old_capacity):
-            element = old_buckets.get_at_index(i)
-            if element is not None:
-                self.put(element.key, element.value)
-                if element.is_tombstone:
-                    self._size += 1
+        if self._tombstones == 0:
+            return
 
+        hashes, control = self._hashes, self._control
+        keys, values = self._keys, self._values
+        for i in range(self._capacity):
+            if control[i] == CTRL_DELETED:
+                control[i] = CTRL_EMPTY
+            elif control[i] < CTRL_EMPTY:
+                control[i] = CTRL_DELETED
 
-    def table_load(self) -> float:
+        for i in range(self._capacity):
+            while control[i] == CTRL_DELETED:
+                hash_value = hashes[i]
+                target = self._find_free(hash_value)
+                if target == i:
+                    control[i] = hash_value & 0x7F
+                elif control[target] == CTRL_EMPTY:
+                    hashes[target], keys[target], values[target] = hash_value, keys[i], values[i]
+                    control[target] = hash_value & 0x7F
+                    control[i] = CTRL_EMPTY
+                    keys[i] = values[i] = None
+                else:
+                    # Place this pair and carry on with the one it displaced
+                    hashes[i], hashes[target] = hashes[target], hash_value
+                    keys[i], keys[target] = keys[target], keys[i]
+                    values[i], values[target] = values[target], values[i]
+                    control[target] = hash_value & 0x7F
+
+        self._tombstones = 0
+        self._mod_count += 1
+
+    def resize_table(self, new_capacity: int) -> None:
         """
-        Calculates and returns the load factor of our table
-        Load factor = total number of elements in the table/number of buckets
+        Updates the capacity of the underlying table, rounded up to a power of
+        two number of groups. All live pairs are moved using their cached
+        hashes, and deleted slots are dropped.
         """
 
-        return self.get_size() / self.get_capacity()
+        if new_capacity < self._size:
+            return
 
-    def empty_buckets(self) -> int:
+        new_capacity = self._group_capacity(new_capacity)
+        while self._size / new_capacity > self.MAX_LOAD:
+            new_capacity *= 2
+
+        old_hashes, old_control = self._hashes, self._control
+        old_keys, old_values = self._keys, self._values
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._mod_count += 1
+
+        for i in range(len(old_control)):
+            if old_control[i] < CTRL_EMPTY:
+                hash_value = old_hashes[i]
+                index = self._find_free(hash_value)
+                self._hashes[index] = hash_value
+                self._control[index] = hash_value & 0x7F
+                self._keys[index] = old_keys[i]
+                self._values[index] = old_values[i]
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
         """
-        Returns the number of empty buckets. In the hash_map_sc implementation,
-        this was how many buckets did not contain a linked list. In our open
-        addressing implementation, each bucket contains at most one value, not
-        an entire linked list. So empty buckets will be capacity - size.
+        Same as HashMap._load_pairs, filling the first free slot _find_free
+        gives each pair.
         """
 
-        return self.get_capacity() - self.get_size()
+        control = self._control
+        for hash_value, key, value in zip(hashes, keys, values):
+            index = self._find_free(hash_value)
+            self._hashes[index] = hash_value
+            control[index] = hash_value & 0x7F
+            self._keys[index] = key
+            self._values[index] = value
+        self._size = len(keys)
+        self._mod_count += 1
 
     def get(self, key: str) -> object:
         """
-        Returns the value associated with the given key. If the key is not in the
-        hash map, the method returns None.
+        Returns the value associated with the given key, or None if the key is
+        not in the hash map.
         """
 
-        # Prevents iteration if map is empty
         if self._size == 0:
             return None
 
-        index = 0
-        while index != self._capacity:
-            # Hash the key
-            hash_index = (self._hash_function(key) + (index ** 2)) % self._capacity
-            # If keys match at hashed index
-            if self._buckets.get_at_index(hash_index) != None:
-                element = self._buckets.get_at_index(hash_index)
-                if key == element.key and element.is_tombstone == False:
-                   return element.value
-            # if the hashed index is empty and the keys don't match:
-            index = index + 1
-
-        return None
+        found_index = self._find(key, self._hash_function(key) & HASH_MASK)
+        if found_index == -1:
+            return None
+        return self._values[found_index]
 
     def contains_key(self, key: str) -> bool:
         """
         Returns True if the given key is in the hash map, otherwise it returns False
         """
 
-        # Prevents iteration if map is empty
         if self._size == 0:
             return False
 
-        index = 0
-        while index != self._capacity:
-            # Hash the key
-            hash_index = (self._hash_function(key) + (index ** 2)) % self._capacity
-            # If keys match at hashed index
-            if self._buckets.get_at_index(hash_index) != None:
-                element = self._buckets.get_at_index(hash_index)
-                if key == element.key:
-                    return True
-            index = index + 1
-
-        return False
+        return self._find(key, self._hash_function(key) & HASH_MASK) != -1
 
     def remove(self, key: str) -> None:
         """
-        Removes the given key and its associated value from the hash map. If the key
-        is not in the hash map.
+        Removes the given key and its associated value from the hash map. The
+        slot is marked deleted and its key and value are released.
         """
 
-        # Prevents iteration if map is empty
         if self._size == 0:
             return None
 
-        index = 0
-        while index != self._capacity:
-            # Hash the key
-            hash_index = (self._hash_function(key) + (index ** 2)) % self._capacity
-            # If keys match at hashed index
-            if self._buckets.get_at_index(hash_index) != None:
-                element = self._buckets.get_at_index(hash_index)
-                if key == element.key:
-                    if element.is_tombstone == False:
-                        element.is_tombstone = True
-                        self._size -=1
-                    return None
-            index = index + 1
+        found_index = self._find(key, self._hash_function(key) & HASH_MASK)
+        if found_index != -1:
+            self._remove_at(found_index)
+            self._maybe_shrink()
         return None
 
+    def _locate_many(self, keys: list) -> list:
+        """
+        Returns the slot of every key, or -1 for keys not in the map. Group
+        probing already filters candidates by h2, so every distinct key gets
+        its own _find; repeated keys are only looked up once.
+        """
+
+        found = {}
+        find = self._find
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            if key not in found:
+                found[key] = find(key, hash_value)
+        return [found[key] for key in keys]
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Marks the full slot at index deleted and releases its key and value.
+        """
+        self._control[index] = CTRL_DELETED
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._mod_count += 1
+        self._tombstones += 1
+
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array where each index contains a tuple of a key/value pair
@@ -249,61 +1802,328 @@ class HashMap:
         """
 
         ret_arr = DynamicArray()
-        # Prevents iteration if map is empty
-        if self._size == 0:
-            return ret_arr
+        control, keys, values = self._control, self._keys, self._values
+        for i in range(self._capacity):
+            if control[i] < CTRL_EMPTY:
+                ret_arr.append((keys[i], values[i]))
+        return ret_arr
 
-        # Iterates through each bucket and
-        # appends key-value pairs to our return array
+    def _live_slots(self):
+        """
+        Yields the index of every full slot.
+        """
+
+        control = self._control
+        for index in range(self._capacity):
+            if control[index] < CTRL_EMPTY:
+                yield index
+
+    def memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the slot arrays. The keys and
+        values are not counted since every engine shares them.
+        """
+
+        return (sys.getsizeof(self._hashes) + sys.getsizeof(self._control)
+                + sys.getsizeof(self._keys) + sys.getsizeof(self._values))
+
+    def _probe_distances(self):
+        """
+        Yields, for every full slot, how many groups were probed before the
+        slot's own group.
+        """
+
+        group_mask, width = self._group_mask, self._group_width
         for i in range(self._capacity):
-            if self._buckets.get_at_index(i) != None:
-                element =self._buckets.get_at_index(i)
-                if element is not None and element.is_tombstone == False:
-                    ret_arr.append((element.key, element.value))
+            if self._control[i] < CTRL_EMPTY:
+                group = (self._hashes[i] >> 7) & group_mask
+                step = 0
+                while group != i // width:
+                    step += 1
+                    group = (group + step) & group_mask
+                yield step
+
+
+class RobinHoodHashMap(CompactHashMap):
+    """
+    Open addressing HashMap using Robin Hood hashing with linear probing. The
+    probe distance of a slot is how far it sits from its home slot
+    (hash % capacity). On insert, an entry that has travelled further than
+    the entry in the slot it reaches takes that slot, and the "richer" entry
+    moves on. This keeps probe distances short and even. Removal uses
+    backward-shift deletion: the following entries of the cluster are moved
+    back one slot, so there are never any tombstones and churn does not
+    degrade lookups. Distances are derived from the cached hashes.
+    Create one with RobinHoodHashMap(capacity, function) or
+    HashMap(capacity, function, engine='robin_hood').
+    """
+
+    MAX_LOAD = 0.875
+    # Linear probing reaches every slot, so any capacity works
+    ALLOWS_POWER_OF_TWO = True
+
+    def compact(self) -> None:
+        """
+        Does nothing: backward-shift deletion never leaves tombstones.
+        """
 
-        return ret_arr
+    def _distance(self, index: int) -> int:
+        """
+        Returns the probe distance of the full slot at index.
+        """
+        return (index - self._hashes[index] % self._capacity) % self._capacity
 
-    def clear(self) -> None:
+    def _find(self, key: str, hash_value: int) -> int:
         """
-        Clears the contents of the hash map without changing the underlying hash
-        table capacity.
+        Returns the slot holding key, or -1 if it is not in the map. The
+        search stops at an empty slot or at a slot closer to its home than we
+        are to ours, since the key would have taken that slot on insert.
         """
 
-        cleared_map = DynamicArray()
-        cleared_cap = self.get_capacity()
+        states, hashes, keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+        index = hash_value % capacity
+        distance = 0
+        while states[index] == FULL:
+            if (index - hashes[index] % capacity) % capacity < distance:
+                return -1
+            if hashes[index] == hash_value and keys[index] == key:
+                return index
+            index = (index + 1) % capacity
+            distance += 1
+        return -1
+
+    def _probe(self, key: str, hash_value: int) -> tuple[int, int]:
+        """
+        Same contract as HashMap._probe. Robin Hood inserts displace entries
+        instead of filling a free slot, so no free index is reported.
+        """
+        return self._find(key, hash_value), -1
 
-        for _ in range(cleared_cap):
-            cleared_map.append(None)
+    def _insert(self, hash_value: int, key: str, value: object) -> None:
+        """
+        Inserts a pair whose key is not in the map, swapping it with every
+        richer entry it meets until an empty slot takes the last carried pair.
+        """
 
-        self._buckets = cleared_map
-        self._capacity = cleared_cap
-        self._size = 0
+        states, hashes, keys, values = self._states, self._hashes, self._keys, self._values
+        capacity = self._capacity
+        index = hash_value % capacity
+        distance = 0
+        while states[index] == FULL:
+            existing = (index - hashes[index] % capacity) % capacity
+            if existing < distance:
+                # Take from the rich: carry the displaced entry onward
+                hashes[index], hash_value = hash_value, hashes[index]
+                keys[index], key = key, keys[index]
+                values[index], value = value, values[index]
+                distance = existing
+            index = (index + 1) % capacity
+            distance += 1
+
+        hashes[index] = hash_value
+        states[index] = FULL
+        keys[index] = key
+        values[index] = value
 
-    def __iter__(self):
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map, adding it if the key is not
+        in the map yet.
+        """
+
+        hash_value = self._hash_function(key) & HASH_MASK
+        found_index = self._find(key, hash_value)
+        if found_index != -1:
+            self._values[found_index] = value
+            return
+
+        if (self._size + 1) / self._capacity > self.MAX_LOAD:
+            self.resize_table(self._policy.grow(self._capacity))
+
+        self._insert(hash_value, key, value)
+        self._size += 1
+        self._mod_count += 1
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known, without
+        checking the load factor.
+        """
+
+        found_index = self._find(key, hash_value)
+        if found_index != -1:
+            self._values[found_index] = value
+        else:
+            self._insert(hash_value, key, value)
+            self._size += 1
+            self._mod_count += 1
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
+        """
+        Same as HashMap._load_pairs, inserting each pair Robin Hood style.
+        """
+
+        insert = self._insert
+        for hash_value, key, value in zip(hashes, keys, values):
+            insert(hash_value, key, value)
+        self._size = len(keys)
+        self._mod_count += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Updates the capacity of the underlying table. All pairs are reinserted
+        using their cached hashes.
+        """
+
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+
+        while self._size / new_capacity > self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+
+        old_hashes, old_states = self._hashes, self._states
+        old_keys, old_values = self._keys, self._values
+
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._mod_count += 1
+
+        for i in range(len(old_states)):
+            if old_states[i] == FULL:
+                self._insert(old_hashes[i], old_keys[i], old_values[i])
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is
+        not in the hash map.
+        """
+
+        found_index = self._find(key, self._hash_function(key) & HASH_MASK)
+        if found_index == -1:
+            return None
+        return self._values[found_index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the given key is in the hash map, otherwise it returns False
+        """
+
+        return self._find(key, self._hash_function(key) & HASH_MASK) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key and its associated value from the hash map using
+        backward-shift deletion: every following entry that is not in its
+        home slot moves back one slot, until an empty or home slot is reached.
+        """
+
+        index = self._find(key, self._hash_function(key) & HASH_MASK)
+        if index != -1:
+            self._remove_at(index)
+            self._maybe_shrink()
+        return None
+
+    def _remove_at(self, index: int) -> None:
+        """
+        Empties the full slot at index by shifting the rest of its cluster
+        back one slot.
+        """
+
+        states, hashes, keys, values = self._states, self._hashes, self._keys, self._values
+        capacity = self._capacity
+        next_index = (index + 1) % capacity
+        while states[next_index] == FULL and self._distance(next_index) > 0:
+            hashes[index] = hashes[next_index]
+            keys[index] = keys[next_index]
+            values[index] = values[next_index]
+            index = next_index
+            next_index = (index + 1) % capacity
+
+        states[index] = EMPTY
+        keys[index] = None
+        values[index] = None
+        self._size -= 1
+        self._mod_count += 1
+
+    def _locate_many(self, keys: list) -> list:
+        """
+        Returns the slot of every key, or -1 for keys not in the map. Keys are
+        grouped by home slot, and each group walks its run of the cluster
+        once, until an empty slot or a slot closer to its home than the group.
+        """
+
+        hashes = self._hash_many(keys)
+        states, slot_hashes, slot_keys = self._states, self._hashes, self._keys
+        capacity = self._capacity
+
+        found = [-1] * len(keys)
+        for home, group in group_positions(hashes, capacity).items():
+            if group.__class__ is int:
+                key, hash_value = keys[group], hashes[group]
+                index, distance = home, 0
+                while states[index] == FULL:
+                    if (index - slot_hashes[index] % capacity) % capacity < distance:
+                        break
+                    if slot_hashes[index] == hash_value and slot_keys[index] == key:
+                        found[group] = index
+                        break
+                    index = (index + 1) % capacity
+                    distance += 1
+                continue
+
+            wanted = {}
+            for position in group:
+                wanted.setdefault(keys[position], []).append(position)
+
+            index, distance = home, 0
+            while wanted and states[index] == FULL:
+                if (index - slot_hashes[index] % capacity) % capacity < distance:
+                    break
+                if slot_keys[index] in wanted:
+                    for position in wanted.pop(slot_keys[index]):
+                        found[position] = index
+                index = (index + 1) % capacity
+                distance += 1
+        return found
+
+    def remove_many(self, keys) -> list:
         """
-        Initializes the iterator as a private data member. Enables the hash map
-        to iterate across itself.
+        Removes every key from the map. Returns a list with True for each key
+        that was removed, and False for keys that were missing (or repeated).
+        Backward shifting moves other entries, so keys are removed one at a
+        time after being hashed in one batch.
         """
 
-        self._index = 0
-        return self
+        keys = list(keys)
+        removed = []
+        for key, hash_value in zip(keys, self._hash_many(keys)):
+            index = self._find(key, hash_value)
+            if index != -1:
+                self._remove_at(index)
+            removed.append(index != -1)
 
-    def __next__(self):
+        self._maybe_shrink()
+        return removed
+
+    def _probe_distances(self):
         """
-        Returns the next item in the hash map, based on the current location of the
-        iterator.
+        Yields the linear probe distance of every entry.
         """
+        for i in range(self._capacity):
+            if self._states[i] == FULL:
+                yield self._distance(i)
 
-        while self._index < self._capacity:
-            try:
-                ret_value = self._buckets[self._index]
-                self._index = self._index + 1
-                if ret_value is not None:
-                    return ret_value
-            except DynamicArray:
-                raise StopIteration
 
-        raise StopIteration
+# Storage engines selectable with HashMap(capacity, function, engine=...)
+ENGINES = {
+    'entry': HashMap,
+    'compact': CompactHashMap,
+    'swiss': SwissHashMap,
+    'robin_hood': RobinHoodHashMap,
+}
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -531,3 +2351,115 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nCompact engine example 1")
+    print("---------------------")
+    m = HashMap(10, hash_function_2, engine='compact')
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(type(m).__name__, m.get_size(), m.get_capacity())
+    print(m.get_keys_and_values())
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+
+    print("\nSwiss engine example 1")
+    print("---------------------")
+    m = HashMap(53, hash_function_2, engine='swiss')
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    for i in range(0, 150, 2):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get('str1'), m.get('str2'), m.contains_key('str149'))
+
+    print("\nRobin Hood engine example 1")
+    print("---------------------")
+    m = HashMap(11, hash_function_2, engine='robin_hood')
+    for i in range(50):
+        m.put('str' + str(i), i * 100)
+    for i in range(0, 50, 3):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), m.get('str1'), m.get('str3'))
+    print(m.probe_distance_stats())
+
+    print("\nIncremental resize example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2, incremental=True)
+    for i in range(40):
+        m.put('str' + str(i), i * 100)
+    print(m.get_size(), m.get_capacity(), m.get('str5'), m.contains_key('str39'))
+    m.remove('str5')
+    print(m.get_size(), m.get('str5'), m.get_keys_and_values().length())
+
+    print("\nfrom_items / update example 1")
+    print("-----------------------------")
+    m = HashMap.from_items([('str' + str(i), i) for i in range(30)], hash_function_2)
+    print(m.get_size(), m.get_capacity(), m.get('str7'))
+    m.update({'str7': 'seven', 'extra': 1})
+    print(m.get_size(), m.get_capacity(), m.get('str7'), m.get('extra'))
+
+    print("\nput_many / get_many example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(['str' + str(i) for i in range(20)], range(20))
+    print(m.get_size(), m.get_capacity(), m.get_many(['str3', 'str19', 'missing']))
+
+    print("\nget_many / contains_many / remove_many example 1")
+    print("-----------------------------")
+    for engine in ENGINES:
+        m = HashMap(11, hash_function_1, engine=engine)
+        m.put_many(['str' + str(i) for i in range(20)], range(20))
+        print(engine, m.get_many(['str3', 'str19', 'missing']), m.contains_many(['str3', 'missing']),
+              m.remove_many(['str3', 'str3', 'missing']), m.get_size())
+
+    print("\nSlotted example 1")
+    print("-----------------------------")
+    for slotted in (False, True):
+        m = HashMap(11, hash_function_1, slotted=slotted)
+        for i in range(30):
+            m.put('str' + str(i), i)
+        m.remove('str4')
+        print(slotted, m.get_size(), m.get_capacity(), m.get('str7'),
+              m.contains_key('str4'), m.memory_usage())
+
+    print("\nIterator / keys / values / items example 1")
+    print("-----------------------------")
+    for name in ENGINES:
+        m = HashMap(11, hash_function_1, engine=name)
+        for i in range(6):
+            m.put('str' + str(i), i)
+        m.remove('str2')
+        print(name, sorted(entry.key for entry in m), sorted(m.keys()),
+              sum(m.values()), len(list(m.items())))
+        try:
+            for key in m.keys():
+                m.remove(key)
+        except RuntimeError as error:
+            print(error)
+
+    print("\nViews example 1")
+    print("-----------------------------")
+    for name in ENGINES:
+        m = HashMap(11, hash_function_2, engine=name)
+        for i in range(5):
+            m.put('str' + str(i), i)
+        keys, values, items = m.keys(), m.values(), m.items()
+        m.remove('str0')
+        print(name, len(keys), 'str3' in keys, 'str0' in keys, 4 in values,
+              ('str1', 1) in items, ('str1', 2) in items)
+
+    print("\nTombstones / compact example 1")
+    print("-----------------------------")
+    for name in ENGINES:
+        m = HashMap(101, hash_function_1, engine=name)
+        for i in range(40):
+            m.put('str' + str(i), i)
+        for i in range(30):
+            m.remove('str' + str(i))
+        before = (m.get_tombstone_count(), m.empty_buckets(), round(m.occupied_load(), 2))
+        m.compact()
+        print(name, m.get_capacity(), before, m.get_tombstone_count(),
+              m.empty_buckets(), m.get('str35'), m.contains_key('str5'))
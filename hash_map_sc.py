@@ -7,34 +7,78 @@
 # as "buckets" containing Linked Lists as underlying data structure.
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+from operator import attrgetter
+
+from a6_include import (DynamicArray, ItemsView, KeysView, LinkedList, SLNode,
+                        SlottedDynamicArray, SlottedLinkedList, SlottedSLNode,
+                        ValuesView, group_positions, hash_function_1,
+                        hash_function_2, hash_many)
+from load_policy import LoadPolicy
+from snapshot import KIND_SC, PICKLE, Codec, read_snapshot, write_snapshot
 
 
 class HashMap:
+    # put resizes the table once the load factor reaches MAX_LOAD
+    MAX_LOAD = 1.0
+    # Number of old buckets migrated by each operation during an incremental resize
+    MIGRATE_BUCKETS = 16
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 slotted: bool = False,
+                 lazy: bool = False,
+                 policy: LoadPolicy = None) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        With incremental=True, growth triggered by put does not rehash the
+        whole table at once. Instead, both bucket arrays stay live and every
+        following operation migrates MIGRATE_BUCKETS old buckets.
+        With slotted=True, buckets, linked lists and nodes are built from the
+        __slots__ classes in a6_include, which have no per-instance __dict__.
+        With lazy=True, empty buckets are None and a bucket holding a single
+        entry stores its SLNode directly; a LinkedList is only created once a
+        second entry lands in the same bucket.
+        policy is a LoadPolicy that sets when and by how much the table grows
+        and shrinks, and whether capacities are primes or powers of two.
         """
-        self._buckets = DynamicArray()
-
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # Classes used to build the bucket array, buckets and nodes
+        self._array_class = SlottedDynamicArray if slotted else DynamicArray
+        self._list_class = SlottedLinkedList if slotted else LinkedList
+        self._node_class = SlottedSLNode if slotted else SLNode
+        self._lazy = lazy
+
+        self._policy = policy if policy is not None else LoadPolicy()
+        if self._policy.max_load is not None:
+            self.MAX_LOAD = self._policy.max_load
+        self._policy.check(self.MAX_LOAD)
+
+        # capacity must be a prime number (or a power of two, if the policy
+        # says so). Shrinking never goes below it.
+        self._capacity = self._policy.initial_capacity(capacity)
+        self._min_capacity = self._capacity
+        self._buckets = self._new_table(self._capacity)
 
         self._hash_function = function
         self._size = 0
 
+        self._incremental = incremental
+        # Old table while an incremental resize is in progress, otherwise None
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._fill_index = 0
+        # Bumped by every structural change (insert, removal, resize, clear)
+        # so iterators can detect that the map changed under them
+        self._mod_count = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
+        self._finish_resize()
         out = ''
         for i in range(self._buckets.length()):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
@@ -89,61 +133,425 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
+    def _new_table(self, capacity: int) -> DynamicArray:
+        """
+        Returns a bucket array of the given capacity. Lazy maps start with
+        every bucket set to None, others with an empty LinkedList in each.
+        """
+
+        if self._lazy:
+            return self._array_class([None] * capacity)
+
+        table = self._array_class()
+        for _ in range(capacity):
+            table.append(self._list_class())
+        return table
+
+    @staticmethod
+    def _find_in(bucket, key: str, hash_value: int) -> SLNode:
+        """
+        Returns the node holding key in a bucket, or None. A bucket may be
+        None, a single SLNode or a LinkedList; each is walked as a chain of
+        nodes starting at its head, comparing cached hashes before keys.
+        """
+
+        node = getattr(bucket, '_head', bucket)
+        while node is not None:
+            if node.hash == hash_value and node.key == key:
+                return node
+            node = node.next
+        return None
+
+    def _insert(self, buckets: DynamicArray, index: int, key: str, value: object,
+                hash_value: int) -> None:
+        """
+        Adds a new node for key to bucket index of the given bucket array.
+        In a lazy map the first entry of a bucket is stored as a bare node,
+        and the second one turns the bucket into a LinkedList.
+        """
+
+        bucket = buckets.get_at_index(index)
+        if bucket is None:
+            if self._lazy:
+                buckets.set_at_index(index, self._node_class(key, value, None, hash_value))
+                return
+            bucket = self._list_class()
+            buckets.set_at_index(index, bucket)
+        elif bucket.__class__ is self._node_class:
+            # Promote the single node to a linked list that starts with it
+            single = bucket
+            bucket = self._list_class()
+            bucket._head = single
+            bucket._size = 1
+            buckets.set_at_index(index, bucket)
+        bucket.insert(key, value, hash_value)
+
+    def _unlink(self, buckets: DynamicArray, index: int, key: str, hash_value: int) -> bool:
+        """
+        Removes key from bucket index of the given bucket array. Returns
+        True if it was there. In a lazy map a bucket left with one entry goes
+        back to holding a bare node, and an empty one goes back to None.
+        """
+
+        bucket = buckets.get_at_index(index)
+        if bucket is None:
+            return False
+
+        if bucket.__class__ is self._node_class:
+            if bucket.hash != hash_value or bucket.key != key:
+                return False
+            buckets.set_at_index(index, None)
+            return True
+
+        if not bucket.remove(key, hash_value):
+            return False
+        if self._lazy and bucket._size <= 1:
+            buckets.set_at_index(index, bucket._head)
+        return True
+
+    def _lookup(self, key: str, hash_value: int) -> SLNode:
+        """
+        Returns the node that holds key, or None. While an incremental resize
+        is running, keys in buckets that have not been migrated yet are found
+        in the old table.
+        """
+
+        node = self._find_in(self._buckets.get_at_index(hash_value % self._capacity),
+                             key, hash_value)
+        if node is None and self._old_buckets is not None:
+            node = self._find_in(self._old_buckets.get_at_index(hash_value % self._old_capacity),
+                                 key, hash_value)
+        return node
+
     def put(self, key: str, value: object) -> None:
         """
         Checks load factor to determine if table needs to be resized.
         Inserts or updates value at key
         """
 
+        if self._old_buckets is not None:
+            self._migrate_step()
+
         # Check load factor, resize table if needed
-        if self.table_load() >= 1:
-            self.resize_table(self.get_capacity() * 2)
+        if self.table_load() >= self.MAX_LOAD:
+            self._resize_to(self._policy.grow(self.get_capacity()))
+
+        # Hash the key once, the hash is cached on the node
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known, without
+        checking the load factor. Used by put and by the bulk loaders, which
+        size the table up front.
+        """
 
-        # Hash the key
-        hash_index = self._hash_function(key) % self._capacity
-        linked_list = self._buckets.get_at_index(hash_index)
-        node = linked_list.contains(key)
+        node = self._lookup(key, hash_value)
         if node:
             # If the key exists, update its value
             node.value = value
         else:
             # If the key does not exist, insert a new node with the key-value pair
-            linked_list.insert(key, value)
+            self._insert(self._buckets, hash_value % self._capacity, key, value, hash_value)
             self._size += 1
+            self._mod_count += 1
+
+    def _resize_to(self, new_capacity: int) -> None:
+        """
+        Resizes the table at once, or starts an incremental resize.
+        """
+
+        if self._incremental:
+            self._begin_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
+
+    def _maybe_shrink(self) -> None:
+        """
+        Shrinks the table by the policy's shrink factor once the load factor
+        drops below its min_load, but never below the starting capacity.
+        """
+
+        min_load = self._policy.min_load
+        if (min_load and self._size < min_load * self._capacity
+                and self._capacity > self._min_capacity):
+            self._resize_to(max(self._policy.shrink(self._capacity), self._min_capacity))
+
+    def _hash_many(self, keys: list) -> list:
+        """
+        Returns the hashes of all keys, computed in one pass. Uses the NumPy
+        batch variant of the hash function when there is one.
+        """
+        return hash_many(self._hash_function, keys)
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once, if needed, so count more entries fit under MAX_LOAD.
+        """
+        self._finish_resize()
+        needed = self._capacity_for(self._size + count)
+        if needed > self._capacity:
+            # Grow at least geometrically, so a stream of small batches
+            # doesn't rehash the whole table for every batch
+            self.resize_table(max(needed, self._policy.grow(self._capacity)))
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the smallest allowed capacity that holds count entries while
+        staying under MAX_LOAD.
+        """
+        return self._policy.round_capacity(int(count / self.MAX_LOAD) + 1)
+
+    @classmethod
+    def from_items(cls, iterable, function: callable = hash_function_1,
+                   **kwargs) -> "HashMap":
+        """
+        Builds a new map from an iterable of (key, value) pairs (or anything
+        with an items() method) in one pass. The table is sized once for all
+        the pairs, so there are no intermediate resizes. Extra keyword
+        arguments are passed to the constructor.
+        """
+
+        items = list(iterable.items() if hasattr(iterable, 'items') else iterable)
+        m = cls(1, function, **kwargs)
+        m.update(items)
+        return m
+
+    def update(self, iterable) -> None:
+        """
+        Puts every (key, value) pair from iterable (or anything with an items()
+        method) into the map. When a key repeats, the last value wins. The
+        table grows at most once, to the next capacity that fits all the
+        pairs under MAX_LOAD. Keys are then hashed in one batch and placed
+        without any further load checks.
+        """
+
+        items = iterable.items() if hasattr(iterable, 'items') else iterable
+        if not isinstance(items, list):
+            items = list(items)
+        self.put_many([key for key, _ in items], [value for _, value in items])
+
+    def put_many(self, keys, values) -> None:
+        """
+        Puts keys[i] -> values[i] for every i. The table is grown at most
+        once, all keys are hashed in one batch, and the pairs are placed
+        without further load checks.
+        """
+
+        keys = list(keys)
+        if not keys:
+            return
+
+        self._reserve(len(keys))
+        put_hashed = self._put_hashed
+        for key, value, hash_value in zip(keys, values, self._hash_many(keys)):
+            put_hashed(key, value, hash_value)
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of every key, or None for keys that are
+        not in the map. All keys are hashed in one batch first.
+        """
+
+        return [None if node is None else node.value
+                for node in self._locate_many(list(keys))]
+
+    def contains_many(self, keys) -> list:
+        """
+        Returns a list with True for every key that is in the map and False
+        for every key that is not.
+        """
+
+        return [node is not None for node in self._locate_many(list(keys))]
+
+    def _locate_many(self, keys: list) -> list:
+        """
+        Returns the node of every key, or None for keys not in the map. All
+        keys are hashed first and grouped by bucket, and every chain is walked
+        once for its whole group.
+        """
+
+        self._finish_resize()
+        hashes = self._hash_many(keys)
+        get_bucket = self._buckets.get_at_index
+
+        find_in = self._find_in
+
+        nodes = [None] * len(keys)
+        for index, group in group_positions(hashes, self._capacity).items():
+            if group.__class__ is int:
+                nodes[group] = find_in(get_bucket(index), keys[group], hashes[group])
+                continue
+
+            wanted = {}
+            for position in group:
+                wanted.setdefault(keys[position], []).append(position)
+            bucket = get_bucket(index)
+            node = getattr(bucket, '_head', bucket)
+            while node is not None and wanted:
+                if node.key in wanted:
+                    for position in wanted.pop(node.key):
+                        nodes[position] = node
+                node = node.next
+        return nodes
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes every key from the map. Returns a list with True for each key
+        that was removed, and False for keys that were missing (or repeated).
+        Keys are grouped by bucket and every chain is walked once, unlinking
+        all of the group's nodes on the way.
+        """
+
+        keys = list(keys)
+        self._finish_resize()
+        hashes = self._hash_many(keys)
+
+        removed = [False] * len(keys)
+        for index, group in group_positions(hashes, self._capacity).items():
+            if group.__class__ is int:
+                group = [group]
+            wanted = {}
+            for position in group:
+                wanted.setdefault(keys[position], []).append(position)
+
+            bucket = self._buckets.get_at_index(index)
+            head = getattr(bucket, '_head', bucket)
+            previous, node, count = None, head, 0
+            while node is not None and wanted:
+                if node.key in wanted:
+                    removed[wanted.pop(node.key)[0]] = True
+                    if previous:
+                        previous.next = node.next
+                    else:
+                        head = node.next
+                    count += 1
+                else:
+                    previous = node
+                node = node.next
+
+            if count == 0:
+                continue
+            self._size -= count
+            self._mod_count += 1
+            if bucket.__class__ is self._node_class:
+                # A lazy bucket's single node was removed
+                self._buckets.set_at_index(index, None)
+            else:
+                bucket._head = head
+                bucket._size -= count
+                if self._lazy and bucket._size <= 1:
+                    self._buckets.set_at_index(index, head)
+
+        self._maybe_shrink()
+        return removed
+
+    def _new_bucket(self, index: int) -> LinkedList:
+        """
+        Creates the linked list for a bucket of the new table that has not
+        been initialized yet by an incremental resize.
+        """
+
+        linked_list = self._list_class()
+        self._buckets.set_at_index(index, linked_list)
+        return linked_list
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Starts an incremental resize. The new bucket array starts out as None
+        placeholders so that allocating it is cheap; its linked lists are
+        created as buckets are migrated or first used (and, in a lazy map,
+        only for buckets that get more than one entry).
+        """
+
+        if self._old_buckets is not None:
+            self._finish_resize()
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._buckets = self._array_class([None] * new_capacity)
+        self._capacity = new_capacity
+        self._mod_count += 1
+        self._migrate_index = 0
+        self._fill_index = 0
+
+    def _migrate_step(self) -> None:
+        """
+        Moves the next MIGRATE_BUCKETS old buckets into the new table, and
+        creates the linked lists for a matching share of the new buckets.
+        Ends the resize once every old bucket has been moved.
+        """
+
+        old_buckets = self._old_buckets
+        stop = min(self._migrate_index + self.MIGRATE_BUCKETS, self._old_capacity)
+        for i in range(self._migrate_index, stop):
+            bucket = old_buckets.get_at_index(i)
+            node = getattr(bucket, '_head', bucket)
+            while node is not None:
+                self._insert(self._buckets, node.hash % self._capacity,
+                             node.key, node.value, node.hash)
+                node = node.next
+            old_buckets.set_at_index(i, None)
+        self._migrate_index = stop
+
+        # Initialize new buckets at the same pace old ones are migrated.
+        # Lazy maps keep their empty buckets as None.
+        fill_stop = -(-stop * self._capacity // self._old_capacity)
+        if not self._lazy:
+            for i in range(self._fill_index, fill_stop):
+                if self._buckets.get_at_index(i) is None:
+                    self._new_bucket(i)
+        self._fill_index = fill_stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_resize(self) -> None:
+        """
+        Completes an incremental resize that is in progress.
+        """
+
+        while self._old_buckets is not None:
+            self._migrate_step()
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes table (adds more buckets), but only to a prime number
+        Resizes table (adds more buckets), but only to a prime number (or a
+        power of two, if the policy says so)
         """
 
         # Check if new_capacity is valid and ensure it is prime
         if new_capacity < 1:
             return
 
-        if self._is_prime(new_capacity) == False:
-            new_capacity = self._next_prime(new_capacity)
+        self._finish_resize()
 
-        # Use get_keys_and_values to get all key-value pairs
-        key_value_pairs = self.get_keys_and_values()
+        new_capacity = self._policy.round_capacity(new_capacity)
 
-        for i in range(key_value_pairs.length()):
-            if i == new_capacity:
-                new_capacity = self._next_prime(new_capacity * 2)
+        # Keep doubling until the load factor is at most MAX_LOAD (at least as
+        # many buckets as elements by default)
+        while self._size / new_capacity > self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
 
         # Initialize new table using dynamic array as underlying data structure
-        new_table = DynamicArray()
-        for _ in range(new_capacity):
-            new_table.append(LinkedList())
+        new_table = self._new_table(new_capacity)
 
-        # Rehash and insert each key-value pair into the new table
-        for i in range(key_value_pairs.length()):
-            key, value = key_value_pairs.get_at_index(i)
-            new_hash_index = self._hash_function(key) % new_capacity
-            new_list = new_table.get_at_index(new_hash_index)
-            new_list.insert(key, value)
+        # Rehash each node into the new table straight from the old buckets,
+        # reusing the hash cached on the node
+        insert = self._insert
+        for i in range(self._capacity):
+            bucket = self._buckets.get_at_index(i)
+            node = getattr(bucket, '_head', bucket)
+            while node is not None:
+                insert(new_table, node.hash % new_capacity, node.key, node.value, node.hash)
+                node = node.next
 
         # Replace current buckets with new table and update capacity
         self._capacity = new_capacity
+        self._mod_count += 1
         self._buckets = new_table
 
     def table_load(self) -> float:
@@ -158,13 +566,15 @@ class HashMap:
         """
         Returns the number of empty buckets, checks each bucket to see if
         its corresponding LinkedList has a head. If not, it adds to the
-        count of empty buckets.
+        count of empty buckets. In a lazy map empty buckets are None.
         """
 
+        self._finish_resize()
         empty_count = 0
 
         for i in range(self._capacity):
-            if self._buckets.get_at_index(i)._head is None:
+            bucket = self._buckets.get_at_index(i)
+            if getattr(bucket, '_head', bucket) is None:
                 empty_count += 1
 
         return empty_count
@@ -175,11 +585,11 @@ class HashMap:
         find the entry at the index of the key, return the value.
         """
 
-        # Hash the key
-        hash_index = self._hash_function(key) % self._capacity
-        # Look for key in the linked list
-        linked_list = self._buckets.get_at_index(hash_index)
-        node = linked_list.contains(key)
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        # Hash the key and look for it in the linked list
+        node = self._lookup(key, self._hash_function(key))
 
         # Return None if the key is not found
         if node: return node.value
@@ -191,11 +601,11 @@ class HashMap:
         return True or False, depending if the key is present.
         """
 
-        # Hash the key
-        hash_index = self._hash_function(key) % self._capacity
-        # Look for key in the linked list
-        linked_list = self._buckets.get_at_index(hash_index)
-        node = linked_list.contains(key)
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        # Hash the key and look for it in the linked list
+        node = self._lookup(key, self._hash_function(key))
 
         # Return None if the key is not found
         if node:
@@ -210,64 +620,167 @@ class HashMap:
         the link between the deleted key and the next/previous node.
         """
 
-        # Hash the key to find the bucket
-        hash_index = self._hash_function(key) % self._capacity
-        # Look for key in the linked list
-        linked_list = self._buckets.get_at_index(hash_index)
-        # Abandon method if bucket doesn't exist/is Empty
-        if linked_list is None: return
-        cur = linked_list._head
-        prev = None
-
-        # Look through LinkedList for key
-        while cur is not None:
-            if cur.key == key:
-                if prev is None:
-                    linked_list._head = cur.next
-                else:
-                    prev.next = cur.next
-                self._size -= 1
-                return
-            prev = cur
-            cur = cur.next
+        if self._old_buckets is not None:
+            self._migrate_step()
+
+        # Hash the key to find the bucket that holds it
+        hash_value = self._hash_function(key)
+
+        # Unlink the node, comparing cached hashes before keys. Keys that
+        # have not been migrated yet are removed from the old table.
+        if self._unlink(self._buckets, hash_value % self._capacity, key, hash_value):
+            self._size -= 1
+            self._mod_count += 1
+        elif (self._old_buckets is not None and
+              self._unlink(self._old_buckets, hash_value % self._old_capacity, key, hash_value)):
+            self._size -= 1
+            self._mod_count += 1
+        else:
+            return
 
-        # Return if not found
-        return
+        self._maybe_shrink()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Return a DynamicArray containing all key-value pairs as tuples.
         """
 
+        self._finish_resize()
         ret_arr = DynamicArray()
 
         # Iterates through each linked list in each bucket and
         # appends key-value pairs to our return array
         for i in range(self._capacity):
-            current_list = self._buckets.get_at_index(i)
-            if current_list is not None:
-                current_node = current_list._head
-                while current_node is not None:
-                    ret_arr.append((current_node.key, current_node.value))
-                    current_node = current_node.next
+            bucket = self._buckets.get_at_index(i)
+            current_node = getattr(bucket, '_head', bucket)
+            while current_node is not None:
+                ret_arr.append((current_node.key, current_node.value))
+                current_node = current_node.next
 
         return ret_arr
 
+    def keys(self):
+        """
+        Returns a live view of the keys in the hash map, in bucket order.
+        The view supports len() and in, and copies nothing.
+        """
+
+        return KeysView(self, attrgetter('key'))
+
+    def values(self):
+        """
+        Returns a live view of the values in the hash map, in bucket order.
+        The view supports len() and in, and copies nothing.
+        """
+
+        return ValuesView(self, attrgetter('value'))
+
+    def items(self):
+        """
+        Returns a live view of the (key, value) pairs in the hash map, in
+        bucket order. The view supports len() and in, and copies nothing.
+        """
+
+        return ItemsView(self, attrgetter('key', 'value'))
+
+    def _iterate(self, read: callable):
+        """
+        Yields read(node) for every node, walking each bucket's chain. Raises
+        RuntimeError if the map is structurally changed (a key added or
+        removed, a resize or a clear) while the iteration is running.
+        Updating the value of an existing key is allowed, unless put finds
+        the table at MAX_LOAD and resizes it first.
+        """
+
+        self._finish_resize()
+        mod_count = self._mod_count
+        for i in range(self._capacity):
+            bucket = self._buckets.get_at_index(i)
+            node = getattr(bucket, '_head', bucket)
+            while node is not None:
+                if self._mod_count != mod_count:
+                    raise RuntimeError("HashMap changed during iteration")
+                yield read(node)
+                node = node.next
+        if self._mod_count != mod_count:
+            raise RuntimeError("HashMap changed during iteration")
+
     def clear(self) -> None:
         """
         Empty our hash map. Set the head of each linked list
-        in each bucket to None
+        in each bucket to None (or, in a lazy map, the bucket itself)
         """
 
+        self._finish_resize()
+
         # Iterates through each bucket, but not the entire linked-list
         # Sets head to None, thereby breaking the links in our lined-list
         # and emptying the bucket
         for i in range(self._capacity):
+            if self._lazy:
+                self._buckets[i] = None
+                continue
             linked_list = self._buckets[i]
-            linked_list.head = None
+            linked_list._head = None
             linked_list._size = 0
 
         self._size = 0
+        self._mod_count += 1
+
+    def dump(self, path: str, codec: Codec = PICKLE) -> None:
+        """
+        Writes the map to path in the snapshot format, with the cached hash
+        of every key. Values are encoded with codec.
+        """
+
+        self._finish_resize()
+        hashes, keys, values = [], [], []
+        for i in range(self._capacity):
+            bucket = self._buckets.get_at_index(i)
+            node = getattr(bucket, '_head', bucket)
+            while node is not None:
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+                node = node.next
+        write_snapshot(path, KIND_SC, '', self._capacity, hashes, keys, values, codec)
+
+    @classmethod
+    def load(cls, path: str, function: callable = hash_function_1,
+             codec: Codec = None, **kwargs) -> "HashMap":
+        """
+        Builds a map from a snapshot written by dump. function must be the
+        hash function the map was dumped with; the stored hashes are used
+        as they are. Extra keyword arguments are passed to the constructor.
+        """
+
+        snapshot = read_snapshot(path, codec)
+        if snapshot.kind != KIND_SC:
+            raise ValueError(f"{path!r} holds an open addressing map, load it "
+                             f"with hash_map_oa.HashMap.load")
+        m = cls(snapshot.capacity, function, **kwargs)
+        keys, hashes = snapshot.keys, snapshot.hashes
+        if hashes is None:
+            hashes = m._hash_many(keys)
+        elif keys and m._hash_many(keys[:1])[0] != hashes[0]:
+            raise ValueError(f"{path!r} was dumped with a different hash function")
+        if m._capacity_for(len(keys)) > m._capacity:
+            m.resize_table(m._capacity_for(len(keys)))
+        m._load_pairs(hashes, keys, snapshot.values)
+        return m
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
+        """
+        Links a node for every pair straight into its bucket, without
+        looking the keys up. The map must be empty and the keys unique.
+        """
+
+        buckets, capacity, insert = self._buckets, self._capacity, self._insert
+        for hash_value, key, value in zip(hashes, keys, values):
+            insert(buckets, hash_value % capacity, key, value, hash_value)
+        self._size = len(keys)
+        self._mod_count += 1
+
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     """
@@ -503,3 +1016,72 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\nIncremental resize example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2, incremental=True)
+    for i in range(40):
+        m.put('str' + str(i), i * 100)
+    print(m.get_size(), m.get_capacity(), m.get('str5'), m.contains_key('str39'))
+    m.remove('str5')
+    print(m.get_size(), m.get('str5'), m.empty_buckets())
+
+    print("\nfrom_items / update example 1")
+    print("-----------------------------")
+    m = HashMap.from_items([('str' + str(i), i) for i in range(30)], hash_function_2)
+    print(m.get_size(), m.get_capacity(), m.get('str7'))
+    m.update({'str7': 'seven', 'extra': 1})
+    print(m.get_size(), m.get_capacity(), m.get('str7'), m.get('extra'))
+
+    print("\nput_many / get_many example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    m.put_many(['str' + str(i) for i in range(20)], range(20))
+    print(m.get_size(), m.get_capacity(), m.get_many(['str3', 'str19', 'missing']))
+
+    print("\nget_many / contains_many / remove_many example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1)
+    m.put_many(['str' + str(i) for i in range(20)], range(20))
+    print(m.get_many(['str3', 'str19', 'missing']), m.contains_many(['str3', 'missing']))
+    print(m.remove_many(['str3', 'str3', 'missing']), m.get_size())
+
+    print("\nSlotted example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1, slotted=True)
+    for i in range(30):
+        m.put('str' + str(i), i)
+    m.remove('str4')
+    print(m.get_size(), m.get_capacity(), m.get('str7'), m.contains_key('str4'))
+
+    print("\nLazy buckets example 1")
+    print("-----------------------------")
+    m = HashMap(53, hash_function_1, lazy=True)
+    print(m.empty_buckets(), m.get_size(), m.get_capacity())
+    for i in range(60):
+        m.put('str' + str(i), i)
+    m.remove('str7')
+    print(m.empty_buckets(), m.get_size(), m.get_capacity(), m.get('str8'), m.contains_key('str7'))
+    m.clear()
+    print(m.empty_buckets(), m.get_size(), m.get('str8'))
+
+    print("\nkeys / values / items example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1, lazy=True)
+    for i in range(5):
+        m.put('str' + str(i), i)
+    print(sorted(m.keys()), sum(m.values()), sorted(m.items())[:2])
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except RuntimeError as error:
+        print(error)
+
+    print("\nViews example 1")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put('str' + str(i), i)
+    keys, values, items = m.keys(), m.values(), m.items()
+    m.put('extra', 99)
+    print(len(keys), 'str3' in keys, 'nope' in keys, 99 in values, ('str1', 1) in items)
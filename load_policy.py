@@ -0,0 +1,127 @@
+# Description: Resize policy for the SC and OA HashMaps. A LoadPolicy passed
+# to a map constructor replaces the hardcoded thresholds and growth rule:
+#
+#   max_load       - put grows the table once the load factor reaches this
+#                    (None keeps the map's own MAX_LOAD)
+#   min_load       - remove shrinks the table once the load factor drops
+#                    below this (0 never shrinks)
+#   growth_factor  - capacity multiplier when growing
+#   shrink_factor  - capacity multiplier when shrinking
+#   power_of_two   - round capacities up to powers of two instead of primes
+#   good_primes    - round capacities up to the doubling primes in
+#                    capacity.GOOD_PRIMES instead of the next prime
+#
+# For example HashMap(53, hash_function_1, policy=LoadPolicy(max_load=0.75,
+# min_load=0.2, growth_factor=1.5)).
+
+from capacity import good_prime, is_prime, next_prime
+
+
+class LoadPolicy:
+    """
+    When and by how much a HashMap resizes, and how capacities are rounded.
+    The default policy behaves exactly like the maps without one: grow by 2
+    at the map's MAX_LOAD, never shrink, prime capacities.
+    """
+
+    def __init__(self,
+                 max_load: float = None,
+                 min_load: float = 0.0,
+                 growth_factor: float = 2.0,
+                 shrink_factor: float = 0.5,
+                 power_of_two: bool = False,
+                 good_primes: bool = False) -> None:
+        """
+        Initialize new policy, rejecting settings that could never work.
+        """
+        if max_load is not None and max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if min_load < 0:
+            raise ValueError("min_load must not be negative")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if not 0 < shrink_factor < 1:
+            raise ValueError("shrink_factor must be between 0 and 1")
+        if power_of_two and good_primes:
+            raise ValueError("power_of_two and good_primes can't both be set")
+
+        self.max_load = max_load
+        self.min_load = min_load
+        self.growth_factor = growth_factor
+        self.shrink_factor = shrink_factor
+        self.power_of_two = power_of_two
+        self.good_primes = good_primes
+
+    def __repr__(self) -> str:
+        """Return content of the policy in human-readable form."""
+        return (f"LoadPolicy(max_load={self.max_load}, min_load={self.min_load}, "
+                f"growth_factor={self.growth_factor}, shrink_factor={self.shrink_factor}, "
+                f"power_of_two={self.power_of_two}, good_primes={self.good_primes})")
+
+    def check(self, max_load: float) -> None:
+        """
+        Raises ValueError unless a table shrunk at min_load stays under
+        max_load, the limit the map will actually use. Otherwise a remove
+        could shrink the table straight back into a resize.
+        """
+        if self.min_load >= max_load * self.shrink_factor:
+            raise ValueError(f"min_load must be below max_load * shrink_factor "
+                             f"({max_load * self.shrink_factor:g})")
+
+    def initial_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity a new table of the given size starts with. Same
+        as round_capacity, except that a prime capacity is at least 3, as
+        HashMap._next_prime gives.
+        """
+        if self.power_of_two or self.good_primes:
+            return self.round_capacity(capacity)
+        return next_prime(capacity)
+
+    def round_capacity(self, capacity: int) -> int:
+        """
+        Returns the smallest allowed capacity of at least the given size: a
+        power of two, a good prime, or any prime number. A size that is
+        already prime is kept, as resize_table always did.
+        """
+        if self.power_of_two:
+            return 1 << max(capacity - 1, 0).bit_length()
+        if self.good_primes:
+            return good_prime(capacity)
+        return capacity if is_prime(capacity) else next_prime(capacity)
+
+    def grow(self, capacity: int) -> int:
+        """
+        Returns the capacity to grow a full table to, before rounding.
+        """
+        return max(capacity + 1, int(capacity * self.growth_factor))
+
+    def shrink(self, capacity: int) -> int:
+        """
+        Returns the capacity to shrink a sparse table to, before rounding.
+        """
+        return max(1, int(capacity * self.shrink_factor))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLoad policy example 1")
+    print("---------------------")
+    policy = LoadPolicy(max_load=0.75, min_load=0.2, growth_factor=1.5)
+    print(policy)
+    print(policy.initial_capacity(2), policy.round_capacity(2), policy.round_capacity(1))
+    print(policy.round_capacity(100), policy.round_capacity(policy.grow(101)),
+          policy.round_capacity(policy.shrink(101)))
+
+    policy = LoadPolicy(power_of_two=True)
+    print(policy.round_capacity(100), policy.round_capacity(policy.grow(128)))
+
+    policy = LoadPolicy(good_primes=True)
+    print(policy.round_capacity(100), policy.round_capacity(policy.grow(193)))
+
+    try:
+        LoadPolicy(max_load=1.0, min_load=0.6).check(1.0)
+    except ValueError as error:
+        print(error)
@@ -0,0 +1,362 @@
+# Description: Bounded LRU cache built on the separate chaining HashMap.
+# Every chain node is also a link in a circular, doubly linked recency list
+# that starts and ends at a sentinel: following older from the sentinel
+# walks from the most recently used entry to the least recently used one,
+# and newer walks the other way. A hit moves its node to the front and a
+# full cache evicts the node at the back, both in O(1) on top of the usual
+# hash lookup, without any second index or per-entry bookkeeping object.
+#
+# The cache is bounded by a number of entries, a total weight in bytes
+# (sys.getsizeof of the key plus the value, unless a weigh function is
+# given), or both. get and get_many count hits and misses and refresh the
+# entries they find; contains_key and the views neither count nor refresh.
+
+
+import sys
+
+from a6_include import SLNode, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+from load_policy import LoadPolicy
+from snapshot import KIND_SC, PICKLE, Codec, write_snapshot
+
+
+class _LRUNode(SLNode):
+    """
+    Chain node that is also a link in the recency list, and remembers the
+    weight it adds to the cache.
+    """
+
+    def __init__(self, key: str, value: object, hash: int = None,
+                 weight: int = 0) -> None:
+        """Initialize an unlinked node."""
+        super().__init__(key, value, None, hash)
+        self.newer = None
+        self.older = None
+        self.weight = weight
+
+
+def _entry_bytes(key: str, value: object) -> int:
+    """Default weight of an entry: the shallow size of its key and value."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class LRUHashMap(HashMap):
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 weigh: callable = None,
+                 on_evict: callable = None,
+                 policy: LoadPolicy = None) -> None:
+        """
+        Initialize new empty cache that holds at most max_entries entries
+        and at most max_bytes of weight; either bound may be None. weigh(key,
+        value) returns the weight of an entry in bytes. on_evict(key, value)
+        is called for every entry the cache evicts, after it is removed.
+        capacity, function and policy are as for hash_map_sc.HashMap.
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+
+        super().__init__(capacity, function, policy=policy)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._weigh = weigh if weigh is not None else _entry_bytes
+        self._on_evict = on_evict
+        self._weight = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        # Sentinel of the recency list: its older link is the most recently
+        # used node and its newer link the least recently used one
+        self._recency = _LRUNode(None, None)
+        self._recency.newer = self._recency.older = self._recency
+
+    def get_weight(self) -> int:
+        """
+        Returns the total weight of the entries in the cache, in bytes. Only
+        tracked when the cache has a max_bytes bound.
+        """
+        return self._weight
+
+    def get_stats(self) -> tuple[int, int, int]:
+        """
+        Returns a tuple of (hits, misses, evictions) since the cache was
+        created.
+        """
+        return self._hits, self._misses, self._evictions
+
+    # ------------------------------------------------------------------ #
+
+    def _link(self, buckets, capacity: int, node: _LRUNode) -> None:
+        """
+        Pushes node onto the front of its chain in the given bucket array.
+        """
+
+        bucket = buckets.get_at_index(node.hash % capacity)
+        node.next = bucket._head
+        bucket._head = node
+        bucket._size += 1
+
+    def _touch(self, node: _LRUNode) -> None:
+        """
+        Moves node to the front of the recency list, or adds it there if it
+        is not in the list yet.
+        """
+
+        recency = self._recency
+        if node.newer is not None:
+            node.newer.older = node.older
+            node.older.newer = node.newer
+        front = recency.older
+        node.older = front
+        node.newer = recency
+        front.newer = node
+        recency.older = node
+
+    def _drop(self, node: _LRUNode) -> None:
+        """
+        Removes node from its chain and from the recency list.
+        """
+
+        self._unlink(self._buckets, node.hash % self._capacity, node.key, node.hash)
+        node.newer.older = node.older
+        node.older.newer = node.newer
+        node.newer = node.older = None
+        self._size -= 1
+        self._weight -= node.weight
+        self._mod_count += 1
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used entry and reports it to on_evict.
+        """
+
+        node = self._recency.newer
+        self._drop(node)
+        self._evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(node.key, node.value)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates value at key and makes it the most recently used
+        entry. Evicts the least recently used entries until the cache is
+        back within its bounds, and grows the table if the load factor has
+        reached MAX_LOAD.
+        """
+
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Inserts or updates a pair whose hash is already known. An entry that
+        is heavier than max_bytes on its own is evicted as soon as it
+        arrives, along with any older value of its key.
+        """
+
+        weight = 0 if self._max_bytes is None else self._weigh(key, value)
+        node = self._find_in(self._buckets.get_at_index(hash_value % self._capacity),
+                             key, hash_value)
+
+        if self._max_bytes is not None and weight > self._max_bytes:
+            if node is not None:
+                self._drop(node)
+            self._evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+            return
+
+        if node is not None:
+            node.value = value
+            self._weight += weight - node.weight
+            node.weight = weight
+        else:
+            if self._max_entries is not None:
+                while self._size >= self._max_entries:
+                    self._evict()
+            if self.table_load() >= self.MAX_LOAD:
+                self.resize_table(self._policy.grow(self._capacity))
+            node = _LRUNode(key, value, hash_value, weight)
+            self._link(self._buckets, self._capacity, node)
+            self._size += 1
+            self._weight += weight
+            self._mod_count += 1
+        self._touch(node)
+
+        # The new entry is at the front, so it is the last one evicted
+        if self._max_bytes is not None:
+            while self._weight > self._max_bytes:
+                self._evict()
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once, if needed, for count more entries, but never
+        for more than max_entries in total.
+        """
+
+        if self._max_entries is not None:
+            count = min(count, self._max_entries - self._size)
+        super()._reserve(count)
+
+    def dump(self, path: str, codec: Codec = PICKLE) -> None:
+        """
+        Same as HashMap.dump, but writes the entries from least to most
+        recently used, so a loaded cache keeps their order.
+        """
+
+        hashes, keys, values = [], [], []
+        recency, node = self._recency, self._recency.newer
+        while node is not recency:
+            hashes.append(node.hash)
+            keys.append(node.key)
+            values.append(node.value)
+            node = node.newer
+        write_snapshot(path, KIND_SC, '', self._capacity, hashes, keys, values, codec)
+
+    def _load_pairs(self, hashes: list, keys: list, values: list) -> None:
+        """
+        Puts every pair of a snapshot through _put_hashed, so the recency
+        list is built and the bounds apply. Later pairs count as more
+        recently used.
+        """
+
+        for hash_value, key, value in zip(hashes, keys, values):
+            self._put_hashed(key, value, hash_value)
+
+    def get(self, key: str):
+        """
+        Returns the value of key, or None if it isn't in the cache. A hit
+        makes key the most recently used entry.
+        """
+
+        return self._get_hashed(key, self._hash_function(key))
+
+    def _get_hashed(self, key: str, hash_value: int):
+        """
+        Looks up a key whose hash is already known, counting the hit or miss.
+        """
+
+        node = self._find_in(self._buckets.get_at_index(hash_value % self._capacity),
+                             key, hash_value)
+        if node is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._touch(node)
+        return node.value
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of every key, or None for keys that are
+        not in the cache, as if get was called for each key in turn. All
+        keys are hashed in one batch first.
+        """
+
+        keys = list(keys)
+        get_hashed = self._get_hashed
+        return [get_hashed(key, hash_value)
+                for key, hash_value in zip(keys, self._hash_many(keys))]
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the cache, if present. Removed
+        entries are not reported to on_evict.
+        """
+
+        if self._remove_hashed(key, self._hash_function(key)):
+            self._maybe_shrink()
+
+    def _remove_hashed(self, key: str, hash_value: int) -> bool:
+        """
+        Removes a key whose hash is already known. Returns True if it was
+        in the cache.
+        """
+
+        node = self._find_in(self._buckets.get_at_index(hash_value % self._capacity),
+                             key, hash_value)
+        if node is None:
+            return False
+        self._drop(node)
+        return True
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes every key from the cache. Returns a list with True for each
+        key that was removed, and False for keys that were missing (or
+        repeated).
+        """
+
+        keys = list(keys)
+        remove_hashed = self._remove_hashed
+        removed = [remove_hashed(key, hash_value)
+                   for key, hash_value in zip(keys, self._hash_many(keys))]
+        self._maybe_shrink()
+        return removed
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes table, but only to a prime number (or a power of two, if the
+        policy says so). The nodes themselves move to the new table, since
+        the recency list links them; they are relinked from least to most
+        recently used, so recent entries end up first in their chains.
+        """
+
+        if new_capacity < 1:
+            return
+
+        new_capacity = self._policy.round_capacity(new_capacity)
+        while self._size / new_capacity > self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+
+        new_table = self._new_table(new_capacity)
+        recency, node = self._recency, self._recency.newer
+        while node is not recency:
+            self._link(new_table, new_capacity, node)
+            node = node.newer
+
+        self._capacity = new_capacity
+        self._mod_count += 1
+        self._buckets = new_table
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache, without reporting them to
+        on_evict. The statistics are kept.
+        """
+
+        super().clear()
+        self._weight = 0
+        self._recency.newer = self._recency.older = self._recency
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU example 1")
+    print("-------------")
+    evicted = []
+    m = LRUHashMap(11, hash_function_1, max_entries=3,
+                   on_evict=lambda key, value: evicted.append(key))
+    for key in ['a', 'b', 'c']:
+        m.put(key, key.upper())
+    m.get('a')
+    m.put('d', 'D')
+    m.get('b')
+    print(m.get_size(), sorted(m.keys()), evicted, m.get_stats())
+
+    print("\nLRU example 2")
+    print("-------------")
+    m = LRUHashMap(53, hash_function_2, max_bytes=2000)
+    for i in range(100):
+        m.put('str' + str(i), 'x' * i)
+    print(m.get_size(), m.get_weight() <= 2000, m.get('str99') is not None,
+          m.get('str0'), m.get_stats())
+    m.put_many(['key' + str(i) for i in range(500)], range(500))
+    print(m.get_size(), m.get_capacity(), m.get_many(['key499', 'key0']))
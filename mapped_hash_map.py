@@ -0,0 +1,369 @@
+# Description: Open addressing HashMap stored in a memory-mapped file, so a
+# table survives restarts without replaying its puts. The file uses the
+# same layout as a SharedHashMap block (see table_layout: header,
+# hash/offset/length/state arrays and a heap of UTF-8 keys and pickled
+# values), and the map is a
+# CompactHashMap reading those arrays through memoryviews over the mmap.
+#
+# Opening a table only maps the file: nothing is read or decoded up front,
+# the operating system pages the arrays and heap in as probes touch them,
+# and a key or value is decoded only when a probe compares or returns it.
+#
+# Changes are written to the mapped pages in place. flush() writes them
+# back to the file; close() flushes too. A resize, a compaction or a full
+# heap rebuilds the table into a new file next to the old one (copying the
+# encoded keys and values as bytes, without decoding them), syncs it and
+# renames it over the old one, so a crash leaves either the old table or
+# the new one on disk, never a mix. Changes made since the last flush are
+# not protected the same way.
+#
+# The hash function must give the same result in every run, so the
+# built-in hash (randomized per process for str) can't be used.
+
+
+import mmap
+import os
+
+from a6_include import hash_function_1, hash_function_2
+from hash_map_oa import EMPTY, FULL, TOMBSTONE, CompactHashMap
+from table_layout import (HEADER_BYTES, HEADER_CAPACITY, HEADER_FORMAT,
+                          HEADER_HEAP_SIZE, HEADER_HEAP_USED, HEADER_MAGIC,
+                          HEADER_SIZE, HEADER_TOMBSTONES, encode_key,
+                          encode_value, lay_out, layout_size)
+
+MAGIC = 0x4D4150504544484D
+# Bumped whenever the file layout changes; stored in the header's own
+# format field, apart from the seqlock version SharedHashMap writers bump
+FORMAT_VERSION = 2
+
+
+def _fsync_directory(path: str) -> None:
+    """
+    Makes a rename in the directory holding path durable.
+    """
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class MappedHashMap(CompactHashMap):
+    """
+    CompactHashMap stored in a file. Create one with MappedHashMap(path,
+    capacity, function) or MappedHashMap.from_items(path, ...), and open an
+    existing one with MappedHashMap.open(path, function).
+    """
+
+    # Smallest heap, in bytes, a table is created or rebuilt with
+    HEAP_SIZE = 1 << 16
+
+    def __init__(self, path: str, capacity: int = 11, function=hash_function_1,
+                 heap_size: int = HEAP_SIZE) -> None:
+        """
+        Creates an empty table of capacity slots with heap_size bytes for
+        keys and values in a new file at path, replacing any file already
+        there. The heap grows as needed.
+        """
+        self._set_policy(None)
+        capacity = self._policy.initial_capacity(capacity)
+        temporary = path + '.new'
+        self._write_empty(temporary, capacity, max(heap_size, self.HEAP_SIZE))
+        os.replace(temporary, path)
+        _fsync_directory(path)
+        self._map_file(path, function)
+
+    @classmethod
+    def open(cls, path: str, function=hash_function_1) -> "MappedHashMap":
+        """
+        Opens the table stored at path. function must be the hash function
+        the table was created with.
+        """
+        self = cls.__new__(cls)
+        self._set_policy(None)
+        self._map_file(path, function)
+        return self
+
+    @classmethod
+    def from_items(cls, path: str, iterable, function=hash_function_1,
+                   **kwargs) -> "MappedHashMap":
+        """
+        Builds a new table at path from (key, value) pairs (or anything with
+        an items() method), sized once so they fit under MAX_LOAD.
+        """
+
+        items = list(iterable.items() if hasattr(iterable, 'items') else iterable)
+        m = cls(path, int(len(items) / cls.MAX_LOAD) + 1, function, **kwargs)
+        m.update(items)
+        return m
+
+    def __enter__(self) -> "MappedHashMap":
+        """Use the map as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Flush and close the map."""
+        self.close()
+
+    @staticmethod
+    def _write_empty(path: str, capacity: int, heap_size: int) -> None:
+        """
+        Writes an empty table file to path and syncs it to disk.
+        """
+
+        with open(path, 'wb') as file:
+            file.truncate(layout_size(capacity, heap_size))
+            header = memoryview(bytearray(HEADER_BYTES)).cast('Q')
+            header[HEADER_MAGIC] = MAGIC
+            header[HEADER_FORMAT] = FORMAT_VERSION
+            header[HEADER_CAPACITY] = capacity
+            header[HEADER_HEAP_SIZE] = heap_size
+            file.write(header)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _map_file(self, path: str, function) -> None:
+        """
+        Maps the table file at path and lays the map out over it.
+        """
+
+        self._path = path
+        self._hash_function = function
+        self._mod_count = 0
+        with open(path, 'r+b') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0)
+        self._buffer = memoryview(self._mmap)
+        lay_out(self, self._buffer)
+        header = self._header
+        if header[HEADER_MAGIC] != MAGIC or header[HEADER_FORMAT] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path!r} does not hold a MappedHashMap")
+        self._capacity = self._min_capacity = header[HEADER_CAPACITY]
+
+    @property
+    def path(self) -> str:
+        """Path of the table file."""
+        return self._path
+
+    def flush(self) -> None:
+        """
+        Writes every change made so far back to the file.
+        """
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and unmaps the file. The map can't be used afterwards.
+        """
+        if not self._views:
+            return
+        self.flush()
+        for view in self._views:
+            view.release()
+        self._views = ()
+        self._buffer.release()
+        self._mmap.close()
+
+    def __del__(self) -> None:
+        """Close the file when the map is garbage collected."""
+        if getattr(self, '_views', ()):
+            self.close()
+
+    # Size and tombstone count live in the header, so they persist
+
+    @property
+    def _size(self) -> int:
+        """Number of live pairs, from the header."""
+        return self._header[HEADER_SIZE]
+
+    @_size.setter
+    def _size(self, size: int) -> None:
+        """Store the number of live pairs in the header."""
+        self._header[HEADER_SIZE] = size
+
+    @property
+    def _tombstones(self) -> int:
+        """Number of tombstones, from the header."""
+        return self._header[HEADER_TOMBSTONES]
+
+    @_tombstones.setter
+    def _tombstones(self, tombstones: int) -> None:
+        """Store the number of tombstones in the header."""
+        self._header[HEADER_TOMBSTONES] = tombstones
+
+    def get_heap_usage(self) -> tuple[int, int]:
+        """
+        Returns a tuple of (heap bytes used, heap size).
+        """
+        return self._header[HEADER_HEAP_USED], self._header[HEADER_HEAP_SIZE]
+
+    def _allocate_heap(self, data: bytes) -> int:
+        """
+        Appends data to the heap and returns its offset. _put_hashed makes
+        room first, so the heap is never full here.
+        """
+        header = self._header
+        offset = header[HEADER_HEAP_USED]
+        self._heap[offset:offset + len(data)] = data
+        header[HEADER_HEAP_USED] = offset + len(data)
+        return offset
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Empties every slot and the heap in place, for clear().
+        """
+        zeros = memoryview(bytes(8 * self._capacity)).cast('Q')
+        self._states[:] = bytes(self._capacity)
+        self._keys._lengths[:] = zeros
+        self._values._lengths[:] = zeros
+        self._header[HEADER_HEAP_USED] = 0
+        self._tombstones = 0
+
+    def _live_heap_bytes(self) -> int:
+        """
+        Returns the heap bytes taken by the keys and values of live pairs.
+        """
+        total = 0
+        key_lengths, value_lengths = self._keys._lengths, self._values._lengths
+        for index in self._live_slots():
+            total += max(key_lengths[index] - 1, 0) + max(value_lengths[index] - 1, 0)
+        return total
+
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Same as CompactHashMap._put_hashed, but first makes sure the heap has
+        room for the pair, rebuilding the table with a larger heap if not.
+        The key and value are encoded once, for both the room check and the
+        write.
+        """
+
+        found_index, free_index = self._probe(key, hash_value)
+        if found_index == -1 and free_index == -1:
+            # No free slot on the probe sequence, grow and try again
+            self.resize_table(self._policy.grow(self._capacity))
+            found_index, free_index = self._probe(key, hash_value)
+
+        encoded_key = None if found_index != -1 else encode_key(key)
+        encoded_value = encode_value(value)
+        needed = len(encoded_key or b'') + len(encoded_value or b'')
+        used, size = self.get_heap_usage()
+        if used + needed > size:
+            self._rebuild(self._capacity, needed)
+            found_index, free_index = self._probe(key, hash_value)
+
+        if found_index != -1:
+            self._values.store(found_index, encoded_value)
+            return
+
+        if self._states[free_index] == TOMBSTONE:
+            self._tombstones -= 1
+        self._hashes[free_index] = hash_value
+        self._states[free_index] = FULL
+        self._keys.store(free_index, encoded_key)
+        self._values.store(free_index, encoded_value)
+        self._size += 1
+        self._mod_count += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rebuilds the table with the new capacity, through a new file renamed
+        over the old one.
+        """
+
+        if new_capacity < self._size:
+            return
+        new_capacity = self._policy.round_capacity(new_capacity)
+        while (self._size - 1) / new_capacity >= self.MAX_LOAD:
+            new_capacity = self._policy.round_capacity(new_capacity * 2)
+        self._rebuild(new_capacity, 0)
+
+    def compact(self) -> None:
+        """
+        Rebuilds the table at the same capacity, dropping tombstones and the
+        heap bytes of removed or overwritten pairs.
+        """
+        self._rebuild(self._capacity, 0)
+
+    def _rebuild(self, capacity: int, extra_heap: int) -> None:
+        """
+        Copies every live pair into a new file of the given capacity, with a
+        heap twice the size of the live pairs plus extra_heap bytes, then
+        renames it over the table's file and maps it in place of the old one.
+        """
+
+        heap_size = max(2 * (self._live_heap_bytes() + extra_heap), self.HEAP_SIZE)
+        temporary = self._path + '.new'
+        self._write_empty(temporary, capacity, heap_size)
+        target = type(self).open(temporary, self._hash_function)
+
+        states, hashes, heap = target._states, target._hashes, self._heap
+        columns = ((self._keys, target._keys), (self._values, target._values))
+        for index in self._live_slots():
+            hash_value = self._hashes[index]
+            slot = hash_value % capacity
+            step = 0
+            while states[slot] != EMPTY:
+                step += 1
+                slot += 2 * step - 1
+                if slot >= capacity:
+                    slot %= capacity
+            hashes[slot] = hash_value
+            states[slot] = FULL
+            # Copy the encoded bytes, without decoding them
+            for source, copy in columns:
+                length = source._lengths[index]
+                if length:
+                    offset = source._offsets[index]
+                    copy._offsets[slot] = target._allocate_heap(heap[offset:offset + length - 1])
+                copy._lengths[slot] = length
+        target._size = self._size
+
+        target.flush()
+        target.close()
+        self.close()
+        os.replace(temporary, self._path)
+        _fsync_directory(self._path)
+        self._map_file(self._path, self._hash_function)
+        self._mod_count += 1
+
+    def _iterate(self, read: callable):
+        """
+        Same as CompactHashMap._iterate, but snapshots the slots first, since
+        a rebuild unmaps the arrays an iterator would still be reading.
+        """
+        return iter([read(index) for index in self._live_slots()])
+
+    def memory_usage(self) -> int:
+        """
+        Returns the size of the table file.
+        """
+        return len(self._mmap)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("\nMapped example 1")
+    print("----------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table')
+        with MappedHashMap(path, 11, hash_function_1) as m:
+            for i in range(500):
+                m.put('str' + str(i), {'n': i})
+            m.remove('str0')
+            print(m.get_size(), m.get_capacity(), m.get('str42'), m.get_heap_usage()[0] > 0)
+        with MappedHashMap.open(path, hash_function_1) as m:
+            print(m.get_size(), m.get('str499'), m.contains_key('str0'), os.listdir(directory))
+
+    print("\nMapped example 2")
+    print("----------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table')
+        items = {'key' + str(i): 'x' * (i % 50) for i in range(2000)}
+        with MappedHashMap.from_items(path, items, hash_function_2) as m:
+            m.remove_many(['key' + str(i) for i in range(0, 2000, 2)])
+            print(m.get_size(), m.get_tombstone_count())
+            m.compact()
+            print(m.get_size(), m.get_tombstone_count(), m.get('key1'), m.get('key2'))
@@ -0,0 +1,349 @@
+# Description: Sharded HashMap that spreads keys over worker processes, so
+# lookups can use more than one core. Each shard is an ordinary SC or OA
+# HashMap owned by its own multiprocessing.Process; the front-end routes
+# every key to a shard by hash and talks to the workers over pipes.
+#
+# Calls that don't return anything (put, remove, put_many) are pipelined:
+# they are sent without waiting for the worker, and their replies are only
+# collected before the next call that needs an answer from that shard, or
+# once PIPELINE_DEPTH of them are outstanding. A pipe delivers requests in
+# order, so a get always sees the puts sent before it, and an exception in a
+# pipelined call is raised by the next call that waits on the same shard.
+# Batch calls split their keys by shard, send to every shard first and then
+# gather, so all shards work on their part at the same time.
+
+
+import multiprocessing
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+import hash_map_oa
+import hash_map_sc
+
+# 2**64 / golden ratio, used to decorrelate the shard from the bucket index
+GOLDEN_64 = 0x9E3779B97F4A7C15
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+class _Failure:
+    """An exception raised in a worker, sent back in place of a result."""
+
+    def __init__(self, error: Exception) -> None:
+        """Wrap the exception."""
+        self.error = error
+
+
+def _new_map(engine: str, capacity: int, function: callable, options: dict):
+    """
+    Builds one shard: an SC HashMap for engine 'sc', otherwise an OA
+    HashMap with that engine.
+    """
+    if engine == 'sc':
+        return hash_map_sc.HashMap(capacity, function, **options)
+    return hash_map_oa.HashMap(capacity, function, engine=engine, **options)
+
+
+def _serve(connection, engine: str, capacity: int, function: callable,
+           options: dict) -> None:
+    """
+    Worker process main loop: applies every (method, args) request to the
+    shard's map and replies with the result, until it gets None.
+    """
+    m = _new_map(engine, capacity, function, options)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        method, args = request
+        try:
+            if method == 'items':
+                result = list(m.items())
+            else:
+                result = getattr(m, method)(*args)
+        except Exception as error:
+            result = _Failure(error)
+        connection.send(result)
+    connection.close()
+
+
+class ShardedHashMap:
+    # Most replies a shard may owe before the front-end stops to collect
+    # them. Keeps the reply pipe from filling up and blocking the worker.
+    PIPELINE_DEPTH = 256
+
+    def __init__(self,
+                 shards: int = None,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 engine: str = 'sc',
+                 **options) -> None:
+        """
+        Starts shards worker processes (one per core by default), each
+        owning a map built with capacity, function and engine: 'sc' for the
+        separate chaining map or one of hash_map_oa.ENGINES. Other keyword
+        arguments go to the map constructor. With the 'spawn' start method
+        function must be picklable, i.e. defined at module level.
+        """
+        if shards is None:
+            shards = multiprocessing.cpu_count()
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if engine != 'sc' and engine not in hash_map_oa.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected 'sc' or one of "
+                             f"{list(hash_map_oa.ENGINES)}")
+
+        self._connections = []
+        self._workers = []
+        # Replies each shard still owes for pipelined calls
+        self._pending = [0] * shards
+        for _ in range(shards):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_serve, daemon=True,
+                                             args=(child, engine, capacity, function, options))
+            worker.start()
+            child.close()
+            self._connections.append(parent)
+            self._workers.append(worker)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Use the map as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the workers."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Waits for outstanding calls and stops every worker. The map can't be
+        used afterwards. Every worker is stopped even if a pipelined call
+        failed; the first such error is raised once they all have been.
+        """
+        first_error = None
+        stopped = set()
+        try:
+            for shard, connection in enumerate(self._connections):
+                if not self._workers[shard].is_alive():
+                    continue
+                try:
+                    # Keep draining past a failed call, so the worker is
+                    # never left blocked on a full reply pipe
+                    while self._pending[shard]:
+                        result = connection.recv()
+                        self._pending[shard] -= 1
+                        if isinstance(result, _Failure) and first_error is None:
+                            first_error = result.error
+                    connection.send(None)
+                    stopped.add(shard)
+                except (EOFError, OSError) as error:
+                    # The worker died or its pipe broke
+                    if first_error is None:
+                        first_error = error
+        finally:
+            for shard, worker in enumerate(self._workers):
+                if shard not in stopped and worker.is_alive():
+                    worker.terminate()
+                worker.join()
+            for connection in self._connections:
+                connection.close()
+            self._connections, self._workers = [], []
+        if first_error is not None:
+            raise first_error
+
+    def get_shard_count(self) -> int:
+        """Return number of shards"""
+        return len(self._connections)
+
+    def _shard(self, key: str) -> int:
+        """
+        Returns the shard that owns key. The built-in hash is mixed first, so
+        the keys of one shard still spread over all of its buckets, even
+        when the shard count and its capacity share a factor.
+        """
+        mixed = (hash(key) * GOLDEN_64) & MASK_64
+        return (mixed >> 32) % len(self._connections)
+
+    def _send(self, shard: int, method: str, *args) -> None:
+        """
+        Sends a call to a shard without waiting for its reply.
+        """
+        if self._pending[shard] >= self.PIPELINE_DEPTH:
+            self._drain(shard)
+        self._connections[shard].send((method, args))
+        self._pending[shard] += 1
+
+    def _receive(self, shard: int):
+        """
+        Returns the reply to the oldest call sent to shard, raising the
+        worker's exception if the call failed.
+        """
+        result = self._connections[shard].recv()
+        self._pending[shard] -= 1
+        if isinstance(result, _Failure):
+            raise result.error
+        return result
+
+    def _drain(self, shard: int) -> None:
+        """
+        Collects the replies to every pipelined call sent to shard.
+        """
+        while self._pending[shard]:
+            self._receive(shard)
+
+    def _call(self, shard: int, method: str, *args):
+        """
+        Calls a method on a shard's map and returns its result.
+        """
+        self._drain(shard)
+        self._send(shard, method, *args)
+        return self._receive(shard)
+
+    def _call_all(self, method: str, *args) -> list:
+        """
+        Calls a method with the same arguments on every shard in parallel and
+        returns their results in shard order.
+        """
+        for shard in range(len(self._connections)):
+            self._drain(shard)
+            self._send(shard, method, *args)
+        return [self._receive(shard) for shard in range(len(self._connections))]
+
+    def _split(self, keys: list) -> list:
+        """
+        Returns, for every shard, the list of positions in keys it owns.
+        """
+        positions = [[] for _ in self._connections]
+        shard = self._shard
+        for position, key in enumerate(keys):
+            positions[shard(key)].append(position)
+        return positions
+
+    def _call_split(self, method: str, keys: list, *columns) -> list:
+        """
+        Sends every shard its share of keys (and of each column running
+        alongside them) as one batch call, then gathers the per-key results
+        back into the order of keys.
+        """
+        split = self._split(keys)
+        busy = []
+        for shard, positions in enumerate(split):
+            if positions:
+                self._drain(shard)
+                self._send(shard, method, [keys[p] for p in positions],
+                           *[[column[p] for p in positions] for column in columns])
+                busy.append(shard)
+
+        results = [None] * len(keys)
+        for shard in busy:
+            for position, result in zip(split[shard], self._receive(shard)):
+                results[position] = result
+        return results
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates value at key. Pipelined: returns before the shard
+        has applied it.
+        """
+        self._send(self._shard(key), 'put', key, value)
+
+    def get(self, key: str):
+        """
+        Returns the value of key, or None if it isn't in the map
+        """
+        return self._call(self._shard(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if key is in the map, otherwise False
+        """
+        return self._call(self._shard(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the map, if present. Pipelined like put.
+        """
+        self._send(self._shard(key), 'remove', key)
+
+    def put_many(self, keys, values) -> None:
+        """
+        Puts keys[i] -> values[i] for every i, one batch per shard. Pipelined
+        like put.
+        """
+        keys, values = list(keys), list(values)
+        for shard, positions in enumerate(self._split(keys)):
+            if positions:
+                self._send(shard, 'put_many', [keys[p] for p in positions],
+                           [values[p] for p in positions])
+
+    def get_many(self, keys) -> list:
+        """
+        Returns a list with the value of every key, or None for keys that are
+        not in the map. All shards look up their keys in parallel.
+        """
+        return self._call_split('get_many', list(keys))
+
+    def contains_many(self, keys) -> list:
+        """
+        Returns a list with True for every key that is in the map and False
+        for every key that is not.
+        """
+        return self._call_split('contains_many', list(keys))
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes every key from the map. Returns a list with True for each key
+        that was removed, and False for keys that were missing (or repeated).
+        """
+        return self._call_split('remove_many', list(keys))
+
+    def get_size(self) -> int:
+        """
+        Return size of map, summed over all shards
+        """
+        return sum(self._call_all('get_size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return total capacity of all shards
+        """
+        return sum(self._call_all('get_capacity'))
+
+    def clear(self) -> None:
+        """
+        Empties every shard
+        """
+        self._call_all('clear')
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Return a DynamicArray containing all key-value pairs as tuples,
+        merged shard by shard.
+        """
+        ret_arr = DynamicArray()
+        for pairs in self._call_all('items'):
+            for pair in pairs:
+                ret_arr.append(pair)
+        return ret_arr
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSharded example 1")
+    print("-----------------")
+    with ShardedHashMap(4, 53, hash_function_1) as m:
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        print(m.get_size(), m.get('str42'), m.contains_key('str150'))
+        m.remove('str42')
+        print(m.get_size(), m.get('str42'))
+
+    print("\nSharded example 2")
+    print("-----------------")
+    with ShardedHashMap(3, 11, hash_function_2, engine='robin_hood') as m:
+        keys = ['key' + str(i) for i in range(1000)]
+        m.put_many(keys, range(1000))
+        print(m.get_many(['key1', 'key999', 'nope']), m.contains_many(['key5', 'key']))
+        print(m.remove_many(['key1', 'key1', 'nope']), m.get_size())
+        pairs = m.get_keys_and_values()
+        print(pairs.length(), sorted(pairs.get_at_index(i) for i in range(pairs.length()))[:3])
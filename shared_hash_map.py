@@ -0,0 +1,428 @@
+# Description: Open addressing HashMap whose table lives in one
+# multiprocessing.shared_memory block, so any number of processes can read
+# the same map without copying or pickling it. It is a CompactHashMap, so
+# probing, placing and the batch operations are the quadratic probing code
+# from hash_map_oa; only the slot arrays are different. The block is laid
+# out as described in table_layout: a header, the hash, key, value and
+# state arrays of the slots, and a heap of UTF-8 keys and pickled values.
+#
+# There must be a single writer. It makes the version odd before changing
+# anything and even again afterwards (a seqlock); readers retry whenever
+# the version was odd or moved while they read. The capacity is fixed when
+# the block is created: puts beyond MAX_LOAD raise MemoryError, and space
+# left in the heap by removed or overwritten pairs is reclaimed by compact().
+#
+# Forked children can use the parent's map directly. Other processes attach
+# with SharedHashMap.attach(name, function), or receive the map pickled,
+# which attaches on the other side. The hash function must give the same
+# result in every process (the built-in hash only does across fork).
+
+
+import pickle
+import time
+from functools import wraps
+from multiprocessing import parent_process, resource_tracker, shared_memory
+
+from a6_include import hash_function_1
+from hash_map_oa import FULL, HASH_MASK, TOMBSTONE, CompactHashMap
+from table_layout import (HEADER_CAPACITY, HEADER_HEAP_SIZE, HEADER_HEAP_USED,
+                          HEADER_MAGIC, HEADER_SIZE, HEADER_TOMBSTONES,
+                          HEADER_VERSION, encode_key, encode_value, lay_out,
+                          layout_size)
+
+MAGIC = 0x5348415245444D41
+
+
+def _writes(method: callable) -> callable:
+    """
+    Runs a writing method inside the seqlock: the version is odd from the
+    first change to the last. Writers calling each other bump it only once.
+    """
+
+    @wraps(method)
+    def write(self, *args, **kwargs):
+        if self._writing:
+            return method(self, *args, **kwargs)
+        header = self._header
+        self._writing = True
+        header[HEADER_VERSION] += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            header[HEADER_VERSION] += 1
+            self._writing = False
+
+    return write
+
+
+def _reads(method: callable) -> callable:
+    """
+    Runs a reading method until it completes without the writer changing
+    the table under it. An exception only counts if the table was stable,
+    since a torn read can decode garbage.
+    """
+
+    @wraps(method)
+    def read(self, *args, **kwargs):
+        if self._writing:
+            return method(self, *args, **kwargs)
+        header = self._header
+        while True:
+            version = header[HEADER_VERSION]
+            if version & 1:
+                # Writer busy, let it finish
+                time.sleep(0)
+                continue
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception:
+                if header[HEADER_VERSION] == version:
+                    raise
+                continue
+            if header[HEADER_VERSION] == version:
+                return result
+
+    return read
+
+
+class SharedHashMap(CompactHashMap):
+    """
+    CompactHashMap stored in shared memory, for one writer and many reader
+    processes. Create one with SharedHashMap(capacity, function, heap_size)
+    or SharedHashMap.from_items(...), then fork or attach readers.
+    """
+
+    # Heap bytes for keys and values when no heap_size is given
+    HEAP_SIZE = 1 << 20
+
+    def __init__(self, capacity: int, function=hash_function_1,
+                 heap_size: int = HEAP_SIZE, name: str = None) -> None:
+        """
+        Creates a new shared memory block (named name, or a random name) for
+        a table of capacity slots with heap_size bytes for keys and values.
+        """
+        self._set_policy(None)
+        capacity = self._policy.initial_capacity(capacity)
+
+        block = shared_memory.SharedMemory(name, create=True,
+                                           size=self._block_size(capacity, heap_size))
+        self._open(block, function, owner=True, capacity=capacity)
+        header = self._header
+        header[HEADER_CAPACITY] = capacity
+        header[HEADER_HEAP_SIZE] = heap_size
+        self._capacity = self._min_capacity = capacity
+        self._allocate(capacity)
+        header[HEADER_MAGIC] = MAGIC
+
+    @classmethod
+    def attach(cls, name: str, function=hash_function_1) -> "SharedHashMap":
+        """
+        Opens the map another process created under name. function must be
+        the hash function the map was created with.
+        """
+        # Before Python 3.13 attaching registers the block with the resource
+        # tracker, which unlinks it when its process exits. Children of the
+        # creator share its tracker and must leave the registration alone;
+        # any other process has a tracker of its own.
+        return cls._attach(name, function, untrack=parent_process() is None)
+
+    @classmethod
+    def _attach(cls, name: str, function, untrack: bool = False) -> "SharedHashMap":
+        """
+        Opens the block called name. Unpickling calls this directly: maps
+        are only pickled to multiprocessing children, which share the
+        creator's resource tracker.
+        """
+        self = cls.__new__(cls)
+        self._set_policy(None)
+        block = shared_memory.SharedMemory(name)
+        if untrack:
+            resource_tracker.unregister(block._name, 'shared_memory')
+        self._open(block, function, owner=False)
+        if self._header[HEADER_MAGIC] != MAGIC:
+            self.close()
+            raise ValueError(f"Shared memory block {name!r} does not hold a SharedHashMap")
+        self._capacity = self._min_capacity = self._header[HEADER_CAPACITY]
+        return self
+
+    @classmethod
+    def from_items(cls, iterable, function=hash_function_1, **kwargs) -> "SharedHashMap":
+        """
+        Builds a new shared map from (key, value) pairs (or anything with an
+        items() method), sized so they fit under MAX_LOAD with a heap twice
+        the size of their encoded keys and values.
+        """
+
+        items = list(iterable.items() if hasattr(iterable, 'items') else iterable)
+        if 'heap_size' not in kwargs:
+            encoded = sum(len(encode_key(key)) + len(pickle.dumps(value))
+                          for key, value in items)
+            kwargs['heap_size'] = max(2 * encoded, 1024)
+        m = cls(int(len(items) / cls.MAX_LOAD) + 1, function, **kwargs)
+        m.update(items)
+        return m
+
+    def __reduce__(self):
+        """Pickles as the block name, so the receiving process attaches to it."""
+        return type(self)._attach, (self.name, self._hash_function)
+
+    def __enter__(self) -> "SharedHashMap":
+        """Use the map as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map, and unlink the block if this process created it."""
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @staticmethod
+    def _block_size(capacity: int, heap_size: int) -> int:
+        """Returns the bytes needed for the header, slot arrays and heap."""
+        return layout_size(capacity, heap_size)
+
+    def _open(self, block: shared_memory.SharedMemory, function, owner: bool,
+              capacity: int = None) -> None:
+        """
+        Lays the header, slot arrays and heap out over block. The capacity is
+        read from the header unless given.
+        """
+
+        self._block = block
+        self._owner = owner
+        self._writing = False
+        self._hash_function = function
+        self._mod_count = 0
+
+        lay_out(self, block.buf, capacity)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block, for SharedHashMap.attach."""
+        return self._block.name
+
+    def __del__(self) -> None:
+        """Detach from the block when the map is garbage collected."""
+        if getattr(self, '_views', ()):
+            self.close()
+
+    def close(self) -> None:
+        """
+        Detaches this process from the block. The map can't be used afterwards.
+        """
+        for view in self._views:
+            view.release()
+        self._views = ()
+        self._block.close()
+
+    def unlink(self) -> None:
+        """
+        Destroys the block once every process has closed it. Called by the
+        creating process.
+        """
+        self._block.unlink()
+
+    # Size and tombstone count live in the header, so every process sees them
+
+    @property
+    def _size(self) -> int:
+        """Number of live pairs, from the header."""
+        return self._header[HEADER_SIZE]
+
+    @_size.setter
+    def _size(self, size: int) -> None:
+        """Store the number of live pairs in the header."""
+        self._header[HEADER_SIZE] = size
+
+    @property
+    def _tombstones(self) -> int:
+        """Number of tombstones, from the header."""
+        return self._header[HEADER_TOMBSTONES]
+
+    @_tombstones.setter
+    def _tombstones(self, tombstones: int) -> None:
+        """Store the number of tombstones in the header."""
+        self._header[HEADER_TOMBSTONES] = tombstones
+
+    def get_heap_usage(self) -> tuple[int, int]:
+        """
+        Returns a tuple of (heap bytes used, heap size).
+        """
+        return self._header[HEADER_HEAP_USED], self._header[HEADER_HEAP_SIZE]
+
+    def _allocate_heap(self, data: bytes) -> int:
+        """
+        Appends data to the heap and returns its offset.
+        """
+        header = self._header
+        offset = header[HEADER_HEAP_USED]
+        if offset + len(data) > header[HEADER_HEAP_SIZE]:
+            raise MemoryError("SharedHashMap heap is full")
+        self._heap[offset:offset + len(data)] = data
+        header[HEADER_HEAP_USED] = offset + len(data)
+        return offset
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Empties every slot and the heap. The capacity of a shared table never
+        changes.
+        """
+        zeros = memoryview(bytes(8 * self._capacity)).cast('Q')
+        self._states[:] = bytes(self._capacity)
+        self._keys._lengths[:] = zeros
+        self._values._lengths[:] = zeros
+        self._header[HEADER_HEAP_USED] = 0
+        self._tombstones = 0
+
+    @_writes
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates the key/value pair in the hash map, adding it if the key is not
+        in the map yet. The fixed capacity only limits new keys, so existing
+        ones can be updated in a full table.
+        """
+        self._put_hashed(key, value, self._hash_function(key) & HASH_MASK)
+
+    @_writes
+    def _put_hashed(self, key: str, value: object, hash_value: int) -> None:
+        """
+        Same as CompactHashMap._put_hashed, but probes before checking the
+        load factor, which only applies to a new key, and makes sure the heap
+        has room for the pair, compacting it if that frees enough. The key
+        and value are encoded once, for both the room check and the write.
+        """
+
+        found_index, free_index = self._probe(key, hash_value)
+        if found_index == -1 and (free_index == -1 or self.occupied_load() >= self.MAX_LOAD):
+            # Raises MemoryError if the table is full, otherwise compacts it
+            self.resize_table(self._capacity)
+            found_index, free_index = self._probe(key, hash_value)
+
+        encoded_key = None if found_index != -1 else encode_key(key)
+        encoded_value = encode_value(value)
+        needed = len(encoded_key or b'') + len(encoded_value or b'')
+        used, size = self.get_heap_usage()
+        if used + needed > size:
+            self.compact()
+            used, size = self.get_heap_usage()
+            if used + needed > size:
+                raise MemoryError("SharedHashMap heap is full")
+            found_index, free_index = self._probe(key, hash_value)
+
+        if found_index != -1:
+            self._values.store(found_index, encoded_value)
+            return
+
+        if self._states[free_index] == TOMBSTONE:
+            self._tombstones -= 1
+        self._hashes[free_index] = hash_value
+        self._states[free_index] = FULL
+        self._keys.store(free_index, encoded_key)
+        self._values.store(free_index, encoded_value)
+        self._size += 1
+        self._mod_count += 1
+
+    def _reserve(self, count: int) -> None:
+        """
+        Does nothing: the capacity is fixed, and _put_hashed checks it for
+        every new key, so a batch that updates existing keys of a full table
+        still goes through.
+        """
+
+    put_many = _writes(CompactHashMap.put_many)
+    update = _writes(CompactHashMap.update)
+    remove = _writes(CompactHashMap.remove)
+    remove_many = _writes(CompactHashMap.remove_many)
+    clear = _writes(CompactHashMap.clear)
+
+    get = _reads(CompactHashMap.get)
+    contains_key = _reads(CompactHashMap.contains_key)
+    get_many = _reads(CompactHashMap.get_many)
+    contains_many = _reads(CompactHashMap.contains_many)
+    get_keys_and_values = _reads(CompactHashMap.get_keys_and_values)
+
+    @_writes
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        The capacity of a shared table is fixed. Raises MemoryError if the
+        table is at MAX_LOAD, otherwise compacts it so put can go on.
+        """
+        if self.table_load() >= self.MAX_LOAD:
+            raise MemoryError(f"SharedHashMap is full at {self._size} keys, "
+                              f"create it with a larger capacity")
+        self.compact()
+
+    @_writes
+    def compact(self) -> None:
+        """
+        Rebuilds the table in place, dropping tombstones and the heap bytes
+        of removed or overwritten pairs.
+        """
+
+        pairs = [(self._hashes[i], self._keys[i], self._values[i]) for i in self._live_slots()]
+        self._allocate(self._capacity)
+        for hash_value, key, value in pairs:
+            self._place(hash_value, key, value)
+        self._mod_count += 1
+
+    @_reads
+    def _snapshot(self, read: callable) -> list:
+        """
+        Returns read(index) for every full slot, as one consistent list.
+        """
+        return [read(index) for index in self._live_slots()]
+
+    def _iterate(self, read: callable):
+        """
+        Returns an iterator over a consistent snapshot of read(index) for
+        every full slot. Other processes' writes during the iteration don't
+        affect it, and nothing is raised.
+        """
+        return iter(self._snapshot(read))
+
+    def memory_usage(self) -> int:
+        """
+        Returns the size of the shared memory block.
+        """
+        return self._block.size
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    print("\nShared example 1")
+    print("----------------")
+    with SharedHashMap(101, hash_function_1, heap_size=4096) as m:
+        for i in range(40):
+            m.put('str' + str(i), i * 100)
+        m.remove('str0')
+        m.put('str1', {'nested': [1, 2]})
+        print(m.get_size(), m.get_capacity(), m.get('str1'), m.contains_key('str0'))
+        print(m.get_heap_usage()[0] > 0, m.get_tombstone_count())
+        m.compact()
+        print(m.get_size(), m.get_tombstone_count(), sorted(m.keys())[:3])
+
+    print("\nShared example 2")
+    print("----------------")
+
+    with SharedHashMap.from_items({'str' + str(i): i for i in range(1000)}) as m:
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(2) as pool:
+            results = pool.map(m.get, ['str1', 'str999', 'nope'])
+        print(results, m.get_size())
+
+    print("\nShared example 3")
+    print("----------------")
+    with SharedHashMap(11, hash_function_1, heap_size=4096) as m:
+        for i in range(6):
+            m.put('k' + str(i), i)
+        # Full table: existing keys can still be updated
+        m.put('k0', 99)
+        m.put_many(['k1', 'k2'], ['one', 'two'])
+        print(m.get_size(), m.get('k0'), m.get_many(['k1', 'k2']))
+        try:
+            m.put('k6', 6)
+        except MemoryError as error:
+            print(error)
@@ -0,0 +1,231 @@
+# Description: Binary snapshot format for the SC and OA HashMaps, written
+# by HashMap.dump(path) and read by HashMap.load(path, function). A file
+# holds, in order:
+#
+#   header        - magic, format version, map kind, hash array type code,
+#                   capacity and entry count (little-endian, SNAPSHOT_HEADER)
+#   codec, engine - the value codec's name and the OA engine name ('' for
+#                   SC), each as a 16-bit length followed by ASCII
+#   hashes        - the cached hash of every entry as 64-bit integers, so
+#                   loading places entries without hashing any key
+#   key lengths   - 32-bit byte length of every UTF-8 encoded key
+#   value lengths - 32-bit byte length of every encoded value
+#   keys, values  - the encoded keys, then the encoded values, back to back
+#
+# Arrays are written and read whole with the array module, so the cost is
+# a few bulk copies plus one encode or decode per key and value, instead of
+# pickling every DynamicArray, LinkedList, node or entry object. Values go
+# through a Codec; the default pickles each value on its own.
+
+import pickle
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+MAGIC = b'HASHSNAP'
+# Bumped whenever the file layout changes
+FORMAT_VERSION = 1
+# magic, version, kind, hash type code, capacity, count
+SNAPSHOT_HEADER = struct.Struct('<8sHBcQQ')
+_NAME_LENGTH = struct.Struct('<H')
+
+KIND_SC = 0
+KIND_OA = 1
+
+# Hash type code of a file without a hash array, written when some hash
+# fits neither a signed nor an unsigned 64-bit integer; load then hashes
+# the keys again. Otherwise the type code is the array's, b'q' or b'Q'.
+_HASH_NONE = b'-'
+
+
+class Codec:
+    """
+    Turns values into bytes and back: encode(value) returns bytes, and
+    decode(data) gets a bytes-like object. name is stored in the snapshot,
+    so load can pick the same codec.
+    """
+
+    def __init__(self, name: str, encode: callable, decode: callable) -> None:
+        """Initialize a codec from its encode and decode functions."""
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self) -> str:
+        """Return the codec's name in human-readable form."""
+        return f"Codec({self.name!r})"
+
+
+PICKLE = Codec('pickle', pickle.dumps, pickle.loads)
+UTF8 = Codec('utf-8', lambda value: value.encode('utf-8', 'surrogatepass'),
+             lambda data: str(data, 'utf-8', 'surrogatepass'))
+BYTES = Codec('bytes', bytes, bytes)
+
+# Codecs load finds by the name stored in a snapshot
+CODECS = {codec.name: codec for codec in (PICKLE, UTF8, BYTES)}
+
+
+class Snapshot:
+    """
+    Contents of a snapshot file, as read by read_snapshot.
+    """
+
+    def __init__(self, kind: int, engine: str, capacity: int, hashes: list,
+                 keys: list, values: list) -> None:
+        """Initialize a snapshot. hashes is None if the file has none."""
+        self.kind = kind
+        self.engine = engine
+        self.capacity = capacity
+        self.hashes = hashes
+        self.keys = keys
+        self.values = values
+
+
+def _little_endian(numbers: array) -> array:
+    """Byte-swaps an array in place on big-endian machines and returns it."""
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    return numbers
+
+
+def _hash_array(hashes: list) -> array:
+    """
+    Returns the hashes as a signed or unsigned 64-bit array, or None if they
+    don't fit either.
+    """
+    for typecode in ('q', 'Q'):
+        try:
+            return array(typecode, hashes)
+        except OverflowError:
+            continue
+    return None
+
+
+def _name_field(name: str) -> bytes:
+    """Returns name as a 16-bit length followed by its ASCII bytes."""
+    data = name.encode('ascii')
+    return _NAME_LENGTH.pack(len(data)) + data
+
+
+def write_snapshot(path: str, kind: int, engine: str, capacity: int,
+                   hashes: list, keys: list, values: list,
+                   codec: Codec = PICKLE) -> None:
+    """
+    Writes a snapshot of a map with the given capacity holding keys[i] ->
+    values[i], whose cached hashes are hashes[i].
+    """
+
+    hash_array = _hash_array(hashes)
+    typecode = _HASH_NONE if hash_array is None else hash_array.typecode.encode('ascii')
+
+    encoded_keys = [key.encode('utf-8', 'surrogatepass') for key in keys]
+    encode = codec.encode
+    encoded_values = [encode(value) for value in values]
+
+    with open(path, 'wb') as file:
+        file.write(SNAPSHOT_HEADER.pack(MAGIC, FORMAT_VERSION, kind, typecode,
+                                        capacity, len(keys)))
+        file.write(_name_field(codec.name))
+        file.write(_name_field(engine))
+        if hash_array is not None:
+            file.write(_little_endian(hash_array))
+        file.write(_little_endian(array('I', map(len, encoded_keys))))
+        file.write(_little_endian(array('I', map(len, encoded_values))))
+        file.write(b''.join(encoded_keys))
+        file.write(b''.join(encoded_values))
+
+
+def read_snapshot(path: str, codec: Codec = None) -> Snapshot:
+    """
+    Reads a snapshot written by write_snapshot. Values are decoded with
+    codec, or with the codec named in the file if codec is None.
+    """
+
+    with open(path, 'rb') as file:
+        data = memoryview(file.read())
+
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError(f"{path!r} is not a HashMap snapshot")
+    magic, version, kind, typecode, capacity, count = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path!r} is not a HashMap snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path!r} has snapshot format {version}, expected {FORMAT_VERSION}")
+    position = SNAPSHOT_HEADER.size
+
+    names = []
+    for _ in range(2):
+        (length,) = _NAME_LENGTH.unpack_from(data, position)
+        position += _NAME_LENGTH.size
+        names.append(str(data[position:position + length], 'ascii'))
+        position += length
+    codec_name, engine = names
+
+    if codec is None:
+        if codec_name not in CODECS:
+            raise ValueError(f"{path!r} needs the {codec_name!r} codec, pass it to load")
+        codec = CODECS[codec_name]
+    elif codec.name != codec_name:
+        raise ValueError(f"{path!r} was written with the {codec_name!r} codec, "
+                         f"not {codec.name!r}")
+
+    def numbers(typecode: str) -> list:
+        nonlocal position
+        column = array(typecode)
+        size = column.itemsize * count
+        if position + size > len(data):
+            raise ValueError(f"{path!r} is truncated or corrupt")
+        column.frombytes(data[position:position + size])
+        position += size
+        return _little_endian(column).tolist()
+
+    if typecode not in (_HASH_NONE, b'q', b'Q'):
+        raise ValueError(f"{path!r} has an unknown hash type {typecode!r}")
+    hashes = None if typecode == _HASH_NONE else numbers(typecode.decode('ascii'))
+    key_lengths = numbers('I')
+    value_lengths = numbers('I')
+    if position + sum(key_lengths) + sum(value_lengths) != len(data):
+        raise ValueError(f"{path!r} is truncated or corrupt")
+
+    offsets = list(accumulate(key_lengths, initial=position))
+    keys = [str(data[start:end], 'utf-8', 'surrogatepass')
+            for start, end in zip(offsets, offsets[1:])]
+    offsets = list(accumulate(value_lengths, initial=offsets[-1]))
+    decode = codec.decode
+    values = [decode(data[start:end]) for start, end in zip(offsets, offsets[1:])]
+    return Snapshot(kind, engine, capacity, hashes, keys, values)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    import hash_map_oa
+    import hash_map_sc
+    from a6_include import hash_function_1, hash_function_2
+
+    print("\nSnapshot example 1")
+    print("------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.snap')
+        m = hash_map_sc.HashMap(53, hash_function_1)
+        for i in range(150):
+            m.put('str' + str(i), {'n': i})
+        m.dump(path)
+        loaded = hash_map_sc.HashMap.load(path, hash_function_1)
+        print(loaded.get_size(), loaded.get_capacity(), loaded.get('str42'))
+
+    print("\nSnapshot example 2")
+    print("------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.snap')
+        m = hash_map_oa.HashMap(11, hash_function_2, engine='swiss')
+        m.put_many(['key' + str(i) for i in range(1000)], ['v' + str(i) for i in range(1000)])
+        m.dump(path, UTF8)
+        loaded = hash_map_oa.HashMap.load(path, hash_function_2)
+        print(type(loaded).__name__, loaded.get_size(), loaded.get('key999'))
+        loaded = hash_map_oa.HashMap.load(path, hash_function_2, engine='robin_hood')
+        print(type(loaded).__name__, loaded.get_size(), loaded.get('key0'))
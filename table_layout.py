@@ -0,0 +1,116 @@
+# Description: Flat table layout shared by SharedHashMap (a shared memory
+# block) and MappedHashMap (a memory-mapped file). Both lay one buffer out
+# as:
+#
+#   header  - HEADER_FIELDS unsigned 64-bit ints, indexed by the HEADER_*
+#             positions below
+#   hashes  - one signed 64-bit hash per slot
+#   keys    - heap offset and length of each slot's UTF-8 encoded key
+#   values  - heap offset and length of each slot's pickled value
+#   states  - one EMPTY/FULL/TOMBSTONE byte per slot
+#   heap    - the key and value bytes, appended as they are written
+#
+# The header has separate fields for the writer's seqlock version, which
+# changes on every write, and for the format version of the layout, which
+# only changes when this file does.
+
+
+import pickle
+
+# Positions in the header
+(HEADER_MAGIC, HEADER_VERSION, HEADER_CAPACITY, HEADER_SIZE, HEADER_TOMBSTONES,
+ HEADER_HEAP_SIZE, HEADER_HEAP_USED, HEADER_FORMAT) = range(8)
+HEADER_FIELDS = 8
+HEADER_BYTES = 8 * HEADER_FIELDS
+
+
+class HeapColumn:
+    """
+    A slot array of keys or values, stored encoded in the heap. Indexing
+    decodes the object of a slot; assigning encodes and appends it. A
+    length of 0 means None, otherwise it is the byte count plus 1.
+    """
+
+    def __init__(self, owner, offsets: memoryview, lengths: memoryview,
+                 encode: callable, decode: callable) -> None:
+        """Wrap the offset and length arrays of one column."""
+        self._owner = owner
+        self._offsets = offsets
+        self._lengths = lengths
+        self._encode = encode
+        self._decode = decode
+
+    def __getitem__(self, index: int) -> object:
+        """Decode the object in the slot at index."""
+        length = self._lengths[index]
+        if length == 0:
+            return None
+        offset = self._offsets[index]
+        return self._decode(self._owner._heap[offset:offset + length - 1])
+
+    def __setitem__(self, index: int, obj: object) -> None:
+        """Encode obj into the heap and point the slot at index to it."""
+        self.store(index, None if obj is None else self._encode(obj))
+
+    def store(self, index: int, data: bytes) -> None:
+        """
+        Append already encoded data to the heap and point the slot at index
+        to it. None empties the slot.
+        """
+        if data is None:
+            self._lengths[index] = 0
+            return
+        self._offsets[index] = self._owner._allocate_heap(data)
+        self._lengths[index] = len(data) + 1
+
+
+def encode_key(key: str) -> bytes:
+    """Keys are stored as UTF-8."""
+    return key.encode('utf-8', 'surrogatepass')
+
+
+def decode_key(data: memoryview) -> str:
+    """Decode a key stored by encode_key."""
+    return str(data, 'utf-8', 'surrogatepass')
+
+
+def encode_value(value: object) -> bytes:
+    """Values are pickled; None is stored as an empty slot instead."""
+    return None if value is None else pickle.dumps(value)
+
+
+def layout_size(capacity: int, heap_size: int) -> int:
+    """
+    Returns the bytes needed for the header, slot arrays and heap of a
+    table with capacity slots.
+    """
+    return HEADER_BYTES + 41 * capacity + heap_size
+
+
+def lay_out(owner, buffer: memoryview, capacity: int = None) -> None:
+    """
+    Lays the header, slot arrays and heap out over buffer, as attributes of
+    owner. The capacity is read from the header unless given. owner._views
+    lists every view made, for releasing them.
+    """
+
+    owner._header = buffer[:HEADER_BYTES].cast('Q')
+    if capacity is None:
+        capacity = owner._header[HEADER_CAPACITY]
+
+    def region(start: int, size: int, format: str) -> memoryview:
+        return buffer[start:start + size].cast(format)
+
+    start = HEADER_BYTES
+    owner._hashes = region(start, 8 * capacity, 'q')
+    key_offsets = region(start + 8 * capacity, 8 * capacity, 'Q')
+    key_lengths = region(start + 16 * capacity, 8 * capacity, 'Q')
+    value_offsets = region(start + 24 * capacity, 8 * capacity, 'Q')
+    value_lengths = region(start + 32 * capacity, 8 * capacity, 'Q')
+    owner._states = region(start + 40 * capacity, capacity, 'B')
+    owner._heap = buffer[start + 41 * capacity:]
+    owner._views = (owner._header, owner._hashes, key_offsets, key_lengths,
+                    value_offsets, value_lengths, owner._states, owner._heap)
+
+    owner._keys = HeapColumn(owner, key_offsets, key_lengths, encode_key, decode_key)
+    owner._values = HeapColumn(owner, value_offsets, value_lengths, pickle.dumps, pickle.loads)
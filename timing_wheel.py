@@ -0,0 +1,160 @@
+# Description: Hierarchical timing wheel, used to expire map entries in
+# amortized O(1) time instead of sweeping the whole table. Time is counted
+# in integer ticks. Level 0 has SLOTS slots of one tick each, level 1 has
+# SLOTS slots of SLOTS ticks each, and so on up to LEVELS levels. An item
+# due d ticks from now goes into the lowest level whose span covers d;
+# whenever the current tick crosses the start of a slot on a higher level,
+# that slot's items are cascaded down to the levels below. Every item is
+# therefore moved at most LEVELS times before it comes due, and scheduling
+# one is a single list append. Items due beyond the top level's span are
+# parked in its furthest slot and rescheduled when they get there.
+#
+# The wheel does not support cancelling. Callers that reschedule or drop
+# an item leave the old entry in place and ignore it when it comes due.
+
+
+# Slots per level, a power of two so slot numbers are bit fields of the tick
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+
+
+class TimingWheel:
+    # Number of levels; the wheel spans SLOTS ** LEVELS ticks
+    LEVELS = 4
+
+    def __init__(self, tick: int = 0) -> None:
+        """
+        Initialize an empty wheel whose current tick is tick.
+        """
+        self._tick = tick
+        self._span = 1 << (SLOT_BITS * self.LEVELS)
+        self._levels = [[[] for _ in range(SLOTS)] for _ in range(self.LEVELS)]
+        # Items per level, so runs of empty slots can be skipped
+        self._counts = [0] * self.LEVELS
+
+    def __len__(self) -> int:
+        """Return the number of scheduled items."""
+        return sum(self._counts)
+
+    def get_tick(self) -> int:
+        """
+        Return the current tick
+        """
+        return self._tick
+
+    def schedule(self, item: object, due: int) -> None:
+        """
+        Schedules item to be returned by advance once the current tick
+        reaches due. Items already due are returned by the next tick.
+        """
+
+        if due <= self._tick:
+            due = self._tick + 1
+        self._place(item, due)
+
+    def _place(self, item: object, due: int) -> None:
+        """
+        Puts item in the slot for due, which may be the current tick when
+        items are cascaded; that slot of level 0 is emptied right after.
+        """
+
+        delta = due - self._tick
+        if delta >= self._span:
+            # Park it in the furthest slot; it is rescheduled from there
+            delta = self._span - 1
+
+        level = 0
+        while delta >> (SLOT_BITS * (level + 1)):
+            level += 1
+        slot = ((self._tick + delta) >> (SLOT_BITS * level)) & SLOT_MASK
+        self._levels[level][slot].append((due, item))
+        self._counts[level] += 1
+
+    def advance(self, tick: int) -> list:
+        """
+        Moves the current tick forward to tick and returns the items that
+        came due on the way, in the order their slots were reached. Empty
+        slots are skipped in one step, so a long idle gap costs no more than
+        a short one.
+        """
+
+        due_items = []
+        counts = self._counts
+        while self._tick < tick:
+            if not any(counts):
+                self._tick = tick
+                break
+
+            current = min(tick, self._next_event())
+            self._tick = current
+
+            for level in range(self.LEVELS - 1, 0, -1):
+                if current & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    self._cascade(level, (current >> (SLOT_BITS * level)) & SLOT_MASK)
+
+            slot = self._levels[0][current & SLOT_MASK]
+            if slot:
+                self._levels[0][current & SLOT_MASK] = []
+                counts[0] -= len(slot)
+                for due, item in slot:
+                    if due <= current:
+                        due_items.append(item)
+                    else:
+                        self._place(item, due)
+        return due_items
+
+    def _next_event(self) -> int:
+        """
+        Returns the first tick after the current one at which a non-empty
+        slot is reached, on any level. Nothing happens at the ticks before.
+        """
+
+        next_tick = None
+        for level, slots in enumerate(self._levels):
+            if not self._counts[level]:
+                continue
+            shift = SLOT_BITS * level
+            base = self._tick >> shift
+            for offset in range(1, SLOTS + 1):
+                if slots[(base + offset) & SLOT_MASK]:
+                    start = (base + offset) << shift
+                    if next_tick is None or start < next_tick:
+                        next_tick = start
+                    break
+        return next_tick
+
+    def _cascade(self, level: int, index: int) -> None:
+        """
+        Empties one slot of a higher level, rescheduling its items relative
+        to the current tick, which moves them to lower levels.
+        """
+
+        slot = self._levels[level][index]
+        if not slot:
+            return
+        self._levels[level][index] = []
+        self._counts[level] -= len(slot)
+        for due, item in slot:
+            self._place(item, due)
+
+    def clear(self) -> None:
+        """
+        Removes every scheduled item, keeping the current tick
+        """
+
+        self._levels = [[[] for _ in range(SLOTS)] for _ in range(self.LEVELS)]
+        self._counts = [0] * self.LEVELS
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nTiming wheel example 1")
+    print("----------------------")
+    wheel = TimingWheel()
+    for due in (1, 5, 64, 65, 4096, 300_000, 10 ** 9):
+        wheel.schedule('t' + str(due), due)
+    print(len(wheel), wheel.advance(64), wheel.advance(5000), len(wheel))
+    print(wheel.advance(10 ** 9), len(wheel), wheel.get_tick())